@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+"""Time each stage from page bytes to DataFrame on recorded pages.
+
+Runs fully offline against the pages in tests/fixtures, scaled up with
+benchmarks.synthetic. Usage::
+
+    python -m benchmarks.bench --scale 1 10 100 --json results.json
+    python -m benchmarks.bench --compare results.json --threshold 1.25
+
+With --compare the exit status is 1 when any stage got slower than the
+baseline by more than the threshold ratio, so upgrades can be gated on it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import bs4
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from pfr_api.fantasy import RANKINGS_ROW_ATTRIBUTES
+from pfr_api.parse.backends import etree, find_table, table_columns, \
+    table_rows
+from pfr_api.parse.parse import PARSERS, columns_to_frame, \
+    parse_stats_columns, parse_stats_table
+from pfr_api.parse.parser import PlayerRowParser, RowParser, \
+    UnaryFieldParser
+from pfr_api.player import GAMELOG_ROW_ATTRIBUTES
+
+from benchmarks.synthetic import scale_table
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'fixtures')
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+
+
+class Case(object):
+    """A recorded page and how its stats table is parsed."""
+
+    def __init__(
+        self,
+        name: str,
+        fixture: str,
+        table_id: str,
+        stat_row_attributes: Optional[Dict[str, Any]] = None,
+        parsers: Optional[Dict[str, RowParser]] = None,
+    ):
+        self.name = name
+        self.fixture = fixture
+        self.table_id = table_id
+        self.stat_row_attributes = stat_row_attributes
+        self.parsers = parsers
+
+    def content(self, scale: int = 1) -> bytes:
+        with open(os.path.join(FIXTURES, self.fixture), 'rb') as f:
+            return scale_table(f.read(), self.table_id, scale)
+
+
+CASES = [
+    Case('gamelog', 'gamelog.html', 'stats', GAMELOG_ROW_ATTRIBUTES),
+    Case('player_fantasy', 'player_fantasy.html', 'player_fantasy'),
+    Case('fantasy', 'fantasy_rankings.html', 'fantasy',
+         RANKINGS_ROW_ATTRIBUTES, {'player': PlayerRowParser()}),
+]
+
+
+class Result(object):
+    __slots__ = ('case', 'scale', 'stage', 'rows', 'min', 'median', 'peak')
+
+    def __init__(self, case, scale, stage, rows, min, median, peak):
+        self.case = case
+        self.scale = scale
+        self.stage = stage
+        self.rows = rows
+        self.min = min
+        self.median = median
+        self.peak = peak
+
+    @property
+    def key(self) -> Tuple[str, int, str]:
+        return self.case, self.scale, self.stage
+
+    def to_dict(self) -> Dict[str, Any]:
+        return OrderedDict((name, getattr(self, name))
+                           for name in self.__slots__)
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, float, int]:
+    # Peak memory comes from a separate, traced run so that tracing does
+    # not skew the timings. tracemalloc only sees Python allocations, not
+    # the tree libxml2 builds for the lxml backend.
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def _parser_groups(
+    case: Case,
+    table: Any,
+) -> Dict[str, List[Tuple[RowParser, List[Any]]]]:
+    # The table's cells grouped by the class of parser that handles them
+    parsers = {**PARSERS, **(case.parsers or {})}
+    column_infos = table_columns(table)[1:]
+    columns = [[] for _ in column_infos]  # type: List[List[Any]]
+    for cells in table_rows(table, case.stat_row_attributes or {}):
+        for column, cell in zip(columns, cells):
+            column.append(cell)
+    groups = OrderedDict()  # type: Dict[str, List[Tuple[RowParser, List]]]
+    for (column_stat, _), cells in zip(column_infos, columns):
+        parser = parsers[column_stat]
+        groups.setdefault(type(parser).__name__, []).append((parser, cells))
+    return groups
+
+
+def _parse_cells(group: List[Tuple[RowParser, List[Any]]]):
+    for parser, cells in group:
+        for cell in cells:
+            parser.parse(cell)
+
+
+def _convert_texts(group: List[Tuple[UnaryFieldParser, List[str]]]):
+    for parser, texts in group:
+        parser.convert(texts)
+
+
+def stages(
+    case: Case,
+    content: bytes,
+) -> Tuple[int, 'OrderedDict[str, Callable]']:
+    # The number of stats rows on the page and its stages by name
+    attributes = case.stat_row_attributes
+    parsers = case.parsers
+    soup = BeautifulSoup(content, 'html.parser')
+    bs4_table = soup.find('table', {'id': case.table_id})
+
+    def soup_stage():
+        return BeautifulSoup(content, 'html.parser')
+
+    def bs4_rows():
+        return parse_stats_table(bs4_table, attributes, parsers)
+
+    columns, rows = bs4_rows()
+
+    def rows_frame():
+        return pd.DataFrame(columns=columns, data=rows)
+
+    result = OrderedDict([
+        ('soup:bs4', soup_stage),
+        ('parse_stats_table:bs4', bs4_rows),
+        ('frame:rows', rows_frame),
+    ])
+    if etree is None:
+        return len(rows), result
+
+    lxml_table = find_table(content, case.table_id)
+
+    def find_stage():
+        return find_table(content, case.table_id)
+
+    def lxml_rows():
+        return parse_stats_table(lxml_table, attributes, parsers)
+
+    def lxml_columns():
+        return parse_stats_columns(lxml_table, attributes, parsers)
+
+    names, data = lxml_columns()
+
+    def columns_frame():
+        return columns_to_frame(names, data)
+
+    result['find_table:lxml'] = find_stage
+    result['parse_stats_table:lxml'] = lxml_rows
+    result['parse_stats_columns:lxml'] = lxml_columns
+    result['frame:columns'] = columns_frame
+
+    for name, group in _parser_groups(case, lxml_table).items():
+        result['parser:' + name] = (
+            lambda group=group: _parse_cells(group))
+        if isinstance(group[0][0], UnaryFieldParser):
+            texts = [(parser, [cell.text for cell in cells])
+                     for parser, cells in group]
+            result['convert:' + name] = (
+                lambda texts=texts: _convert_texts(texts))
+    return len(rows), result
+
+
+def run(
+    cases: List[Case] = CASES,
+    scales=DEFAULT_SCALES,
+    repeat: int = DEFAULT_REPEAT,
+    stage_filter: Optional[str] = None,
+    report: Optional[Callable[[Result], None]] = None,
+) -> List[Result]:
+    results = []
+    for case in cases:
+        for scale in scales:
+            content = case.content(scale)
+            row_count, case_stages = stages(case, content)
+            for stage, fn in case_stages.items():
+                if stage_filter and stage_filter not in stage:
+                    continue
+                result = Result(case.name, scale, stage, row_count,
+                                *measure(fn, repeat))
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return results
+
+
+def _print_result(result: Result):
+    print('{:<16}{:>6}  {:<44}{:>8}{:>12.3f}{:>12.3f}{:>12.1f}'.format(
+        result.case, 'x{}'.format(result.scale), result.stage, result.rows,
+        result.min * 1e3, result.median * 1e3, result.peak / 1024.))
+
+
+def environment() -> Dict[str, str]:
+    return OrderedDict([
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('pandas', pd.__version__),
+        ('bs4', bs4.__version__),
+        ('lxml', etree.__version__ if etree is not None else None),
+    ])
+
+
+def compare(
+    results: List[Result],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Tuple[Result, float]]:
+    # Stages whose best time regressed by more than `threshold` times
+    previous = {
+        (r['case'], r['scale'], r['stage']): r for r in baseline['results']
+    }
+    regressions = []
+    for result in results:
+        base = previous.get(result.key)
+        if base is None or not base['min']:
+            continue
+        ratio = result.min / base['min']
+        if ratio > threshold:
+            regressions.append((result, ratio))
+    return regressions
+
+
+def _max_rss_kib() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench', description=__doc__.split('\n')[0])
+    parser.add_argument('--case', action='append', choices=[
+        case.name for case in CASES], help='Only run these pages')
+    parser.add_argument('--scale', type=int, nargs='+',
+                        default=list(DEFAULT_SCALES),
+                        help='Table size multipliers (default: 1 10 100)')
+    parser.add_argument('--stage', help='Only run stages containing this')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', help='Baseline results to compare to')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES
+             if not args.case or case.name in args.case]
+    print('{:<16}{:>6}  {:<44}{:>8}{:>12}{:>12}{:>12}'.format(
+        'case', 'scale', 'stage', 'rows', 'min ms', 'median ms',
+        'peak KiB'))
+    results = run(cases, args.scale, args.repeat, args.stage, _print_result)
+    max_rss = _max_rss_kib()
+    if max_rss is not None:
+        print('max RSS: {} KiB'.format(max_rss))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(OrderedDict([
+                ('environment', environment()),
+                ('max_rss_kib', max_rss),
+                ('results', [result.to_dict() for result in results]),
+            ]), f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for result, ratio in regressions:
+            print('REGRESSION {} x{} {}: {:.2f}x slower'.format(
+                result.case, result.scale, result.stage, ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic pages: recorded pages with their stats table scaled up."""
+
+import re
+
+
+def scale_table(content: bytes, table_id: str, factor: int) -> bytes:
+    # The body rows of `table_id` are repeated `factor` times; everything
+    # else on the page, other tables included, is left as recorded
+    if factor < 1:
+        raise ValueError('factor must be positive, got {}'.format(factor))
+    table = re.search(
+        r'<table\b[^>]*\bid="{}"'.format(re.escape(table_id)).encode(),
+        content)
+    if table is None:
+        raise KeyError('No table {!r} in the page'.format(table_id))
+    start = content.index(b'<tbody>', table.end()) + len(b'<tbody>')
+    end = content.index(b'</tbody>', start)
+    return content[:start] + content[start:end] * factor + content[end:]
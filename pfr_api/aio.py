@@ -0,0 +1,239 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, \
+    Optional, Tuple
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api.client import DEFAULT_TIMEOUT, Client
+from pfr_api.fantasy import Fantasy
+from pfr_api.player import Player
+
+
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncRateLimiter(object):
+    """Spaces request starts at least 1 / rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1. / rate
+        self._next_start = 0.
+        self._lock = None  # type: Optional[asyncio.Lock]
+
+    async def wait(self):
+        # Created lazily so the lock binds to the running loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = asyncio.get_event_loop().time()
+            delay = self._next_start - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = max(now, self._next_start) + self.interval
+
+
+class AsyncClient(object):
+    """Runs blocking fetch-and-parse calls on a bounded thread pool.
+
+    Pages still go through a (pooled, cached) `Client`, so the network
+    waits of up to `concurrency` requests overlap.
+
+    `timeout` bounds how long a call is awaited. A thread cannot be
+    cancelled, so a call that times out keeps its worker (and any rate
+    limiter token) until its fetch returns; the client this creates
+    passes the timeout on to requests so that happens within `timeout`
+    per request. A given client keeps its own timeout.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        self._owns_client = client is None
+        if client is None:
+            client = Client(pool_size=concurrency,
+                            timeout=timeout or DEFAULT_TIMEOUT)
+        self.client = client
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._limiter = AsyncRateLimiter(rate) if rate else None
+        self._semaphore = None  # type: Optional[asyncio.Semaphore]
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            if self._limiter is not None:
+                await self._limiter.wait()
+            future = asyncio.get_event_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args))
+            return await asyncio.wait_for(future, self.timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class AsyncPlayer(object):
+    def __init__(
+        self,
+        name: str,
+        player_id: str,
+        aclient: AsyncClient,
+        backend: Optional[str] = None,
+    ):
+        self._aclient = aclient
+        self._player = Player(
+            name, player_id, client=aclient.client, backend=backend)
+
+    async def regular_season_gamelog(
+        self,
+        season: str = '',
+        columnar: bool = False,
+    ) -> 'pd.DataFrame':
+        return await self._aclient.run(
+            self._player.regular_season_gamelog, season, columnar)
+
+    async def playoffs_gamelog(
+        self,
+        season: str = '',
+        columnar: bool = False,
+    ) -> 'pd.DataFrame':
+        return await self._aclient.run(
+            self._player.playoffs_gamelog, season, columnar)
+
+    async def gamelogs(
+        self,
+        season: str = '',
+        columnar: bool = False,
+    ) -> 'Dict[str, pd.DataFrame]':
+        return await self._aclient.run(
+            self._player.gamelogs, season, columnar)
+
+    async def fantasy(
+        self,
+        season: str = '',
+        columnar: bool = False,
+    ) -> 'pd.DataFrame':
+        return await self._aclient.run(
+            self._player.fantasy, season, columnar)
+
+
+class AsyncFantasy(object):
+    def __init__(
+        self,
+        season,
+        aclient: AsyncClient,
+        backend: Optional[str] = None,
+    ):
+        self._aclient = aclient
+        self._fantasy = Fantasy(
+            season, client=aclient.client, backend=backend)
+
+    async def rankings(self, columnar: bool = False) -> 'pd.DataFrame':
+        return await self._aclient.run(self._fantasy.rankings, columnar)
+
+
+def _player_jobs(
+    aclient: AsyncClient,
+    method: str,
+    player_ids: Iterable[str],
+    seasons: Iterable[str],
+    columnar: bool,
+) -> List[Tuple[Tuple[str, str], Any]]:
+    seasons = list(seasons)
+    jobs = []
+    for player_id in player_ids:
+        # Names are not part of the URL scheme, so ids stand in for them
+        player = AsyncPlayer(player_id, player_id, aclient)
+        for season in seasons:
+            coroutine = getattr(player, method)(season, columnar)
+            jobs.append(((player_id, season), coroutine))
+    return jobs
+
+
+async def iter_gamelogs(
+    player_ids: Iterable[str],
+    seasons: Iterable[str] = ('',),
+    aclient: Optional[AsyncClient] = None,
+    playoffs: bool = False,
+    columnar: bool = False,
+) -> 'AsyncIterator[Tuple[str, str, pd.DataFrame]]':
+    # Yields (player_id, season, gamelog) in completion order
+    own_client = aclient is None
+    if own_client:
+        aclient = AsyncClient()
+    method = 'playoffs_gamelog' if playoffs else 'regular_season_gamelog'
+    try:
+        async for key, frame in _as_completed(_player_jobs(
+                aclient, method, player_ids, seasons, columnar)):
+            yield key + (frame,)
+    finally:
+        if own_client:
+            aclient.close()
+
+
+async def async_gamelogs(
+    player_ids: Iterable[str],
+    seasons: Iterable[str] = ('',),
+    aclient: Optional[AsyncClient] = None,
+    playoffs: bool = False,
+    columnar: bool = False,
+) -> 'Dict[Tuple[str, str], pd.DataFrame]':
+    results = {}
+    async for player_id, season, frame in iter_gamelogs(
+            player_ids, seasons, aclient, playoffs, columnar):
+        results[(player_id, season)] = frame
+    return results
+
+
+async def async_fantasy(
+    player_ids: Iterable[str],
+    seasons: Iterable[str] = ('',),
+    aclient: Optional[AsyncClient] = None,
+    columnar: bool = False,
+) -> 'Dict[Tuple[str, str], pd.DataFrame]':
+    own_client = aclient is None
+    if own_client:
+        aclient = AsyncClient()
+    try:
+        results = {}
+        async for key, frame in _as_completed(_player_jobs(
+                aclient, 'fantasy', player_ids, seasons, columnar)):
+            results[key] = frame
+        return results
+    finally:
+        if own_client:
+            aclient.close()
+
+
+async def _as_completed(
+    jobs: List[Tuple[Any, Any]],
+) -> AsyncIterator[Tuple[Any, Any]]:
+    async def keyed(key, coroutine):
+        return key, await coroutine
+
+    tasks = [asyncio.ensure_future(keyed(key, coroutine))
+             for key, coroutine in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
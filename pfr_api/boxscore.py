@@ -0,0 +1,260 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pfr_api import config
+from pfr_api.cache import ttl_for_season
+from pfr_api.client import Client, DEFAULT_POOL_SIZE, default_client
+from pfr_api.page import Page
+from pfr_api.parse.backends import table_columns
+from pfr_api.parse.parser import BoxscoreRowParser, IdentityParser, \
+    PlayerRowParser
+from pfr_api.seasons import current_season
+from pfr_api.warehouse import Warehouse, table_key
+
+
+# Player tables on a boxscore page, merged into one row per player
+BOXSCORE_TABLES = ('player_offense', 'player_defense', 'returns')
+# Player rows carry no class; each team's block is headed by class="thead"
+# (and "over_header thead") rows
+BOXSCORE_ROW_ATTRIBUTES = {'class': None}
+SCHEDULE_ROW_ATTRIBUTES = {'class': None}
+# Per-game columns, named as in the gamelog, ahead of the stats
+GAME_COLUMNS = [
+    'player_id', 'player_name', 'boxscore_id', 'year_id', 'game_date',
+    'week_num', 'team', 'game_location', 'opp', 'game_result',
+]
+_PLAYER_KEYS = ['player_id', 'player_name', 'team']
+
+_SCORE_RE = re.compile(rb'<div class="score">\s*(\d+)\s*</div>')
+_WEEK_RE = re.compile(rb'/years/\d{4}/week_(\d+)\.htm')
+
+
+def _game_result(points: int, opp_points: int) -> str:
+    # 'W 38-14', as in the gamelog's game_result column
+    outcome = 'W' if points > opp_points else \
+        'L' if points < opp_points else 'T'
+    return '{} {}-{}'.format(outcome, points, opp_points)
+
+
+class Boxscore(object):
+    """One game's boxscore page, parsed into gamelog-style player rows."""
+
+    entity_type = 'boxscores'
+
+    def __init__(
+        self,
+        boxscore_id: str,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+        warehouse: Optional[Warehouse] = None,
+        season: Optional[int] = None,
+        week: Optional[int] = None,
+    ):
+        self._boxscore_id = boxscore_id
+        self._client = client if client is not None else default_client()
+        self._backend = backend
+        self._warehouse = warehouse
+        # Ids start with the game's date, e.g. 200709090nwe
+        self._date = date(int(boxscore_id[:4]), int(boxscore_id[4:6]),
+                          int(boxscore_id[6:8]))
+        self._season = season if season is not None else \
+            current_season(self._date)
+        self._week = week
+        self._page = None  # type: Optional[Page]
+
+    @staticmethod
+    def boxscore_url(boxscore_id: str, base_url: Optional[str] = None) -> str:
+        return (
+            '{base}/boxscores/{id}.htm'
+            .format(base=base_url or config.BASE_URL, id=boxscore_id)
+        )
+
+    def boxscore_page(self) -> Page:
+        if self._page is None:
+            url = self.boxscore_url(self._boxscore_id, self._client.base_url)
+            content = self._client.get(url, ttl_for_season(self._season))
+            self._page = Page(
+                url, content, self._backend, self._client.results)
+        return self._page
+
+    @property
+    def game_date(self) -> str:
+        return self._date.isoformat()
+
+    def teams(self) -> Optional[Tuple[str, str]]:
+        # (visitor, home) abbreviations as used in the player tables
+        table = self.boxscore_page().table('team_stats')
+        if table is None:
+            return None
+        names = dict(table_columns(table))
+        if 'vis_stat' not in names or 'home_stat' not in names:
+            return None
+        return names['vis_stat'].strip(), names['home_stat'].strip()
+
+    def scores(self) -> Optional[Tuple[int, int]]:
+        # (visitor, home) points, in scorebox order
+        scores = _SCORE_RE.findall(self.boxscore_page().content)
+        if len(scores) < 2:
+            return None
+        return int(scores[0]), int(scores[1])
+
+    def week(self) -> Optional[int]:
+        if self._week is None:
+            match = _WEEK_RE.search(self.boxscore_page().content)
+            if match is not None:
+                self._week = int(match.group(1))
+        return self._week
+
+    def player_games(self, columnar: bool = False) -> pd.DataFrame:
+        # One row per player, with the gamelog's column names
+        if self._warehouse is None:
+            return self._player_games(columnar)
+        key = self._warehouse.key(
+            self.entity_type, self._boxscore_id, self._season,
+            table_key('player_games', columnar))
+        return self._warehouse.read_through(
+            key, lambda: self._player_games(columnar))
+
+    def _player_games(self, columnar: bool) -> pd.DataFrame:
+        page = self.boxscore_page()
+        table_ids = page.table_ids()
+        frames = []
+        for table_id in BOXSCORE_TABLES:
+            if table_id not in table_ids:
+                continue
+            frame = page.stats_table(
+                table_id,
+                stat_row_attributes=BOXSCORE_ROW_ATTRIBUTES,
+                parsers={'player': PlayerRowParser()},
+                columnar=columnar,
+                row_header=True)
+            frames.append(frame.drop(columns='player_csk'))
+        if not frames:
+            return pd.DataFrame(columns=GAME_COLUMNS)
+
+        # Players appear in several tables (a receiver returning punts);
+        # their stats are disjoint, so the first non-missing value wins
+        players = pd.concat(frames, ignore_index=True).groupby(
+            _PLAYER_KEYS, sort=False, as_index=False).first()
+
+        players['boxscore_id'] = self._boxscore_id
+        players['year_id'] = self._season
+        players['game_date'] = self.game_date
+        players['week_num'] = self.week()
+        teams, scores = self.teams(), self.scores()
+        if teams is None:
+            players['game_location'] = None
+            players['opp'] = None
+            players['game_result'] = None
+        else:
+            home = (players['team'] == teams[1]).to_numpy()
+            players['game_location'] = np.where(home, '', '@')
+            players['opp'] = np.where(home, teams[0], teams[1])
+            if scores is None:
+                players['game_result'] = None
+            else:
+                players['game_result'] = np.where(
+                    home, _game_result(scores[1], scores[0]),
+                    _game_result(scores[0], scores[1]))
+        stats = [c for c in players.columns if c not in GAME_COLUMNS]
+        return players[GAME_COLUMNS + stats]
+
+
+class Season(object):
+    """A season's schedule, and every player's games from its boxscores.
+
+    A season has about 270 games, so reading the boxscores takes far fewer
+    requests than every player's gamelog.
+    """
+
+    entity_type = 'seasons'
+
+    def __init__(
+        self,
+        season,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+        warehouse: Optional[Warehouse] = None,
+    ):
+        self._season = season
+        self._client = client if client is not None else default_client()
+        self._backend = backend
+        self._warehouse = warehouse
+        self._page = None  # type: Optional[Page]
+
+    @staticmethod
+    def schedule_url(season, base_url: Optional[str] = None) -> str:
+        return (
+            '{base}/years/{season}/games.htm'
+            .format(base=base_url or config.BASE_URL, season=season)
+        )
+
+    def schedule_page(self) -> Page:
+        if self._page is None:
+            url = self.schedule_url(self._season, self._client.base_url)
+            content = self._client.get(url, ttl_for_season(self._season))
+            self._page = Page(
+                url, content, self._backend, self._client.results)
+        return self._page
+
+    def schedule(self, columnar: bool = False) -> pd.DataFrame:
+        # Playoff rounds are named rather than numbered, so week_num is
+        # left as text here
+        return self.schedule_page().stats_table(
+            'games',
+            stat_row_attributes=SCHEDULE_ROW_ATTRIBUTES,
+            parsers={
+                'week_num': IdentityParser('week_num'),
+                'boxscore_word': BoxscoreRowParser(),
+            },
+            columnar=columnar,
+            row_header=True)
+
+    def games(self, playoffs: bool = False) -> List[Tuple[str, int]]:
+        # (boxscore id, week) of the games played so far. Playoff rounds
+        # are numbered on from the last regular season week, as weeks.
+        schedule = self.schedule()
+        played = schedule[schedule['boxscore_word'] == 'boxscore']
+        regular = played['week_num'].str.isdigit()
+        last_week = int(schedule['week_num'][
+            schedule['week_num'].str.isdigit()].astype(int).max())
+        if not playoffs:
+            return [(boxscore_id, int(week)) for boxscore_id, week in zip(
+                played['boxscore_id'][regular], played['week_num'][regular])]
+        rounds = {}  # type: Dict[str, int]
+        games = []
+        for boxscore_id, week in zip(played['boxscore_id'][~regular],
+                                     played['week_num'][~regular]):
+            rounds.setdefault(week, last_week + len(rounds) + 1)
+            games.append((boxscore_id, rounds[week]))
+        return games
+
+    def boxscores(self, playoffs: bool = False) -> List[Boxscore]:
+        return [
+            Boxscore(boxscore_id, client=self._client, backend=self._backend,
+                     warehouse=self._warehouse, season=int(self._season),
+                     week=week)
+            for boxscore_id, week in self.games(playoffs)
+        ]
+
+    def player_games(
+        self,
+        playoffs: bool = False,
+        columnar: bool = False,
+        fetch_workers: int = DEFAULT_POOL_SIZE,
+    ) -> pd.DataFrame:
+        # Every player's line in every (regular season or playoff) game, in
+        # schedule order; boxscores are fetched and parsed concurrently
+        boxscores = self.boxscores(playoffs)
+        if not boxscores:
+            return pd.DataFrame(columns=GAME_COLUMNS)
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            frames = list(executor.map(
+                lambda boxscore: boxscore.player_games(columnar),
+                boxscores))
+        return pd.concat(frames, ignore_index=True)
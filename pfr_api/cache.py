@@ -0,0 +1,245 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from pfr_api.seasons import is_final_season
+
+
+# Pages for seasons still in progress are refreshed after this many seconds
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+
+def ttl_for_season(
+    season: Union[int, str, None],
+    ttl: Optional[float] = DEFAULT_TTL,
+) -> Optional[float]:
+    # Finished seasons never change, so their pages never expire
+    if is_final_season(season):
+        return None
+    return ttl
+
+
+class CacheEntry(object):
+    __slots__ = (
+        'url', 'content', 'etag', 'last_modified', 'fetched_at',
+        'expires_at',
+    )
+
+    def __init__(
+        self,
+        url: str,
+        content: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        fetched_at: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        # None means the entry never expires
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if self.expires_at is None:
+            return True
+        if now is None:
+            now = time.time()
+        return now < self.expires_at
+
+    def refresh(self, ttl: Optional[float], now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+        self.fetched_at = now
+        self.expires_at = None if ttl is None else now + ttl
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class CacheStats(object):
+    __slots__ = ('hits', 'misses', 'revalidations', 'evictions')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def __repr__(self):
+        return (
+            'CacheStats(hits={}, misses={}, revalidations={}, evictions={})'
+            .format(self.hits, self.misses, self.revalidations,
+                    self.evictions)
+        )
+
+
+class PageCache(abc.ABC):
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abc.abstractmethod
+    def get(self, url: str) -> Optional[CacheEntry]:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def set(self, entry: CacheEntry):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def delete(self, url: str):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def clear(self):
+        raise NotImplementedError()
+
+
+class MemoryPageCache(PageCache):
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        super().__init__()
+        self.max_size = max_size
+        self._size = 0
+        self._entries = OrderedDict()  # type: OrderedDict[str, CacheEntry]
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def set(self, entry: CacheEntry):
+        with self._lock:
+            previous = self._entries.pop(entry.url, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._entries[entry.url] = entry
+            self._size += len(entry.content)
+            while self._size > self.max_size and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+                self.stats.evictions += 1
+
+    def delete(self, url: str):
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._size -= len(entry.content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskPageCache(PageCache):
+    """SQLite-backed page cache with least-recently-used eviction."""
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE):
+        super().__init__()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY,'
+            ' content BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' fetched_at REAL NOT NULL,'
+            ' expires_at REAL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS pages_accessed_at '
+            'ON pages (accessed_at)'
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content, etag, last_modified, fetched_at, expires_at '
+                'FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE pages SET accessed_at = ? WHERE url = ?',
+                (time.time(), url)
+            )
+            self._conn.commit()
+        content, etag, last_modified, fetched_at, expires_at = row
+        return CacheEntry(
+            url, bytes(content), etag, last_modified, fetched_at, expires_at)
+
+    def set(self, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (entry.url, entry.content, len(entry.content), entry.etag,
+                 entry.last_modified, entry.fetched_at, entry.expires_at,
+                 time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total, = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()
+        if total <= self.max_size:
+            return
+        # Always keep the most recently used page, even if it alone is
+        # larger than the cap
+        rows = self._conn.execute(
+            'SELECT url, size FROM pages ORDER BY accessed_at ASC'
+        ).fetchall()[:-1]
+        for url, size in rows:
+            if total <= self.max_size:
+                break
+            self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            total -= size
+            self.stats.evictions += 1
+
+    def delete(self, url: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM pages')
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            total, = self._conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()
+        return total
+
+    def close(self):
+        self._conn.close()
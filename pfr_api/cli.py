@@ -2,19 +2,334 @@
 
 """Console script for pfr_api."""
 import argparse
+import importlib.util
+import os
 import sys
+import threading
+import time
+from typing import Callable, List, Optional, Set, TextIO, Tuple
 
+from pfr_api.parse import BACKENDS
 
-def main():
+# pandas, bs4 and the pfr_api modules using them are imported by the
+# commands that need them so that --help and argument errors come back
+# immediately
+
+DEFAULT_WORKERS = 4
+FORMATS = ('csv', 'parquet')
+CHECKPOINT_NAME = '.pfr_api_checkpoint'
+
+# (checkpoint key, job)
+Job = Tuple[str, Callable[[], None]]
+
+
+def parse_seasons(spec: str) -> List[str]:
+    # '2015-2019,2021' or 'career'; the career page is season ''
+    seasons = []
+    for part in spec.split(','):
+        part = part.strip()
+        try:
+            if part in ('', 'career'):
+                seasons.append('')
+            elif '-' in part:
+                start, end = part.split('-', 1)
+                seasons.extend(
+                    str(season) for season in range(int(start), int(end) + 1))
+            else:
+                seasons.append(str(int(part)))
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                'invalid season {!r}, expected e.g. 2019, 2015-2019 or '
+                'career'.format(part))
+    return seasons
+
+
+def _season_label(season: str) -> str:
+    return season if season else 'career'
+
+
+def read_player_ids(path: str) -> List[str]:
+    # One id per line; blank lines and '#' comments are ignored
+    with open(path) as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+class Checkpoint(object):
+    """Append-only record of finished jobs, read back on resume."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()  # type: Set[str]
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done.update(line.strip() for line in f if line.strip())
+
+    def mark(self, key: str):
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(key + '\n')
+            self.done.add(key)
+
+
+class Progress(object):
+
+    def __init__(self, total: int, stream: Optional[TextIO] = sys.stderr):
+        self.total = total
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def update(self, key: str, error: Optional[BaseException] = None):
+        with self._lock:
+            self.done += 1
+            if error is not None:
+                self.failed += 1
+            if self.stream is None:
+                return
+            elapsed = time.time() - self._started
+            rate = self.done / elapsed if elapsed > 0 else 0.
+            eta = (self.total - self.done) / rate if rate > 0 else 0.
+            line = '[{}/{}] {} failed, {:.1f}/s, eta {:.0f}s  {}'.format(
+                self.done, self.total, self.failed, rate, eta, key)
+            if error is not None:
+                line += ': {}: {}'.format(type(error).__name__, error)
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def write_frame(frame, path: str, output_format: str):
+    # Written next to the target and renamed into place so that an
+    # interrupted crawl never leaves a truncated file behind
+    tmp = path + '.tmp'
+    if output_format == 'parquet':
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def run_jobs(
+    jobs: List[Job],
+    checkpoint: Checkpoint,
+    workers: int,
+    progress: Progress,
+) -> int:
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    def run(key, job):
+        job()
+        checkpoint.mark(key)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {executor.submit(run, key, job): key for key, job in jobs}
+    try:
+        for future in as_completed(futures):
+            progress.update(futures[future], future.exception())
+    except KeyboardInterrupt:
+        # Finished jobs are already checkpointed; the rest rerun on resume
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        executor.shutdown()
+    return 1 if progress.failed else 0
+
+
+def _client(args: argparse.Namespace):
+    from pfr_api.cache import DiskPageCache
+    from pfr_api.client import Client
+    from pfr_api.ratelimit import LocalRateLimiter
+    from pfr_api.replay import Archive
+    from pfr_api.results import ResultCache
+
+    if args.page_archive:
+        from pfr_api.page_archive import PageArchive
+        cache = PageArchive(args.page_archive)
+    else:
+        cache = DiskPageCache(args.cache) if args.cache else None
+    results = ResultCache(args.results) if args.results else None
+    rate_limiter = LocalRateLimiter(args.rate) if args.rate > 0 else None
+    archive_path = args.replay or args.record
+    archive = Archive(archive_path) if archive_path else None
+    return Client(cache=cache, pool_size=args.workers,
+                  rate_limiter=rate_limiter, base_url=args.base_url,
+                  archive=archive, replay=bool(args.replay),
+                  results=results)
+
+
+def _gamelog_jobs(args: argparse.Namespace, client) -> List[Job]:
+    import pandas as pd
+
+    from pfr_api.player import Player
+
+    player_ids = list(args.player_ids)
+    if args.players_file:
+        player_ids.extend(read_player_ids(args.players_file))
+
+    def export(player_id, season, path):
+        player = Player(player_id, player_id, client=client,
+                        backend=args.backend)
+        frames = []
+        for table_id, frame in player.gamelogs(season, columnar=True).items():
+            if table_id != 'stats' and not args.playoffs:
+                continue
+            frame.insert(0, 'table', table_id)
+            frames.append(frame)
+        frame = pd.concat(frames, ignore_index=True) if frames else \
+            pd.DataFrame(columns=['table'])
+        frame.insert(0, 'season', _season_label(season))
+        frame.insert(0, 'player_id', player_id)
+        write_frame(frame, path, args.format)
+
+    jobs = []
+    for player_id in player_ids:
+        for season in args.seasons:
+            label = _season_label(season)
+            path = os.path.join(args.out, '{}_{}.{}'.format(
+                player_id, label, args.format))
+            jobs.append((
+                'gamelogs/{}/{}'.format(player_id, label),
+                lambda p=player_id, s=season, o=path: export(p, s, o)))
+    return jobs
+
+
+def _rankings_jobs(args: argparse.Namespace, client) -> List[Job]:
+    from pfr_api.fantasy import Fantasy
+
+    def export(season, path):
+        frame = Fantasy(season, client=client, backend=args.backend) \
+            .rankings(columnar=True)
+        frame.insert(0, 'season', int(season))
+        write_frame(frame, path, args.format)
+
+    jobs = []
+    for season in args.seasons:
+        if not season:
+            continue
+        path = os.path.join(args.out, 'fantasy_{}.{}'.format(
+            season, args.format))
+        jobs.append((
+            'rankings/{}'.format(season),
+            lambda s=season, o=path: export(s, o)))
+    return jobs
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '-o', '--out', required=True,
+        help='directory to write one file per page to')
+    parser.add_argument(
+        '-f', '--format', choices=FORMATS, default='csv',
+        help='output format (parquet needs pyarrow or fastparquet)')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=DEFAULT_WORKERS,
+        help='pages fetched and parsed at once (default: %(default)s)')
+    parser.add_argument(
+        '--checkpoint',
+        help='file recording finished pages, so that rerunning the same '
+             'command resumes (default: OUT/{})'.format(CHECKPOINT_NAME))
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        '--cache', help='SQLite file to cache fetched pages in')
+    cache.add_argument(
+        '--page-archive', metavar='FILE',
+        help='zstd-compressed file keeping every fetched version of every '
+             'page, also used as the cache (needs zstandard)')
+    parser.add_argument(
+        '--results',
+        help='directory to cache parsed tables in, reused while pages and '
+             'parsers are unchanged')
+    parser.add_argument(
+        '--rate', type=float, default=None,
+        help='requests per second across workers, 0 to disable '
+             '(default: about 20 a minute)')
+    parser.add_argument(
+        '--base-url',
+        help='site to fetch from, e.g. a local pfr_api.server '
+             '(default: $PFR_API_BASE_URL or pro-football-reference.com)')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument(
+        '--record', metavar='ARCHIVE',
+        help='also save every response to this archive')
+    archive.add_argument(
+        '--replay', metavar='ARCHIVE',
+        help='answer requests from this archive instead of the network')
+    parser.add_argument(
+        '--backend', choices=BACKENDS, default=None,
+        help='HTML parsing backend (default: lxml when installed)')
+    parser.add_argument(
+        '-q', '--quiet', action='store_true', help='hide progress')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='pfr_api',
+        description='Export pro-football-reference.com tables.')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    gamelogs = commands.add_parser(
+        'gamelogs', help='export player gamelogs')
+    gamelogs.add_argument(
+        'player_ids', nargs='*', metavar='PLAYER_ID',
+        help='e.g. BradTo00')
+    gamelogs.add_argument(
+        '--players-file', help='file with one player id per line')
+    gamelogs.add_argument(
+        '-s', '--seasons', type=parse_seasons, default=[''],
+        help="e.g. 2019, 2015-2019,2021 or 'career' (default: career)")
+    gamelogs.add_argument(
+        '--playoffs', action='store_true',
+        help='include playoff games, marked in the `table` column')
+    _add_common_arguments(gamelogs)
+    gamelogs.set_defaults(jobs=_gamelog_jobs)
+
+    rankings = commands.add_parser(
+        'rankings', help='export season fantasy rankings')
+    rankings.add_argument(
+        '-s', '--seasons', type=parse_seasons, required=True,
+        help='e.g. 1970-2023')
+    _add_common_arguments(rankings)
+    rankings.set_defaults(jobs=_rankings_jobs)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Console script for pfr_api."""
-    parser = argparse.ArgumentParser()
-    parser.add_argument('_', nargs='*')
-    args = parser.parse_args()
-
-    print("Arguments: " + str(args._))
-    print("Replace this message by putting your code into "
-          "pfr_api.cli.main")
-    return 0
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'gamelogs' and not (
+            args.player_ids or args.players_file):
+        parser.error('gamelogs needs PLAYER_IDs or --players-file')
+    if args.format == 'parquet' and not any(
+            importlib.util.find_spec(engine) is not None
+            for engine in ('pyarrow', 'fastparquet')):
+        parser.error('--format parquet needs pyarrow or fastparquet')
+    if args.page_archive and importlib.util.find_spec('zstandard') is None:
+        parser.error('--page-archive needs zstandard')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.rate is None:
+        from pfr_api.ratelimit import DEFAULT_RATE
+        args.rate = DEFAULT_RATE
+
+    os.makedirs(args.out, exist_ok=True)
+    checkpoint = Checkpoint(
+        args.checkpoint or os.path.join(args.out, CHECKPOINT_NAME))
+    with _client(args) as client:
+        jobs = [job for job in args.jobs(args, client)
+                if job[0] not in checkpoint.done]
+        progress = Progress(len(jobs), None if args.quiet else sys.stderr)
+        try:
+            return run_jobs(jobs, checkpoint, args.workers, progress)
+        except KeyboardInterrupt:
+            sys.stderr.write(
+                'Interrupted; rerun the same command to resume\n')
+            return 130
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+import threading
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pfr_api import config
+from pfr_api.cache import DEFAULT_TTL, PageCache
+from pfr_api.fetch import DEFAULT_CHUNK_SIZE, fetch_page, stream_page
+from pfr_api.ratelimit import RateLimiter
+from pfr_api.replay import Archive, RecordingAdapter, ReplayAdapter
+from pfr_api.results import ResultCache
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class Client(object):
+    """Pooled HTTP client shared by `Player` and `Fantasy` objects."""
+
+    def __init__(
+        self,
+        cache: Optional[PageCache] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        compress: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        base_url: Optional[str] = None,
+        archive: Optional[Archive] = None,
+        replay: bool = False,
+        results: Optional[ResultCache] = None,
+    ):
+        self.cache = cache
+        # Parsed tables of the pages fetched through this client
+        self.results = results
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.base_url = (base_url or config.BASE_URL).rstrip('/')
+
+        # With a rate limiter, 429s are retried by fetch_page once the
+        # limiter has backed off rather than by urllib3 behind its back.
+        # urllib3 retries any response carrying Retry-After whatever the
+        # status list says, so the header is left to the limiter as well.
+        statuses = [
+            status for status in RETRY_STATUSES
+            if rate_limiter is None or status != 429
+        ]
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=statuses,
+            respect_retry_after_header=rate_limiter is None,
+            raise_on_status=False,
+        )
+        if replay:
+            if archive is None:
+                raise ValueError('replay=True needs an archive to replay')
+            adapter = ReplayAdapter(archive)
+        elif archive is not None:
+            # Responses are archived after urllib3's retries
+            adapter = RecordingAdapter(
+                archive,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=retry,
+            )
+        else:
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=retry,
+            )
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # requests decodes gzip/deflate bodies transparently; 'identity'
+        # turns negotiation off
+        self.session.headers['Accept-Encoding'] = (
+            'gzip, deflate' if compress else 'identity')
+        self.session.headers['Connection'] = 'keep-alive'
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(
+        self,
+        url: str,
+        ttl: Optional[float] = DEFAULT_TTL,
+        revalidate: bool = False,
+    ) -> bytes:
+        return fetch_page(
+            url, self.cache, ttl, session=self.session, timeout=self.timeout,
+            rate_limiter=self.rate_limiter, revalidate=revalidate)
+
+    def stream(
+        self,
+        url: str,
+        ttl: Optional[float] = DEFAULT_TTL,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        return stream_page(
+            url, self.cache, ttl, session=self.session, timeout=self.timeout,
+            rate_limiter=self.rate_limiter, chunk_size=chunk_size)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None  # type: Optional[Client]
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> Client:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = Client()
+        return _default_client
@@ -1 +1,9 @@
-BASE_URL = 'https://www.pro-football-reference.com'
+import os
+
+
+# Point the library at a mirror or a local stand-in server (see
+# pfr_api.server) by setting PFR_API_BASE_URL, or per client with
+# Client(base_url=...)
+BASE_URL = os.environ.get(
+    'PFR_API_BASE_URL', 'https://www.pro-football-reference.com'
+).rstrip('/')
@@ -1,30 +1,217 @@
-import pandas as pd
-import requests
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
 from bs4 import BeautifulSoup
 
-from pfr_api.config import BASE_URL
-from pfr_api.parse.parse import parse_stats_table
+from pfr_api import config
+from pfr_api.cache import ttl_for_season
+from pfr_api.client import Client, DEFAULT_POOL_SIZE, default_client
+from pfr_api.page import Page, stream_stats_table
+from pfr_api.parse.batch import parse_page_columns, parse_pool
+from pfr_api.parse.compact import compact_frame
+from pfr_api.parse.output import PANDAS, check_compact
+from pfr_api.parse.parse import columns_to_frame
 from pfr_api.parse.parser import PlayerRowParser
+from pfr_api.warehouse import Warehouse, table_key, whole_table
+
+
+def _is_stat_row(css_class: Optional[str]) -> bool:
+    # Rankings repeat the header every few rows as class="thead" rows
+    return css_class != 'thead'
+
+
+RANKINGS_ROW_ATTRIBUTES = {'class': _is_stat_row}
+
+
+def _missing_column(dtype, length: int) -> 'pd.Series':
+    # A column absent from one season's table, typed so that it concats
+    # with the seasons that do have it without falling back to object
+    if dtype.kind in 'iu':
+        dtype = 'Int64'
+    elif dtype.kind == 'b':
+        dtype = 'boolean'
+    return pd.Series([None] * length, dtype=dtype)
+
+
+def concat_seasons(frames: 'Dict[int, pd.DataFrame]') -> 'pd.DataFrame':
+    # Columns are the union across seasons, in order of first appearance
+    dtypes = {}
+    for frame in frames.values():
+        for column, dtype in frame.dtypes.items():
+            dtypes.setdefault(column, dtype)
+
+    aligned = []
+    for season, frame in frames.items():
+        columns = {'season': np.full(len(frame), season, dtype=np.int64)}
+        for column, dtype in dtypes.items():
+            if column in frame.columns:
+                columns[column] = frame[column].reset_index(drop=True)
+            else:
+                columns[column] = _missing_column(dtype, len(frame))
+        aligned.append(pd.DataFrame(columns))
+    if not aligned:
+        return pd.DataFrame(columns=['season'] + list(dtypes))
+    return pd.concat(aligned, ignore_index=True)
 
 
 class Fantasy(object):
-    def __init__(self, season):
+    entity_type = 'fantasy'
+
+    def __init__(
+        self,
+        season,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+        warehouse: Optional[Warehouse] = None,
+        stream: bool = False,
+    ):
         self._season = season
+        self._client = client if client is not None else default_client()
+        self._backend = backend
+        self._warehouse = warehouse
+        # See Player
+        self._stream = stream
+        self._page = None  # type: Optional[Page]
 
-    def _fantasy_rankings_page(self) -> BeautifulSoup:
-        url = (
+    @staticmethod
+    def rankings_url(season, base_url: Optional[str] = None) -> str:
+        return (
             '{base}/years/{season}/fantasy.htm'
-            .format(base=BASE_URL, season=self._season)
+            .format(base=base_url or config.BASE_URL, season=season)
         )
-        r = requests.get(url)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        return soup
-
-    def rankings(self) -> pd.DataFrame:
-        soup = self._fantasy_rankings_page()
-        results_table = soup.find('table', {'id': 'fantasy'})
-        columns, rows = parse_stats_table(
-            results_table,
-            stat_row_attributes={'class': lambda x: x != 'thead'},
-            parsers={'player': PlayerRowParser()})
-        return pd.DataFrame(columns=columns, data=rows)
+
+    def fantasy_rankings_page(self, reload: bool = False) -> Page:
+        if self._page is None:
+            url = self.rankings_url(self._season, self._client.base_url)
+            content = self._client.get(url, ttl_for_season(self._season))
+            self._page = Page(
+                url, content, self._backend, self._client.results)
+        elif reload:
+            # See Player._page
+            content = self._client.get(
+                self._page.url, ttl_for_season(self._season),
+                revalidate=True)
+            if content != self._page.content:
+                self._page = Page(
+                    self._page.url, content, self._backend,
+                    self._client.results)
+        return self._page
+
+    def _fantasy_rankings_page(self) -> BeautifulSoup:
+        return self.fantasy_rankings_page().soup
+
+    def rankings(
+        self,
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        check_compact(compact, output)
+        parsers = {'player': PlayerRowParser()}
+
+        def load():
+            if self._stream and self._page is None:
+                return stream_stats_table(
+                    self._client.stream(
+                        self.rankings_url(
+                            self._season, self._client.base_url),
+                        ttl_for_season(self._season)),
+                    'fantasy',
+                    stat_row_attributes=RANKINGS_ROW_ATTRIBUTES,
+                    parsers=parsers,
+                    columnar=columnar,
+                    output=output,
+                    columns=columns,
+                    where=where)
+            return self.fantasy_rankings_page().stats_table(
+                'fantasy',
+                stat_row_attributes=RANKINGS_ROW_ATTRIBUTES,
+                parsers=parsers,
+                columnar=columnar,
+                output=output,
+                columns=columns,
+                where=where)
+
+        # See Player._stats_table
+        if self._warehouse is None or not whole_table(
+                output, columns, where):
+            frame = load()
+        else:
+            key = self._warehouse.key(
+                self.entity_type, '', self._season,
+                table_key('fantasy', columnar))
+            frame = self._warehouse.read_through(key, load)
+        return compact_frame(frame, parsers) if compact else frame
+
+    @classmethod
+    def rankings_range(
+        cls,
+        start: int,
+        end: int,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+        warehouse: Optional[Warehouse] = None,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        fetch_workers: int = DEFAULT_POOL_SIZE,
+    ) -> 'pd.DataFrame':
+        # Typed rankings for seasons start through end inclusive, with a
+        # `season` column. Seasons already in the warehouse are not
+        # fetched; the rest are fetched on a thread pool and parsed on a
+        # process pool (or `executor`) as their pages arrive.
+        if client is None:
+            client = default_client()
+        seasons = list(range(start, end + 1))
+
+        def key(season):
+            return Warehouse.key(
+                cls.entity_type, '', season, table_key('fantasy', True))
+
+        frames = {}  # type: Dict[int, pd.DataFrame]
+        missing = []  # type: List[int]
+        for season in seasons:
+            frame = None if warehouse is None else warehouse.get(key(season))
+            if frame is None:
+                missing.append(season)
+            else:
+                frames[season] = frame
+
+        if missing:
+            own_executor = executor is None
+            if own_executor:
+                executor = parse_pool(max_workers)
+            try:
+                with ThreadPoolExecutor(fetch_workers) as fetcher:
+                    fetches = {
+                        fetcher.submit(
+                            client.get,
+                            cls.rankings_url(season, client.base_url),
+                            ttl_for_season(season)): season
+                        for season in missing
+                    }
+                    parses = {}
+                    for fetch in as_completed(fetches):
+                        parse = executor.submit(
+                            parse_page_columns, fetch.result(), 'fantasy',
+                            RANKINGS_ROW_ATTRIBUTES,
+                            {'player': PlayerRowParser()}, backend)
+                        parses[parse] = fetches[fetch]
+                for parse in as_completed(parses):
+                    season = parses[parse]
+                    frame = columns_to_frame(*parse.result())
+                    if warehouse is not None:
+                        warehouse.put(key(season), frame)
+                    frames[season] = frame
+            finally:
+                if own_executor:
+                    executor.shutdown()
+
+        return concat_seasons(
+            {season: frames[season] for season in seasons})
@@ -0,0 +1,192 @@
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from pfr_api import metrics
+from pfr_api.cache import CacheEntry, DEFAULT_TTL, PageCache
+from pfr_api.ratelimit import RateLimiter, parse_retry_after
+
+
+# Times a request throttled with 429 is retried once the limiter allows
+DEFAULT_RATE_LIMITED_RETRIES = 3
+# Bytes read off the socket at a time by stream_page
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+def _send(
+    get: Callable[..., requests.Response],
+    url: str,
+    headers: Dict[str, str],
+    timeout: Optional[float],
+    stream: bool = False,
+) -> requests.Response:
+    kwargs = {'stream': True} if stream else {}
+    registry = metrics.active()
+    if registry is None:
+        return get(url, headers=headers, timeout=timeout, **kwargs)
+    start = time.perf_counter()
+    r = get(url, headers=headers, timeout=timeout, **kwargs)
+    status = str(r.status_code)
+    # Streamed requests are timed to the headers and their bytes counted
+    # by stream_page as they are read
+    registry.observe(
+        'http_request_seconds', time.perf_counter() - start, status=status)
+    if not stream:
+        registry.count('http_response_bytes', len(r.content), status=status)
+    return r
+
+
+def _get(
+    url: str,
+    headers: Dict[str, str],
+    session: Optional[requests.Session],
+    timeout: Optional[float],
+    rate_limiter: Optional[RateLimiter],
+    rate_limited_retries: int,
+    stream: bool = False,
+) -> requests.Response:
+    get = requests.get if session is None else session.get
+    if rate_limiter is None:
+        return _send(get, url, headers, timeout, stream)
+
+    for _ in range(rate_limited_retries + 1):
+        rate_limiter.acquire()
+        r = _send(get, url, headers, timeout, stream)
+        rate_limiter.feedback(
+            r.status_code, parse_retry_after(r.headers.get('Retry-After')))
+        if r.status_code != 429:
+            break
+        r.close()
+    return r
+
+
+def _check_status(r: requests.Response, url: str, conditional: bool = False):
+    # Error pages are not the page asked for; parsing them would only turn
+    # up missing tables or empty results. 304s are answered from the cached
+    # entry by the callers, so they are only expected for conditional
+    # requests; any other has no body to return.
+    if not 200 <= r.status_code < 300 and not (
+            conditional and r.status_code == 304):
+        raise requests.HTTPError(
+            '{} {} for {}'.format(r.status_code, r.reason, url),
+            response=r)
+
+
+def fetch_page(
+    url: str,
+    cache: Optional[PageCache] = None,
+    ttl: Optional[float] = DEFAULT_TTL,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    rate_limited_retries: int = DEFAULT_RATE_LIMITED_RETRIES,
+    revalidate: bool = False,
+) -> bytes:
+    # With `revalidate`, a cached page is checked with a conditional
+    # request even while it is fresh
+    if cache is None:
+        r = _get(url, {}, session, timeout, rate_limiter,
+                 rate_limited_retries)
+        _check_status(r, url)
+        return r.content
+
+    registry = metrics.active()
+    entry = cache.get(url)
+    if entry is not None and entry.is_fresh() and not revalidate:
+        cache.stats.hits += 1
+        if registry is not None:
+            registry.count('cache_hits')
+        return entry.content
+
+    headers = entry.validators() if entry is not None else {}
+    r = _get(url, headers, session, timeout, rate_limiter,
+             rate_limited_retries)
+    _check_status(r, url, entry is not None)
+    if entry is not None and r.status_code == 304:
+        cache.stats.hits += 1
+        cache.stats.revalidations += 1
+        if registry is not None:
+            registry.count('cache_revalidations')
+        entry.refresh(ttl)
+        cache.set(entry)
+        return entry.content
+
+    cache.stats.misses += 1
+    if registry is not None:
+        registry.count('cache_misses')
+    entry = CacheEntry(
+        url,
+        r.content,
+        etag=r.headers.get('ETag'),
+        last_modified=r.headers.get('Last-Modified'),
+    )
+    entry.refresh(ttl)
+    cache.set(entry)
+    return r.content
+
+
+def stream_page(
+    url: str,
+    cache: Optional[PageCache] = None,
+    ttl: Optional[float] = DEFAULT_TTL,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    rate_limited_retries: int = DEFAULT_RATE_LIMITED_RETRIES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    # fetch_page for incremental parsers: yields the body as it arrives.
+    # Closing the generator early drops the connection instead of reading
+    # the rest of the page; pages read to the end are cached as usual.
+    registry = metrics.active()
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and entry.is_fresh():
+        cache.stats.hits += 1
+        if registry is not None:
+            registry.count('cache_hits')
+        yield entry.content
+        return
+
+    headers = entry.validators() if entry is not None else {}
+    r = _get(url, headers, session, timeout, rate_limiter,
+             rate_limited_retries, stream=True)
+    try:
+        _check_status(r, url, entry is not None)
+        if entry is not None and r.status_code == 304:
+            cache.stats.hits += 1
+            cache.stats.revalidations += 1
+            if registry is not None:
+                registry.count('cache_revalidations')
+            entry.refresh(ttl)
+            cache.set(entry)
+            yield entry.content
+            return
+
+        if cache is not None:
+            cache.stats.misses += 1
+            if registry is not None:
+                registry.count('cache_misses')
+        status = str(r.status_code)
+        # Only kept when there is a cache to store the complete page in
+        chunks = None  # type: Optional[List[bytes]]
+        if cache is not None:
+            chunks = []
+        for chunk in r.iter_content(chunk_size):
+            if registry is not None:
+                registry.count('http_response_bytes', len(chunk),
+                               status=status)
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+        if chunks is not None:
+            entry = CacheEntry(
+                url,
+                b''.join(chunks),
+                etag=r.headers.get('ETag'),
+                last_modified=r.headers.get('Last-Modified'),
+            )
+            entry.refresh(ttl)
+            cache.set(entry)
+    finally:
+        r.close()
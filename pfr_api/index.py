@@ -0,0 +1,284 @@
+import hashlib
+import html
+import os
+import re
+import sqlite3
+import string
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from pfr_api.client import Client, DEFAULT_POOL_SIZE, default_client
+from pfr_api.player import Player
+
+
+LETTERS = string.ascii_uppercase
+# Directory pages only change when players debut or retire
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_LIMIT = 10
+DEFAULT_FUZZY_CUTOFF = 0.75
+# Fuzzy candidates rescored per lookup, ranked by shared trigrams
+FUZZY_CANDIDATES = 50
+
+_SUFFIXES = frozenset(['jr', 'sr', 'ii', 'iii', 'iv', 'v'])
+_PLAYER_RE = re.compile(
+    r'<p>\s*(<b>)?\s*<a href="/players/\w/(\w+)\.htm">([^<]+)</a>\s*'
+    r'(?:</b>)?\s*(?:\(([^)]*)\))?\s*(?:(\d{4})-(\d{4}))?')
+
+# (player_id, name, position, first_season, last_season, active)
+Entry = Tuple[str, str, str, Optional[int], Optional[int], bool]
+
+
+def normalize_name(name: str) -> str:
+    # 'Odell Beckham Jr.' -> 'odell beckham', 'Joé Benét' -> 'joe benet'
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[.'`’]", '', name.lower())
+    words = re.sub(r'[^a-z0-9]+', ' ', name).split()
+    while len(words) > 1 and words[-1] in _SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def _trigrams(normalized: str) -> List[str]:
+    padded = '  {} '.format(normalized)
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def parse_directory(content: bytes) -> List[Entry]:
+    # Players on a /players/<letter>/ page; current players are in bold
+    text = content.decode('utf-8', errors='replace')
+    return [
+        (player_id, html.unescape(name).strip(), position or '',
+         int(first) if first else None, int(last) if last else None,
+         bool(bold))
+        for bold, player_id, name, position, first, last
+        in _PLAYER_RE.findall(text)
+    ]
+
+
+class PlayerIndex(object):
+    """Name to player id lookups over the site's player directory.
+
+    Stored in SQLite, indexed by normalized name; `refresh` fetches the
+    directory pages concurrently and only rewrites letters that changed.
+    """
+
+    def __init__(self, path: str, client: Optional[Client] = None):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._client = client if client is not None else default_client()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS players ('
+            ' player_id TEXT PRIMARY KEY,'
+            ' letter TEXT NOT NULL,'
+            ' name TEXT NOT NULL,'
+            ' normalized TEXT NOT NULL,'
+            ' position TEXT NOT NULL,'
+            ' first_season INTEGER,'
+            ' last_season INTEGER,'
+            ' active INTEGER NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS players_normalized '
+            'ON players (normalized)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS letters ('
+            ' letter TEXT PRIMARY KEY,'
+            ' digest TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        # Built on the first fuzzy lookup, dropped whenever players change
+        self._fuzzy = None  # type: Optional[Tuple[List[Tuple], Dict]]
+
+    def directory_url(self, letter: str) -> str:
+        return '{}/players/{}/'.format(self._client.base_url, letter.upper())
+
+    def _stale_letters(
+        self,
+        letters: Iterable[str],
+        max_age: Optional[float],
+    ) -> List[str]:
+        letters = [letter.upper() for letter in letters]
+        if max_age is None:
+            return letters
+        with self._lock:
+            fetched = dict(self._conn.execute(
+                'SELECT letter, fetched_at FROM letters'))
+        now = time.time()
+        return [letter for letter in letters
+                if now >= fetched.get(letter, 0.) + max_age]
+
+    def _fetch(self, letter: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self.directory_url(letter))
+        except requests.RequestException:
+            return None
+
+    def refresh(
+        self,
+        letters: Iterable[str] = LETTERS,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+        workers: int = DEFAULT_POOL_SIZE,
+    ) -> List[str]:
+        # Refetches the letters not fetched within `max_age` seconds (all
+        # of them with max_age=None) and returns the ones whose players
+        # changed. Letters that could not be fetched, or came back without
+        # players, keep their players and stay stale; once the others are
+        # stored, they are raised as a requests.RequestException.
+        stale = self._stale_letters(letters, max_age)
+        if not stale:
+            return []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = list(executor.map(self._fetch, stale))
+
+        changed = []
+        failed = []
+        now = time.time()
+        with self._lock:
+            digests = dict(self._conn.execute(
+                'SELECT letter, digest FROM letters'))
+            with self._conn:
+                for letter, content in zip(stale, pages):
+                    if content is None:
+                        failed.append(letter)
+                        continue
+                    digest = hashlib.sha1(content).hexdigest()
+                    if digests.get(letter) != digest:
+                        entries = parse_directory(content)
+                        if not entries:
+                            failed.append(letter)
+                            continue
+                        self._replace_letter(letter, entries)
+                        changed.append(letter)
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO letters VALUES (?, ?, ?)',
+                        (letter, digest, now))
+            if changed:
+                self._fuzzy = None
+        if failed:
+            raise requests.RequestException(
+                'Could not refresh letters {}; changed: {}'.format(
+                    ', '.join(failed), ', '.join(changed) or 'none'))
+        return changed
+
+    def _replace_letter(self, letter: str, entries: List[Entry]):
+        self._conn.execute('DELETE FROM players WHERE letter = ?', (letter,))
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(player_id, letter, name, normalize_name(name), position,
+              first, last, int(active))
+             for player_id, name, position, first, last, active in entries])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM players').fetchone()[0]
+
+    def _player(self, row: Tuple) -> Player:
+        player_id, name = row[:2]
+        return Player(name, player_id, client=self._client)
+
+    def _select(self, where: str, params: Tuple, limit: int) -> List[Tuple]:
+        # Among namesakes, the most recent careers come first
+        with self._lock:
+            return self._conn.execute(
+                'SELECT player_id, name FROM players WHERE ' + where +
+                ' ORDER BY last_season DESC, player_id LIMIT ?',
+                params + (limit,)).fetchall()
+
+    def get(self, player_id: str) -> Optional[Player]:
+        rows = self._select('player_id = ?', (player_id,), 1)
+        return self._player(rows[0]) if rows else None
+
+    def entry(self, player_id: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT player_id, name, position, first_season, '
+                'last_season, active FROM players WHERE player_id = ?',
+                (player_id,)).fetchone()
+        if row is None:
+            return None
+        return row[:5] + (bool(row[5]),)
+
+    def lookup(self, name: str, limit: int = DEFAULT_LIMIT) -> List[Player]:
+        # Exact match on the normalized name, so case, accents,
+        # punctuation and Jr./III suffixes do not matter
+        return [self._player(row) for row in self._select(
+            'normalized = ?', (normalize_name(name),), limit)]
+
+    def prefix(self, text: str, limit: int = DEFAULT_LIMIT) -> List[Player]:
+        normalized = normalize_name(text)
+        if not normalized:
+            return []
+        # A range scan over the normalized-name index
+        upper = normalized[:-1] + chr(ord(normalized[-1]) + 1)
+        return [self._player(row) for row in self._select(
+            'normalized >= ? AND normalized < ?', (normalized, upper),
+            limit)]
+
+    def _fuzzy_index(self) -> Tuple[List[Tuple], Dict[str, np.ndarray]]:
+        with self._lock:
+            if self._fuzzy is None:
+                rows = self._conn.execute(
+                    'SELECT player_id, name, normalized FROM players '
+                    'ORDER BY last_season DESC, player_id').fetchall()
+                postings = {}  # type: Dict[str, List[int]]
+                for i, row in enumerate(rows):
+                    for trigram in set(_trigrams(row[2])):
+                        postings.setdefault(trigram, []).append(i)
+                self._fuzzy = rows, {
+                    trigram: np.array(ids, dtype=np.int32)
+                    for trigram, ids in postings.items()}
+            return self._fuzzy
+
+    def fuzzy(
+        self,
+        name: str,
+        limit: int = DEFAULT_LIMIT,
+        cutoff: float = DEFAULT_FUZZY_CUTOFF,
+    ) -> List[Player]:
+        # Candidates sharing the most trigrams with the query, rescored by
+        # similarity; tolerates typos and missing or extra letters
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+        rows, postings = self._fuzzy_index()
+        trigrams = set(_trigrams(normalized))
+        hits = [postings[trigram] for trigram in trigrams
+                if trigram in postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(rows))
+        # Names sharing under half the query's trigrams are too far off to
+        # reach any sensible cutoff
+        candidates = np.flatnonzero(shared * 2 >= len(trigrams))
+        if len(candidates) > FUZZY_CANDIDATES:
+            top = np.argpartition(-shared[candidates], FUZZY_CANDIDATES)
+            candidates = candidates[top[:FUZZY_CANDIDATES]]
+        matcher = SequenceMatcher(b=normalized)
+        scored = []
+        for i in candidates:
+            matcher.set_seq1(rows[i][2])
+            if matcher.real_quick_ratio() < cutoff or \
+                    matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                scored.append((-score, i))
+        scored.sort()
+        return [self._player(rows[i]) for _, i in scored[:limit]]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,155 @@
+import contextlib
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# name, value, labels
+Listener = Callable[[str, float, Dict[str, str]], None]
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+COUNTER = 'counter'
+SUMMARY = 'summary'
+
+
+class Summary(object):
+    __slots__ = ('count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.
+
+
+class Registry(object):
+    """Counters and summaries of the scrape, labelled by stage.
+
+    Every recorded value is also passed to the registered listeners, e.g.
+    to forward them to a Prometheus or OpenTelemetry client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # type: Dict[MetricKey, float]
+        self._summaries = {}  # type: Dict[MetricKey, Summary]
+        self._listeners = []  # type: List[Listener]
+
+    def subscribe(self, listener: Listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener):
+        self._listeners.remove(listener)
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> MetricKey:
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        for listener in self._listeners:
+            listener(name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+        for listener in self._listeners:
+            listener(name, value, labels)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def summary(self, name: str, **labels: str) -> Summary:
+        with self._lock:
+            return self._summaries.get(self._key(name, labels), Summary())
+
+    def total(self, name: str) -> float:
+        # A counter summed over all its labels
+        with self._lock:
+            return sum(value for (metric, _), value in self._counters.items()
+                       if metric == name)
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        with self._lock:
+            return {
+                COUNTER: [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                SUMMARY: [
+                    {'name': name, 'labels': dict(labels),
+                     'count': summary.count, 'sum': summary.sum,
+                     'min': summary.min, 'max': summary.max}
+                    for (name, labels), summary in self._summaries.items()
+                ],
+            }
+
+    def to_prometheus(self, prefix: str = 'pfr_api_') -> str:
+        # Prometheus text exposition format
+        def series(name, labels, value):
+            if labels:
+                name += '{' + ','.join(
+                    '{}="{}"'.format(k, v.replace('"', '\\"'))
+                    for k, v in labels) + '}'
+            return '{} {}'.format(name, repr(float(value)))
+
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(series(prefix + name + '_total', labels, value))
+            for (name, labels), summary in sorted(self._summaries.items()):
+                lines.append(
+                    series(prefix + name + '_count', labels, summary.count))
+                lines.append(
+                    series(prefix + name + '_sum', labels, summary.sum))
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# Instrumented code checks active() and skips all bookkeeping while it is
+# None, so leaving the hooks in costs a function call per call site
+_registry = None  # type: Optional[Registry]
+
+
+def active() -> Optional[Registry]:
+    return _registry
+
+
+def enable(registry: Optional[Registry] = None) -> Registry:
+    global _registry
+    _registry = registry if registry is not None else Registry()
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
@@ -0,0 +1,262 @@
+import hashlib
+import re
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+from bs4 import BeautifulSoup, Comment
+
+from pfr_api import metrics
+from pfr_api.parse.backends import LXML, find_table, resolve_backend
+from pfr_api.parse.output import PANDAS, check_output
+from pfr_api.parse.parse import columns_to_output, parse_stats_columns, \
+    parse_stats_table
+from pfr_api.parse.parser import RowParser
+from pfr_api.parse.stream import iter_stats_table_chunks, \
+    parse_stats_columns_chunks
+from pfr_api.results import ResultCache, result_key
+
+
+_TABLE_ID_RE = re.compile(r'<table[^>]*\sid="([^"]+)"')
+
+
+def _memo_key(values: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    # Filters and parsers by value, or by identity for functions and
+    # parser objects; the key keeps them alive, so ids are not reused
+    if values is None:
+        return None
+    key = []
+    for name, value in sorted(values.items(), key=lambda item: item[0]):
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+class Page(object):
+    """A fetched page, parsed at most once and only when needed."""
+
+    def __init__(
+        self,
+        url: str,
+        content: bytes,
+        backend: Optional[str] = None,
+        results: Optional[ResultCache] = None,
+    ):
+        self.url = url
+        self.content = content
+        self.backend = resolve_backend(backend)
+        self.results = results
+        self._digest = None  # type: Optional[str]
+        self._soup = None  # type: Optional[BeautifulSoup]
+        self._tables = {}  # type: Dict[str, Any]
+        self._frames = {}  # type: Dict[Tuple, pd.DataFrame]
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            registry = metrics.active()
+            if registry is None:
+                self._soup = BeautifulSoup(self.content, 'html.parser')
+            else:
+                with registry.timer('soup_seconds'):
+                    self._soup = BeautifulSoup(self.content, 'html.parser')
+        return self._soup
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = hashlib.sha1(self.content).hexdigest()
+        return self._digest
+
+    def table_ids(self) -> List[str]:
+        # Includes tables that the site ships inside HTML comments
+        text = self.content.decode('utf-8', errors='replace')
+        ids = []
+        for table_id in _TABLE_ID_RE.findall(text):
+            if table_id not in ids:
+                ids.append(table_id)
+        return ids
+
+    def table(self, table_id: str) -> Any:
+        # A BeautifulSoup tag or an lxml element depending on the backend
+        if table_id not in self._tables:
+            start = time.perf_counter()
+            if self.backend == LXML:
+                table = find_table(self.content, table_id)
+            else:
+                table = self._find_soup_table(table_id)
+            self._tables[table_id] = table
+            registry = metrics.active()
+            if registry is not None:
+                registry.observe(
+                    'table_seconds', time.perf_counter() - start,
+                    backend=self.backend)
+        return self._tables[table_id]
+
+    def _find_soup_table(self, table_id: str) -> Optional[BeautifulSoup]:
+        table = self.soup.find('table', {'id': table_id})
+        if table is not None:
+            return table
+        # pro-football-reference lazily renders secondary tables from
+        # markup kept in comments
+        marker = 'id="{}"'.format(table_id)
+        for comment in self.soup.find_all(
+                string=lambda s: isinstance(s, Comment) and marker in s):
+            table = BeautifulSoup(comment, 'html.parser').find(
+                'table', {'id': table_id})
+            if table is not None:
+                return table
+        return None
+
+    def _record_parse(
+        self,
+        registry: metrics.Registry,
+        table_id: str,
+        columnar: bool,
+        rows: int,
+        parse_seconds: float,
+        frame_seconds: float,
+    ):
+        labels = {
+            'table': table_id,
+            'backend': self.backend,
+            'mode': 'columnar' if columnar else 'rows',
+        }
+        registry.observe('parse_seconds', parse_seconds, **labels)
+        registry.observe('frame_seconds', frame_seconds, **labels)
+        registry.count('parse_rows', rows, **labels)
+        if parse_seconds > 0:
+            registry.observe(
+                'parse_rows_per_second', rows / parse_seconds, **labels)
+
+    def stats_table(
+        self,
+        table_id: str,
+        stat_row_attributes: Optional[Dict[str, Any]] = None,
+        parsers: Optional[Dict[str, RowParser]] = None,
+        columnar: bool = False,
+        row_header: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        check_output(output)
+        if output != PANDAS:
+            # Built from the columnar parse without pandas; the memo and
+            # the result cache only hold DataFrames
+            return self._parse(
+                table_id, stat_row_attributes, parsers, True, row_header,
+                output, columns, where)
+        # Narrowed tables are not memoized, as each caller narrows its own
+        # way, but do go through the result cache. Whole tables are
+        # memoized by the row filters, parsers and modes they were parsed
+        # with; the content key is only built for the result cache.
+        narrowed = columns is not None or where is not None
+        memo_key = (table_id, columnar, row_header,
+                    _memo_key(stat_row_attributes), _memo_key(parsers))
+        if narrowed or memo_key not in self._frames:
+            if self.results is None:
+                frame = self._parse(
+                    table_id, stat_row_attributes, parsers, columnar,
+                    row_header, columns=columns, where=where)
+            else:
+                # An unchanged page parsed before with the same parsers
+                # skips both the HTML parse and the DataFrame build
+                key = result_key(
+                    self.digest, table_id, stat_row_attributes, parsers,
+                    columnar, row_header, columns, where)
+                frame = self.results.get(key)
+                if frame is None:
+                    frame = self._parse(
+                        table_id, stat_row_attributes, parsers, columnar,
+                        row_header, columns=columns, where=where)
+                    self.results.put(key, frame)
+            if narrowed:
+                return frame
+            self._frames[memo_key] = frame
+        # Callers own the frame they get back; the memoized one stays intact
+        return self._frames[memo_key].copy()
+
+    def _parse(
+        self,
+        table_id: str,
+        stat_row_attributes: Optional[Dict[str, Any]],
+        parsers: Optional[Dict[str, RowParser]],
+        columnar: bool,
+        row_header: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        table = self.table(table_id)
+        if table is None:
+            raise KeyError(
+                'No table {!r} on {}'.format(table_id, self.url))
+        start = time.perf_counter()
+        if columnar:
+            output_columns, data = parse_stats_columns(
+                table,
+                stat_row_attributes=stat_row_attributes,
+                parsers=parsers,
+                row_header=row_header,
+                columns=columns,
+                where=where)
+            parsed = time.perf_counter()
+            rows = len(data[0]) if data else 0
+            frame = columns_to_output(output_columns, data, output, parsers)
+        else:
+            output_columns, row_values = parse_stats_table(
+                table,
+                stat_row_attributes=stat_row_attributes,
+                parsers=parsers,
+                row_header=row_header,
+                columns=columns,
+                where=where)
+            parsed = time.perf_counter()
+            rows = len(row_values)
+            frame = pd.DataFrame(columns=output_columns, data=row_values)
+        registry = metrics.active()
+        if registry is not None:
+            self._record_parse(
+                registry, table_id, columnar, rows,
+                parsed - start, time.perf_counter() - parsed)
+        return frame
+
+
+def stream_stats_table(
+    chunks: Iterator[bytes],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    columnar: bool = False,
+    output: str = PANDAS,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Any:
+    # Page.stats_table for a page still being downloaded, e.g. from
+    # Client.stream: parsing overlaps the download and the rest of the page
+    # is never read once the table has been
+    check_output(output)
+    with closing(chunks):
+        if columnar or output != PANDAS:
+            output_columns, data = parse_stats_columns_chunks(
+                chunks, table_id,
+                stat_row_attributes=stat_row_attributes,
+                parsers=parsers,
+                columns=columns,
+                where=where)
+            return columns_to_output(output_columns, data, output, parsers)
+        output_columns, rows = iter_stats_table_chunks(
+            chunks, table_id,
+            stat_row_attributes=stat_row_attributes,
+            parsers=parsers,
+            columns=columns,
+            where=where)
+        return pd.DataFrame(columns=output_columns, data=list(rows))
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from pfr_api.cache import CacheEntry, PageCache
+
+
+MAGIC = b'PFRZ'
+FORMAT_VERSION = 1
+DEFAULT_LEVEL = 9
+# zstd's own default; pages share far more boilerplate than this holds
+DEFAULT_DICT_SIZE = 110 * 1024
+# Pages stored before a dictionary is trained on them automatically
+DEFAULT_TRAIN_AFTER = 64
+# Pages are cut into samples of this size for training, so that a few
+# large pages still make the many samples zstd's trainer wants
+SAMPLE_SIZE = 4 * 1024
+
+_HEADER = struct.Struct('<4sI')
+# Every record is a kind byte and a payload length, then the payload
+_RECORD = struct.Struct('<cI')
+_LENGTH = struct.Struct('<I')
+_DICTIONARY = b'D'
+_PAGE = b'P'
+_TOMBSTONE = b'X'
+
+
+class _Version(object):
+    __slots__ = ('fetched_at', 'expires_at', 'etag', 'last_modified',
+                 'offset', 'length', 'dict_id', 'size', 'sha1')
+
+    def __init__(self, meta: Dict[str, Any], offset: int, length: int):
+        self.fetched_at = meta['fetched_at']
+        self.expires_at = meta['expires_at']
+        self.etag = meta['etag']
+        self.last_modified = meta['last_modified']
+        # Where the compressed body is; revalidations point at the body
+        # stored with an earlier version
+        self.offset = offset
+        self.length = length
+        self.dict_id = meta['dict_id']
+        self.size = meta['size']
+        self.sha1 = meta['sha1']
+
+
+class PageArchive(PageCache):
+    """Every fetched version of every page, zstd-compressed in one file.
+
+    Pages are compressed against a dictionary trained on earlier pages, so
+    the boilerplate and table markup they all repeat is stored once. The
+    file is only ever appended to and is read through a memory map; the
+    URL and fetch date index is rebuilt from it on open. As a PageCache,
+    `get` returns the latest version; `get_version` reads older ones.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        level: int = DEFAULT_LEVEL,
+        train_after: Optional[int] = DEFAULT_TRAIN_AFTER,
+        dict_size: int = DEFAULT_DICT_SIZE,
+    ):
+        if zstandard is None:
+            raise ImportError('PageArchive requires the zstandard package')
+        super().__init__()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.level = level
+        self.train_after = train_after
+        self.dict_size = dict_size
+        self._lock = threading.Lock()
+        # Held while a dictionary is trained, outside _lock so that pages
+        # are still read and written meanwhile
+        self._train_lock = threading.Lock()
+        self._local = threading.local()
+        self._file = open(path, 'a+b')
+        self._mmap = None  # type: Optional[mmap.mmap]
+        self._index = {}  # type: Dict[str, List[_Version]]
+        self._dicts = {}  # type: Dict[int, zstandard.ZstdCompressionDict]
+        self._compressors = {}  # type: Dict[int, zstandard.ZstdCompressor]
+        self._dict_id = 0
+        self._undictionaried = 0
+        self._load()
+
+    # Reading the file
+
+    def _map(self, end: int) -> mmap.mmap:
+        # Remapped as the file grows. The map is only read with the lock
+        # held, so an old one can be closed as soon as it is replaced.
+        if self._mmap is None or len(self._mmap) < end:
+            self._file.flush()
+            self._unmap()
+            self._mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _unmap(self):
+        # Before the file shrinks: reading a mapping past the end of its
+        # file raises SIGBUS rather than an exception
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _load(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self._file.flush()
+            return
+        data = self._map(size)
+        magic, version = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('{} is not a version {} page archive'.format(
+                self.path, FORMAT_VERSION))
+        offset = _HEADER.size
+        while offset + _RECORD.size <= size:
+            kind, length = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            if start + length > size:
+                break
+            self._index_record(kind, data, start, length)
+            offset = start + length
+        if offset < size:
+            # A record cut short by a crash; later appends start after the
+            # last complete one
+            self._unmap()
+            self._file.truncate(offset)
+
+    def _index_record(self, kind: bytes, data: Any, start: int, length: int):
+        if kind == _DICTIONARY:
+            dict_id, = _LENGTH.unpack_from(data, start)
+            self._add_dict(
+                dict_id, bytes(data[start + 4:start + length]))
+        elif kind == _PAGE:
+            meta_length, = _LENGTH.unpack_from(data, start)
+            meta_end = start + 4 + meta_length
+            meta = json.loads(bytes(data[start + 4:meta_end]))
+            if meta['ref'] is None:
+                version = _Version(meta, meta_end, start + length - meta_end)
+            else:
+                version = _Version(meta, *meta['ref'])
+            self._index.setdefault(meta['url'], []).append(version)
+            if version.dict_id == 0 and meta['ref'] is None:
+                self._undictionaried += 1
+        elif kind == _TOMBSTONE:
+            self._index.pop(bytes(data[start:start + length]).decode(), None)
+
+    def _add_dict(self, dict_id: int, data: bytes):
+        self._dicts[dict_id] = zstandard.ZstdCompressionDict(data)
+        self._dict_id = max(self._dict_id, dict_id)
+
+    def _decompressor(self, dict_id: int) -> Any:
+        # zstd contexts are not thread safe, so each thread keeps its own
+        decompressors = getattr(self._local, 'decompressors', None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        if dict_id not in decompressors:
+            if dict_id:
+                decompressors[dict_id] = zstandard.ZstdDecompressor(
+                    dict_data=self._dicts[dict_id])
+            else:
+                decompressors[dict_id] = zstandard.ZstdDecompressor()
+        return decompressors[dict_id]
+
+    def _compressed(self, version: _Version) -> Tuple[bytes, Any]:
+        # Called with the lock held, so that clear() cannot shrink the file
+        # or drop the dictionary in between; decompressed after release
+        body = self._map(version.offset + version.length)[
+            version.offset:version.offset + version.length]
+        return body, self._decompressor(version.dict_id)
+
+    @staticmethod
+    def _entry(
+        url: str,
+        version: _Version,
+        compressed: Tuple[bytes, Any],
+    ) -> CacheEntry:
+        body, decompressor = compressed
+        content = decompressor.decompress(body, max_output_size=version.size)
+        return CacheEntry(url, content, version.etag, version.last_modified,
+                          version.fetched_at, version.expires_at)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            versions = self._index.get(url)
+            if not versions:
+                return None
+            version = versions[-1]
+            compressed = self._compressed(version)
+        return self._entry(url, version, compressed)
+
+    def get_version(
+        self,
+        url: str,
+        fetched_at: float,
+    ) -> Optional[CacheEntry]:
+        # The page as it was last fetched at or before `fetched_at`
+        with self._lock:
+            earlier = [version for version in self._index.get(url, ())
+                       if version.fetched_at <= fetched_at]
+            if not earlier:
+                return None
+            compressed = self._compressed(earlier[-1])
+        return self._entry(url, earlier[-1], compressed)
+
+    def versions(self, url: str) -> List[float]:
+        # Fetch dates of the stored versions, oldest first
+        with self._lock:
+            return [version.fetched_at for version in self._index.get(url, ())]
+
+    def urls(self) -> List[str]:
+        with self._lock:
+            return sorted(self._index)
+
+    # Appending to the file
+
+    def _append(self, kind: bytes, payload: bytes) -> int:
+        # Returns the payload's offset
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell() + _RECORD.size
+        self._file.write(_RECORD.pack(kind, len(payload)) + payload)
+        self._file.flush()
+        return offset
+
+    def _compressor(self, dict_id: int) -> Any:
+        if dict_id not in self._compressors:
+            if dict_id:
+                self._compressors[dict_id] = zstandard.ZstdCompressor(
+                    level=self.level, dict_data=self._dicts[dict_id])
+            else:
+                self._compressors[dict_id] = zstandard.ZstdCompressor(
+                    level=self.level)
+        return self._compressors[dict_id]
+
+    def set(self, entry: CacheEntry):
+        sha1 = hashlib.sha1(entry.content).hexdigest()
+        with self._lock:
+            versions = self._index.get(entry.url)
+            latest = versions[-1] if versions else None
+            meta = {
+                'url': entry.url,
+                'fetched_at': entry.fetched_at,
+                'expires_at': entry.expires_at,
+                'etag': entry.etag,
+                'last_modified': entry.last_modified,
+                'size': len(entry.content),
+                'sha1': sha1,
+                'ref': None,
+            }
+            if latest is not None and latest.sha1 == sha1:
+                # Revalidated or refetched unchanged: only the new fetch
+                # date and validators are written
+                meta['dict_id'] = latest.dict_id
+                meta['ref'] = [latest.offset, latest.length]
+                body = b''
+            else:
+                meta['dict_id'] = self._dict_id
+                body = self._compressor(self._dict_id).compress(
+                    entry.content)
+            encoded = json.dumps(meta).encode('utf-8')
+            offset = self._append(
+                _PAGE, _LENGTH.pack(len(encoded)) + encoded + body)
+            body_offset = offset + 4 + len(encoded)
+            if meta['ref'] is None:
+                version = _Version(meta, body_offset, len(body))
+            else:
+                version = _Version(meta, *meta['ref'])
+            self._index.setdefault(entry.url, []).append(version)
+            if meta['ref'] is None and meta['dict_id'] == 0:
+                self._undictionaried += 1
+                train = (self.train_after is not None and
+                         self._undictionaried >= self.train_after)
+            else:
+                train = False
+        # A page crossing the threshold while a dictionary is being
+        # trained is counted towards the next one instead
+        if train and self._train_lock.acquire(blocking=False):
+            try:
+                self._train()
+            finally:
+                self._train_lock.release()
+
+    def train(self, samples: Optional[List[bytes]] = None) -> int:
+        # Trains a dictionary on `samples` (by default the latest version
+        # of every stored page) and compresses later pages with it. Pages
+        # already stored keep the dictionary they were written with.
+        with self._train_lock:
+            return self._train(samples)
+
+    def _train(self, samples: Optional[List[bytes]] = None) -> int:
+        with self._lock:
+            trained_on = self._undictionaried
+        if samples is None:
+            entries = [self.get(url) for url in self.urls()]
+            samples = [entry.content for entry in entries if entry is not None]
+        chunks = [sample[i:i + SAMPLE_SIZE] for sample in samples
+                  for i in range(0, len(sample), SAMPLE_SIZE)]
+        trained = zstandard.train_dictionary(self.dict_size, chunks)
+        with self._lock:
+            dict_id = self._dict_id + 1
+            self._append(
+                _DICTIONARY, _LENGTH.pack(dict_id) + trained.as_bytes())
+            self._add_dict(dict_id, trained.as_bytes())
+            # Pages stored while training were compressed without it
+            self._undictionaried = max(
+                0, self._undictionaried - trained_on)
+        return dict_id
+
+    def delete(self, url: str):
+        # Appends a tombstone; the versions stay in the file but are no
+        # longer indexed
+        with self._lock:
+            if self._index.pop(url, None) is not None:
+                self._append(_TOMBSTONE, url.encode('utf-8'))
+
+    def clear(self):
+        with self._lock:
+            self._unmap()
+            self._file.truncate(_HEADER.size)
+            self._index.clear()
+            self._dicts.clear()
+            self._compressors.clear()
+            self._local = threading.local()
+            self._dict_id = 0
+            self._undictionaried = 0
+
+    def size(self) -> int:
+        # Bytes on disk
+        with self._lock:
+            self._file.flush()
+            return os.fstat(self._file.fileno()).st_size
+
+    def content_size(self) -> int:
+        # Bytes the distinct stored page bodies take uncompressed
+        with self._lock:
+            return sum(
+                version.size
+                for versions in self._index.values()
+                for version in {v.offset: v for v in versions}.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+            self._file.close()
@@ -0,0 +1,4 @@
+# Backend names live here so the CLI can list them without importing bs4
+BS4 = 'bs4'
+LXML = 'lxml'
+BACKENDS = (BS4, LXML)
@@ -0,0 +1,220 @@
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+from pfr_api.parse import BACKENDS, BS4, LXML
+
+
+DEFAULT_BACKEND = LXML if etree is not None else BS4
+
+# Attributes BeautifulSoup treats as whitespace-separated lists
+MULTI_VALUED_ATTRIBUTES = frozenset(['class', 'rel', 'rev', 'headers'])
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    if backend is None:
+        return DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(
+            'Unknown parsing backend {!r}, expected one of {}'
+            .format(backend, BACKENDS))
+    if backend == LXML and etree is None:
+        raise ImportError('The lxml backend requires the lxml package')
+    return backend
+
+
+class Cell(object):
+    """The parts of a table cell `RowParser`s rely on, read from lxml."""
+
+    __slots__ = ('text', '_element')
+
+    def __init__(self, text: str, element: Any):
+        self.text = text
+        self._element = element
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return dict(self._element.attrib)
+
+    def __getitem__(self, key: str) -> str:
+        value = self._element.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._element.get(key, default)
+
+    def find(self, name: str) -> Optional['Cell']:
+        # The first descendant tag called `name`, like bs4's Tag.find
+        element = self._element.find('.//' + name)
+        if element is None:
+            return None
+        return Cell(_lxml_text(element), element)
+
+
+def _matches_value(value: Optional[str], matcher: Any) -> bool:
+    if matcher is True:
+        return value is not None
+    if matcher is None or matcher is False:
+        return value is None
+    if callable(matcher):
+        return bool(matcher(value))
+    if value is None:
+        return False
+    if hasattr(matcher, 'search'):
+        return matcher.search(value) is not None
+    if isinstance(matcher, (list, tuple, set, frozenset)):
+        return any(_matches_value(value, m) for m in matcher)
+    return value == matcher
+
+
+def matches_attributes(
+    attrs: Dict[str, str],
+    stat_row_attributes: Dict[str, Any],
+) -> bool:
+    # Mirrors BeautifulSoup's find_all(**attrs) matching, including trying
+    # each class of a multi-valued attribute individually
+    for name, matcher in stat_row_attributes.items():
+        value = attrs.get(name)
+        if name in MULTI_VALUED_ATTRIBUTES and value is not None:
+            values = value.split() or ['']
+            if any(_matches_value(v, matcher) for v in values):
+                continue
+            if len(values) > 1 and _matches_value(' '.join(values), matcher):
+                continue
+            return False
+        if not _matches_value(value, matcher):
+            return False
+    return True
+
+
+def table_markup(content: bytes, table_id: str) -> Optional[bytes]:
+    # The table's raw markup, found by scanning the page's bytes; tables
+    # the site ships inside HTML comments are found too
+    match = re.search(
+        r'<table\b[^>]*\bid="{}"'.format(re.escape(table_id)).encode(),
+        content)
+    if match is None:
+        return None
+    end = content.find(b'</table>', match.end())
+    end = len(content) if end < 0 else end + len(b'</table>')
+    return content[match.start():end]
+
+
+def find_table(content: bytes, table_id: str) -> Optional[Any]:
+    # Only the target table is handed to lxml; the rest of the page,
+    # including tables hidden in HTML comments, is never parsed
+    markup = table_markup(content, table_id)
+    if markup is None:
+        return None
+    parser = etree.HTMLParser(encoding='utf-8')
+    root = etree.fromstring(markup, parser)
+    return root.find('.//table')
+
+
+def _lxml_text(element: Any) -> str:
+    # Most cells hold bare text; only walk the subtree for linked cells
+    if len(element):
+        return ''.join(element.itertext())
+    return element.text or ''
+
+
+def lxml_table_columns(table: Any) -> List[Tuple[str, str]]:
+    thead = table.find('thead')
+    header_row = thead.findall('tr')[-1]
+    return [
+        (column.get('data-stat'), _lxml_text(column))
+        for column in header_row.iterchildren('th')
+    ]
+
+
+def lxml_table_rows(
+    table: Any,
+    stat_row_attributes: Dict[str, Any],
+    raw: bool = False,
+    row_header: bool = False,
+) -> Iterator[List[Any]]:
+    tbody = table.find('tbody')
+    tags = ('th', 'td') if row_header else ('td',)
+    for row in tbody.iterchildren('tr'):
+        if stat_row_attributes and not matches_attributes(
+                row.attrib, stat_row_attributes):
+            continue
+        cells = list(row.iterchildren(*tags))
+        if raw:
+            yield cells
+        else:
+            yield [Cell(_lxml_text(cell), cell) for cell in cells]
+
+
+def bs4_table_columns(table: BeautifulSoup) -> List[Tuple[str, str]]:
+    html_columns = table.find('thead').find_all('tr')[-1]
+    return [
+        (column['data-stat'], column.text)
+        for column in html_columns.find_all('th')
+    ]
+
+
+def bs4_table_rows(
+    table: BeautifulSoup,
+    stat_row_attributes: Dict[str, Any],
+    raw: bool = False,
+    row_header: bool = False,
+) -> Iterator[List[Tag]]:
+    html_body = table.find('tbody')
+    html_rows = html_body.find_all(
+        'tr', recursive=False, **stat_row_attributes)
+    tags = ['th', 'td'] if row_header else 'td'
+    for html_row in html_rows:
+        yield html_row.find_all(tags, recursive=False)
+
+
+def table_columns(table: Any) -> List[Tuple[str, str]]:
+    if isinstance(table, Tag):
+        return bs4_table_columns(table)
+    return lxml_table_columns(table)
+
+
+def table_rows(
+    table: Any,
+    stat_row_attributes: Dict[str, Any],
+    raw: bool = False,
+    row_header: bool = False,
+) -> Iterator[List[Any]]:
+    # With raw=True rows hold the backend's own cell elements, to be read
+    # with cell_text()/wrap_cell(). With row_header=True each row's leading
+    # <th> (a player rather than a rank on boxscores) is kept as a cell.
+    if isinstance(table, Tag):
+        return bs4_table_rows(table, stat_row_attributes, raw, row_header)
+    return lxml_table_rows(table, stat_row_attributes, raw, row_header)
+
+
+def _bs4_text(cell: Tag) -> str:
+    return cell.text
+
+
+def _bs4_cell(cell: Tag) -> Tag:
+    return cell
+
+
+def _lxml_cell(cell: Any) -> Cell:
+    return Cell(_lxml_text(cell), cell)
+
+
+def cell_text(table: Any) -> Callable[[Any], str]:
+    if isinstance(table, Tag):
+        return _bs4_text
+    return _lxml_text
+
+
+def wrap_cell(table: Any) -> Callable[[Any], Any]:
+    if isinstance(table, Tag):
+        return _bs4_cell
+    return _lxml_cell
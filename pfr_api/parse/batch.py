@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, \
+    Union
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api.page import Page
+from pfr_api.parse import parse as parse_module
+from pfr_api.parse.parse import PARSERS, columns_to_frame, \
+    parse_stats_columns
+from pfr_api.parse.parser import RowParser
+
+
+PageSource = Union[bytes, str, os.PathLike]
+
+
+def _init_worker(parsers: Dict[str, RowParser]):
+    # Workers may have been spawned rather than forked, so they get the
+    # parent's view of the registry including any runtime registrations
+    parse_module.PARSERS.clear()
+    parse_module.PARSERS.update(parsers)
+
+
+def _read(page: PageSource) -> Tuple[str, bytes]:
+    if isinstance(page, bytes):
+        return '<bytes>', page
+    with open(page, 'rb') as f:
+        return os.fspath(page), f.read()
+
+
+def parse_page_columns(
+    page: PageSource,
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    backend: Optional[str] = None,
+) -> Tuple[List[str], List[Any]]:
+    name, content = _read(page)
+    table = Page(name, content, backend).table(table_id)
+    if table is None:
+        raise KeyError('No table {!r} on {}'.format(table_id, name))
+    # Typed arrays pickle as whole buffers rather than row by row
+    return parse_stats_columns(table, stat_row_attributes, parsers)
+
+
+def _parse_task(args: Tuple[Any, ...]) -> Tuple[List[str], List[Any]]:
+    return parse_page_columns(*args)
+
+
+def parse_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(dict(PARSERS),))
+
+
+def iter_parse_pages(
+    pages: Iterable[PageSource],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    backend: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> 'Iterator[pd.DataFrame]':
+    # Frames come back in the order of `pages`. stat_row_attributes and
+    # parsers must be picklable, so use named functions over lambdas.
+    own_executor = executor is None
+    if own_executor:
+        executor = parse_pool(max_workers)
+    tasks = (
+        (page, table_id, stat_row_attributes, parsers, backend)
+        for page in pages
+    )
+    try:
+        for columns, data in executor.map(
+                _parse_task, tasks, chunksize=chunksize):
+            yield columns_to_frame(columns, data)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def parse_pages(
+    pages: Iterable[PageSource],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    backend: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> 'List[pd.DataFrame]':
+    return list(iter_parse_pages(
+        pages, table_id, stat_row_attributes, parsers, backend, executor,
+        max_workers, chunksize))
@@ -0,0 +1,97 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api.parse.parse import compact_dtypes
+from pfr_api.parse.parser import CATEGORY, DATE, FLOAT, INTEGER, RowParser
+
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _to_integer(column: 'pd.Series') -> 'pd.Series':
+    if column.dtype.kind not in 'iuf':
+        try:
+            column = pd.to_numeric(column)
+        except (TypeError, ValueError):
+            return column
+    if column.dtype.kind == 'f':
+        # Row-mode frames hold nullable ints as floats with NaN
+        values = column.to_numpy()
+        present = values[~np.isnan(values)]
+        if not np.array_equal(present, np.round(present)):
+            return column
+        column = column.astype('Int64')
+    return pd.to_numeric(column, downcast='integer')
+
+
+def _to_float(column: 'pd.Series') -> 'pd.Series':
+    # Compact frames hold the same values: float32 only when every value
+    # survives the round trip, which most decimal rates do not
+    column = pd.to_numeric(column)
+    if column.dtype != np.float64:
+        return column
+    values = column.to_numpy()
+    narrowed = values.astype(np.float32)
+    if not np.array_equal(narrowed.astype(np.float64), values,
+                          equal_nan=True):
+        return column
+    return pd.Series(narrowed, index=column.index, name=column.name)
+
+
+def _to_category(column: 'pd.Series') -> 'pd.Series':
+    return column.astype('category')
+
+
+def _to_date(column: 'pd.Series') -> 'pd.Series':
+    if column.dtype.kind == 'M':
+        return column
+    dates = pd.to_datetime(column, format=DATE_FORMAT, errors='coerce')
+    # Columns sharing a stat name across pages may hold other formats;
+    # those are kept as text rather than silently turned into NaT
+    if (dates.isna() & column.notna() & (column != '')).any():
+        return column
+    return dates
+
+
+_CONVERTERS = {
+    CATEGORY: _to_category,
+    INTEGER: _to_integer,
+    FLOAT: _to_float,
+    DATE: _to_date,
+}
+
+
+def memory_usage(frame: 'pd.DataFrame') -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def compact_frame(
+    frame: 'pd.DataFrame',
+    parsers: Optional[Dict[str, RowParser]] = None,
+) -> 'pd.DataFrame':
+    # Low-cardinality text to categories, numbers to the smallest dtype
+    # that holds them and dates to datetime64, following the compact
+    # dtypes the parsers declare. The saving is reported in
+    # frame.attrs['memory'].
+    dtypes = compact_dtypes(parsers)
+    before = memory_usage(frame)
+    columns = {}
+    for i, name in enumerate(frame.columns):
+        column = frame.iloc[:, i]
+        converter = _CONVERTERS.get(dtypes.get(name))
+        columns[i] = converter(column) if converter is not None else column
+    compact = pd.DataFrame(columns, index=frame.index)
+    compact.columns = frame.columns
+    after = memory_usage(compact)
+    compact.attrs['memory'] = {
+        'before': before,
+        'after': after,
+        'saved': before - after,
+    }
+    return compact
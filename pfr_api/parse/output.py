@@ -0,0 +1,169 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+from pfr_api.parse.parser import CATEGORY, DATE, FLOAT, INTEGER
+
+
+PANDAS = 'pandas'
+ARROW = 'arrow'
+RECORDS = 'records'
+NUMPY = 'numpy'
+OUTPUTS = (PANDAS, ARROW, RECORDS, NUMPY)
+
+
+def check_output(output: str):
+    if output not in OUTPUTS:
+        raise ValueError('Unknown output {!r}, expected one of {}'.format(
+            output, ', '.join(OUTPUTS)))
+    if output == PANDAS and pd is None:
+        raise ImportError(
+            "DataFrame output requires pandas; output='arrow', 'records' "
+            "and 'numpy' do not")
+    if output == ARROW and pa is None:
+        raise ImportError('Arrow output requires pyarrow')
+
+
+def check_compact(compact: bool, output: str):
+    # Arrow output is compactly typed already; records and arrays have no
+    # smaller form
+    if compact and output != PANDAS:
+        raise ValueError('compact only applies to pandas output, not {!r}'
+                         .format(output))
+
+
+def _to_dates(values: np.ndarray) -> Optional[np.ndarray]:
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    try:
+        return np.array([value if value else None for value in values],
+                        dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        # As in compact frames, dates in other formats are kept as text
+        return None
+
+
+def _column_values(values: Any, dtype: Optional[str]) -> Any:
+    # The parsers' columnar output, with dates as datetime64[D]; other
+    # types are already what each parser's convert() settled on
+    if not isinstance(values, np.ndarray):
+        values = np.array(values, dtype=object)
+    if dtype == DATE:
+        dates = _to_dates(values)
+        if dates is not None:
+            return dates
+    return values
+
+
+def _first_columns(
+    columns: List[str],
+    data: List[Any],
+) -> Dict[str, Any]:
+    # Records and arrays are keyed by name; with repeated column names the
+    # first one is used
+    named = {}  # type: Dict[str, Any]
+    for name, values in zip(columns, data):
+        named.setdefault(name, values)
+    return named
+
+
+def _arrow_array(values: Any, dtype: Optional[str]) -> Any:
+    if isinstance(values, np.ma.MaskedArray):
+        return pa.array(values.data, mask=np.ma.getmaskarray(values),
+                        type=pa.int64())
+    if values.dtype.kind == 'M':
+        return pa.array(values, from_pandas=True)
+    if dtype == INTEGER and values.dtype.kind in 'iu':
+        return pa.array(values, type=pa.int64())
+    if dtype == FLOAT and values.dtype.kind == 'f':
+        # NaN only ever stands for a missing cell
+        return pa.array(values, type=pa.float64(), from_pandas=True)
+    if dtype == CATEGORY:
+        return pa.array(values, type=pa.string(),
+                        from_pandas=True).dictionary_encode()
+    return pa.array(values, from_pandas=True)
+
+
+def to_arrow(
+    columns: List[str],
+    data: List[Any],
+    dtypes: Dict[str, str],
+) -> 'pa.Table':
+    # Typed arrays straight from the converted columns: nullable ints stay
+    # int64 with a validity mask, categories are dictionary encoded and
+    # dates are date32, following the dtypes the parsers declare
+    arrays = [
+        _arrow_array(_column_values(values, dtypes.get(name)),
+                     dtypes.get(name))
+        for name, values in zip(columns, data)
+    ]
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+
+def _python_values(values: Any) -> List[Any]:
+    if isinstance(values, np.ma.MaskedArray):
+        return values.tolist()
+    if values.dtype.kind == 'f':
+        return [None if value != value else value
+                for value in values.tolist()]
+    if values.dtype.kind == 'M':
+        # datetime64[ns] would come back as ints
+        return values.astype('datetime64[us]').tolist()
+    return values.tolist()
+
+
+def to_records(
+    columns: List[str],
+    data: List[Any],
+    dtypes: Dict[str, str],
+) -> List[Dict[str, Any]]:
+    # One dict of plain Python values per row, missing values as None
+    named = _first_columns(columns, data)
+    values = [
+        _python_values(_column_values(column, dtypes.get(name)))
+        for name, column in named.items()
+    ]
+    names = list(named)
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def to_numpy(
+    columns: List[str],
+    data: List[Any],
+    dtypes: Dict[str, str],
+) -> Dict[str, np.ndarray]:
+    # Column name -> array; nullable ints are masked int64 arrays, missing
+    # floats are NaN, dates datetime64[D] and text object arrays
+    return {
+        name: _column_values(values, dtypes.get(name))
+        for name, values in _first_columns(columns, data).items()
+    }
+
+
+_CONVERTERS = {
+    ARROW: to_arrow,
+    RECORDS: to_records,
+    NUMPY: to_numpy,
+}
+
+
+def convert_output(
+    columns: List[str],
+    data: List[Any],
+    output: str,
+    dtypes: Dict[str, str],
+) -> Any:
+    # Columnar parse output in any of OUTPUTS except pandas, which
+    # columns_to_frame builds
+    check_output(output)
+    return _CONVERTERS[output](columns, data, dtypes)
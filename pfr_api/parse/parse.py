@@ -1,16 +1,32 @@
-from typing import Any, Dict, List, Optional, Tuple
+import functools
+import hashlib
+import operator
+from typing import Any, Callable, Dict, Iterable, Iterator, List, \
+    Optional, Tuple
 
-from bs4 import BeautifulSoup
+import numpy as np
 
-from pfr_api.parse.parser import RowParser, IdentityParser, \
-    StrToIntParser, NullableStrToIntParser, \
-    NullableStrToFloatParser, StrPercentageToFloatParser, \
-    NullableStrPercentageToFloatParser
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
 
+from pfr_api.parse.backends import cell_text, table_columns, \
+    table_rows, wrap_cell, _matches_value
+from pfr_api.parse.output import PANDAS, check_output, convert_output
+from pfr_api.parse.parser import CATEGORY, DATE, RowParser, \
+    UnaryFieldParser, IdentityParser, StrToIntParser, \
+    NullableStrToIntParser, NullableStrToFloatParser, \
+    StrPercentageToFloatParser, NullableStrPercentageToFloatParser
+
+
+# Bumped when parsing changes in ways the parsers' signatures do not show,
+# so that cached results are not reused across the change
+PARSE_VERSION = 1
 
 PARSERS = {
     'year_id': StrToIntParser('year_id'),
-    'gs': IdentityParser('gs'),   # TODO make this a boolean
+    'gs': IdentityParser('gs', CATEGORY),   # TODO make this a boolean
 
     # Passing
     'pass_cmp': NullableStrToIntParser('pass_cmp'),
@@ -22,6 +38,7 @@ PARSERS = {
     'pass_rating': NullableStrToFloatParser('pass_rating'),
     'pass_sacked': NullableStrToIntParser('pass_sacked'),
     'pass_sacked_yds': NullableStrToIntParser('pass_sacked_yds'),
+    'pass_long': NullableStrToIntParser('pass_long'),
     'pass_yds_per_att': NullableStrToFloatParser('pass_yds_per_att'),
     'pass_adj_yds_per_att': NullableStrToFloatParser('pass_adj_yds_per_att'),
     'qb_rec': IdentityParser('qb_rec'),
@@ -62,7 +79,7 @@ PARSERS = {
     'rush_td': NullableStrToIntParser('rush_td'),
     'rush_td_perc': NullableStrPercentageToFloatParser('rush_td_perc'),
     'rush_first_down': NullableStrToIntParser('rush_first_down'),
-    'rush_long': NullableStrToIntParser('rush_first_down'),
+    'rush_long': NullableStrToIntParser('rush_long'),
     'rush_yds_per_g': NullableStrToFloatParser('rush_yds_per_g'),
     'rush_att_per_g': NullableStrToFloatParser('rush_att_per_g'),
     'targets': NullableStrToIntParser('targets'),
@@ -73,7 +90,7 @@ PARSERS = {
     'catch_pct': StrPercentageToFloatParser('catch_pct'),
     'rec_yds_per_tgt': NullableStrToFloatParser('rec_yds_per_tgt'),
     'rec_first_down': NullableStrToIntParser('rec_first_down'),
-    'rec_long': NullableStrToIntParser('rec_first_down'),
+    'rec_long': NullableStrToIntParser('rec_long'),
     'rec_yds_per_g': NullableStrToFloatParser('rec_yds_per_g'),
     'rec_att_per_g': NullableStrToFloatParser('rec_att_per_g'),
     'touches': NullableStrToIntParser('touches'),
@@ -130,10 +147,12 @@ PARSERS = {
     'kick_ret_yds': NullableStrToIntParser('kick_ret_yds'),
     'kick_ret_yds_per_ret': NullableStrToFloatParser('kick_ret_yds_per_ret'),
     'kick_ret_td': NullableStrToIntParser('kick_ret_td'),
+    'kick_ret_long': NullableStrToIntParser('kick_ret_long'),
     'punt_ret': NullableStrToIntParser('punt_ret'),
     'punt_ret_yds': NullableStrToIntParser('punt_ret_yds'),
     'punt_ret_yds_per_ret': NullableStrToFloatParser('punt_ret_yds_per_ret'),
     'punt_ret_td': NullableStrToIntParser('punt_ret_td'),
+    'punt_ret_long': NullableStrToIntParser('punt_ret_long'),
     'special_teams': NullableStrToIntParser('special_teams'),
     'st_pct': NullableStrPercentageToFloatParser('st_pct'),
 
@@ -151,14 +170,15 @@ PARSERS = {
     'def_int': NullableStrToIntParser('def_int'),
     'def_int_yds': NullableStrToIntParser('def_int_yds'),
     'def_int_td': NullableStrToIntParser('def_int_td'),
+    'def_int_long': NullableStrToIntParser('def_int_long'),
     'pass_defended': NullableStrToIntParser('pass_defended'),
     'defense': NullableStrToIntParser('defense'),
     'def_pct': NullableStrPercentageToFloatParser('def_pct'),
 
     # Fantasy-specific
     'player': IdentityParser('player'),
-    'fantasy_pos': IdentityParser('fantasy_pos'),
-    'starter_pos': IdentityParser('starter_pos'),
+    'fantasy_pos': IdentityParser('fantasy_pos', CATEGORY),
+    'starter_pos': IdentityParser('starter_pos', CATEGORY),
     'g': NullableStrToIntParser('g'),
     # 'gs': _str_to_int_parser('gs'),  TODO how to handle ambiguity
     'two_pt_pass': NullableStrToFloatParser('two_pt_pass'),
@@ -196,22 +216,34 @@ PARSERS = {
     'points_avg': NullableStrToFloatParser('points_avg'),
 
     # Game info
-    'game_date': IdentityParser('game_date'),  # TODO datetime
+    'game_date': IdentityParser('game_date', DATE),
     'game_num': StrToIntParser('game_num'),
     'week_num': StrToIntParser('week_num'),
     'age': IdentityParser('age'),
-    'team': IdentityParser('team'),
-    'game_location': IdentityParser('game_location'),
-    'game_result': IdentityParser('game_result'),
+    'team': IdentityParser('team', CATEGORY),
+    'game_location': IdentityParser('game_location', CATEGORY),
+    'game_result': IdentityParser('game_result', CATEGORY),
     'week': StrToIntParser('week'),
-    'day': IdentityParser('day'),
-    'date': IdentityParser('date'),  # TODO datetime
+    'day': IdentityParser('day', CATEGORY),
+    'date': IdentityParser('date', DATE),
     'game_time': IdentityParser('game_time'),  # TODO datetime,
-    'boxscore_word': IdentityParser('boxscore_word'),
-    'game_outcome': IdentityParser('game_outcome'),
-    'overtime': IdentityParser('overtime'),
+    'boxscore_word': IdentityParser('boxscore_word', CATEGORY),
+    'game_outcome': IdentityParser('game_outcome', CATEGORY),
+    'overtime': IdentityParser('overtime', CATEGORY),
     'team_record': IdentityParser('team_record'),
-    'opp': IdentityParser('opp'),
+    'opp': IdentityParser('opp', CATEGORY),
+
+    # Season schedule
+    'game_day_of_week': IdentityParser('game_day_of_week', CATEGORY),
+    'gametime': IdentityParser('gametime'),
+    'winner': IdentityParser('winner', CATEGORY),
+    'loser': IdentityParser('loser', CATEGORY),
+    'pts_win': NullableStrToIntParser('pts_win'),
+    'pts_lose': NullableStrToIntParser('pts_lose'),
+    'yards_win': NullableStrToIntParser('yards_win'),
+    'to_win': NullableStrToIntParser('to_win'),
+    'yards_lose': NullableStrToIntParser('yards_lose'),
+    'to_lose': NullableStrToIntParser('to_lose'),
 
     # Team game stats
     'pts_off': StrToIntParser('pts_off'),
@@ -233,49 +265,365 @@ PARSERS = {
 }  # type: Dict[str, RowParser]
 
 
-def parse_stats_table(
-    table: BeautifulSoup,
-    stat_row_attributes: Optional[Dict[str, Any]] = None,
+def registry_version(parsers: Optional[Dict[str, RowParser]] = None) -> str:
+    # Changes whenever PARSERS (with the given overrides) would parse any
+    # column differently. Hashed once per registry and set of overrides;
+    # registering a parser replaces it in PARSERS, which changes the key.
+    return _registry_version(
+        tuple(PARSERS.items()), tuple(sorted(
+            (stat, parser.signature)
+            for stat, parser in (parsers or {}).items())))
+
+
+@functools.lru_cache(maxsize=64)
+def _registry_version(
+    registry: Tuple[Tuple[str, RowParser], ...],
+    overrides: Tuple[Tuple[str, str], ...],
+) -> str:
+    signatures = {stat: parser.signature for stat, parser in registry}
+    signatures.update(overrides)
+    digest = hashlib.sha1(str(PARSE_VERSION).encode('utf-8'))
+    for stat, signature in sorted(signatures.items()):
+        digest.update('{}={};'.format(stat, signature).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def compact_dtypes(
     parsers: Optional[Dict[str, RowParser]] = None,
-) -> Tuple[List[str], List[List[Any]]]:
-    if stat_row_attributes is None:
-        stat_row_attributes = {}
+) -> Dict[str, str]:
+    # Output field -> compact storage, as declared by the parsers
+    dtypes = {}
+    for parser in {**PARSERS, **(parsers or {})}.values():
+        for field, dtype in parser.compact_dtypes.items():
+            if dtype is not None:
+                dtypes[field] = dtype
+    return dtypes
+
+
+def _batched(
+    rows: Iterator[List[Any]],
+    batch_size: int,
+) -> Iterator[List[List[Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
+
+def stats_row_parser(
+    column_infos: List[Tuple[str, str]],
+    parsers: Optional[Dict[str, RowParser]] = None,
+) -> Tuple[List[str], Callable[[List[Any]], List[Any]]]:
+    # Output columns for the table's (already ranker-less) header, and a
+    # function turning the cells of one row into a row of parsed values
     if parsers is None:
         parsers = {}  # type: Dict[str, RowParser]
 
     parsers = {**PARSERS, **parsers}
 
-    column_infos = []
-    html_columns = table.find('thead').find_all('tr')[-1]
-    for column in html_columns.find_all('th'):
-        stat = column['data-stat']
-        name = column.text
-        column_infos.append((stat, name))
-    column_infos = column_infos[1:]  # Skip the ranker column
-
+    column_parsers = [parsers[column_stat] for column_stat, _ in column_infos]
     output_columns = []
-    for column_stat, column_name in column_infos:
-        parser = parsers[column_stat]
+    for parser in column_parsers:
         output_columns.extend(parser.output_fields)
 
-    rows = []
-    html_body = table.find('tbody')
-    html_rows = html_body.find_all(
-        'tr', recursive=False, **stat_row_attributes)
-    for html_row in html_rows:
+    def parse_row(html_row_cols: List[Any]) -> List[Any]:
         row = [None] * len(output_columns)
         field_count = 0
-        for i, ((column_stat, column_name), html_row_col) in enumerate(
-            zip(column_infos, html_row.find_all('td', recursive=False))
-        ):
-            parser = parsers[column_stat]
+        for parser, html_row_col in zip(column_parsers, html_row_cols):
             parsed = parser.parse(html_row_col)
             num_fields = len(parsed)
-            # Assumption: .values() will return the fields in the order returned
-            # by .output_fields
+            # Assumption: .values() will return the fields in the order
+            # returned by .output_fields
             row[field_count:field_count+num_fields] = parsed.values()
             field_count += num_fields
-        rows.append(row)
+        return row
+
+    return output_columns, parse_row
+
+
+def _stat_columns(table: Any, row_header: bool) -> List[Tuple[str, str]]:
+    column_infos = table_columns(table)
+    if row_header:
+        return column_infos
+    return column_infos[1:]  # Skip the ranker column
+
+
+class _Bound(object):
+    # A `where` matcher comparing a numeric cell with a bound; blank and
+    # non-numeric cells never match. Its repr identifies it in cache keys.
+
+    def __init__(self, name: str, bound: float, compare: Callable):
+        self.name = name
+        self.bound = bound
+        self.compare = compare
+
+    def __call__(self, value: Optional[str]) -> bool:
+        if not value:
+            return False
+        try:
+            number = float(value.rstrip('%'))
+        except ValueError:
+            return False
+        return self.compare(number, self.bound)
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(self.name, self.bound)
+
+
+def at_least(bound: float) -> Callable[[Optional[str]], bool]:
+    return _Bound('at_least', bound, operator.ge)
+
+
+def at_most(bound: float) -> Callable[[Optional[str]], bool]:
+    return _Bound('at_most', bound, operator.le)
+
+
+class Selection(object):
+    """The cells of a table to parse: projected columns and filtered rows.
+
+    `columns` are output fields; header columns none of whose fields are
+    asked for are never read. `where` maps a stat to a matcher, tested
+    against each row's raw cell text as in stat_row_attributes (a missing
+    cell is None), so rows are dropped before any cell is converted.
+    """
+
+    def __init__(
+        self,
+        column_infos: List[Tuple[str, str]],
+        parsers: Dict[str, RowParser],
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ):
+        positions = {}  # type: Dict[str, int]
+        for i, (column_stat, _) in enumerate(column_infos):
+            positions.setdefault(column_stat, i)
+        # Predicates on stats the table does not have see a missing cell
+        self.predicates = [
+            (positions.get(stat), matcher)
+            for stat, matcher in (where or {}).items()
+        ]  # type: List[Tuple[Optional[int], Any]]
+
+        wanted = None if columns is None else set(columns)
+        self.indices = [
+            i for i, (column_stat, _) in enumerate(column_infos)
+            if wanted is None or
+            wanted.intersection(parsers[column_stat].output_fields)
+        ]
+        self.column_infos = [column_infos[i] for i in self.indices]
+        fields = [field for column_stat, _ in self.column_infos
+                  for field in parsers[column_stat].output_fields]
+        # Positions of the kept fields of the selected columns' parsers,
+        # which may also produce fields that were not asked for
+        self.fields = [j for j, field in enumerate(fields)
+                       if wanted is None or field in wanted]
+        self.output_columns = [fields[j] for j in self.fields]
+        self.projects = len(self.indices) < len(column_infos)
+        self.trims = len(self.fields) < len(fields)
+
+    @property
+    def selects_all(self) -> bool:
+        return not (self.predicates or self.projects or self.trims)
+
+    def matches(self, cells: List[Any], text: Callable[[Any], str]) -> bool:
+        for i, matcher in self.predicates:
+            value = text(cells[i]) if i is not None and i < len(cells) \
+                else None
+            if not _matches_value(value, matcher):
+                return False
+        return True
+
+    def rows(
+        self,
+        rows: Iterable[List[Any]],
+        text: Callable[[Any], str],
+    ) -> Iterator[List[Any]]:
+        # The selected cells of each matching row. Indices are ascending,
+        # so a short row loses only trailing cells, as it would unselected.
+        for cells in rows:
+            if self.predicates and not self.matches(cells, text):
+                continue
+            if self.projects:
+                count = len(cells)
+                cells = [cells[i] for i in self.indices if i < count]
+            yield cells
+
+    def trim(self, values: List[Any]) -> List[Any]:
+        if not self.trims:
+            return values
+        return [values[j] for j in self.fields]
+
+    def convert(
+        self,
+        converted: Tuple[List[str], List[Any]],
+    ) -> Tuple[List[str], List[Any]]:
+        # Drops unrequested fields from convert_columns' output
+        columns, data = converted
+        return self.trim(columns), self.trim(data)
 
+
+def iter_stats_table(
+    table: Any,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    batch_size: Optional[int] = None,
+    row_header: bool = False,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], Iterator[Any]]:
+    # Lazy variant of parse_stats_table: rows are parsed as the <tbody> is
+    # walked, one at a time or in lists of `batch_size`
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('batch_size must be positive, got {}'.format(
+            batch_size))
+
+    if stat_row_attributes is None:
+        stat_row_attributes = {}
+
+    column_infos = _stat_columns(table, row_header)
+    selection = Selection(
+        column_infos, {**PARSERS, **(parsers or {})}, columns, where)
+    if selection.selects_all:
+        output_columns, parse_row = stats_row_parser(column_infos, parsers)
+        rows = map(parse_row, table_rows(
+            table, stat_row_attributes, row_header=row_header))
+    else:
+        # Raw cells are filtered and projected first; only the selected
+        # cells of matching rows are wrapped and parsed
+        _, parse_row = stats_row_parser(selection.column_infos, parsers)
+        output_columns = selection.output_columns
+        wrap = wrap_cell(table)
+        rows = (
+            selection.trim(parse_row([wrap(cell) for cell in cells]))
+            for cells in selection.rows(
+                table_rows(table, stat_row_attributes, raw=True,
+                           row_header=row_header),
+                cell_text(table)))
+    if batch_size is not None:
+        return output_columns, _batched(rows, batch_size)
     return output_columns, rows
+
+
+def parse_stats_table(
+    table: Any,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    row_header: bool = False,
+    output: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Any:
+    # `table` is either a BeautifulSoup tag or an lxml element, see
+    # pfr_api.parse.backends. Returns (columns, rows), or with `output`
+    # the table in that form, see columns_to_output. `columns` and `where`
+    # narrow the table before it is parsed, see Selection.
+    if output is not None:
+        check_output(output)
+        output_columns, data = parse_stats_columns(
+            table, stat_row_attributes, parsers, row_header, columns, where)
+        return columns_to_output(output_columns, data, output, parsers)
+    output_columns, rows = iter_stats_table(
+        table, stat_row_attributes, parsers, row_header=row_header,
+        columns=columns, where=where)
+    return output_columns, list(rows)
+
+
+def parse_stats_columns(
+    table: Any,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    row_header: bool = False,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], List[Any]]:
+    # Columnar variant of parse_stats_table: cells are gathered per column
+    # and converted in bulk, returning one typed array per output column
+    if stat_row_attributes is None:
+        stat_row_attributes = {}
+
+    if parsers is None:
+        parsers = {}  # type: Dict[str, RowParser]
+
+    parsers = {**PARSERS, **parsers}
+
+    column_infos = _stat_columns(table, row_header)
+    selection = Selection(column_infos, parsers, columns, where)
+    text = cell_text(table)
+
+    column_cells = [
+        [] for _ in selection.column_infos]  # type: List[List[Any]]
+    for html_row_cols in selection.rows(table_rows(
+            table, stat_row_attributes, raw=True, row_header=row_header),
+            text):
+        for cells, html_row_col in zip(column_cells, html_row_cols):
+            cells.append(html_row_col)
+        # Rows with fewer cells than columns are padded with missing values
+        for cells in column_cells[len(html_row_cols):]:
+            cells.append(None)
+
+    return selection.convert(convert_columns(
+        selection.column_infos, column_cells, parsers, text,
+        wrap_cell(table)))
+
+
+def convert_columns(
+    column_infos: List[Tuple[str, str]],
+    column_cells: List[List[Any]],
+    parsers: Dict[str, RowParser],
+    text: Callable[[Any], str],
+    wrap: Callable[[Any], Any],
+) -> Tuple[List[str], List[Any]]:
+    # `text` and `wrap` turn a gathered cell into what unary and other
+    # parsers take; missing cells are None
+    output_columns = []
+    data = []
+    for (column_stat, column_name), cells in zip(column_infos, column_cells):
+        parser = parsers[column_stat]
+        output_columns.extend(parser.output_fields)
+        if isinstance(parser, UnaryFieldParser):
+            # Single-field parsers only need the cell text
+            data.append(parser.convert([
+                text(cell) if cell is not None else None for cell in cells]))
+        else:
+            data.extend(parser.parse_column([
+                wrap(cell) if cell is not None else None for cell in cells]))
+
+    return output_columns, data
+
+
+def _frame_values(values: Any) -> Any:
+    if isinstance(values, np.ma.MaskedArray):
+        return pd.arrays.IntegerArray(
+            values.data, np.ma.getmaskarray(values))
+    return values
+
+
+def columns_to_frame(
+    columns: List[str],
+    data: List[Any],
+) -> 'pd.DataFrame':
+    # Built positionally so repeated column names survive, as they do in
+    # pd.DataFrame(columns=columns, data=rows)
+    check_output(PANDAS)
+    frame = pd.DataFrame(
+        {i: _frame_values(values) for i, values in enumerate(data)})
+    frame.columns = columns
+    return frame
+
+
+def columns_to_output(
+    columns: List[str],
+    data: List[Any],
+    output: str = PANDAS,
+    parsers: Optional[Dict[str, RowParser]] = None,
+) -> Any:
+    # Columnar parse output as a DataFrame ('pandas'), a pyarrow Table
+    # ('arrow'), a list of dicts ('records') or a dict of arrays ('numpy').
+    # Only the pandas and arrow outputs need those packages.
+    check_output(output)
+    if output == PANDAS:
+        return columns_to_frame(columns, data)
+    return convert_output(columns, data, output, compact_dtypes(parsers))
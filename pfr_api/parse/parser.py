@@ -1,10 +1,45 @@
 import abc
+import re
 from datetime import date, datetime, time
-from typing import Any, Dict, List, Type
+from typing import Any, Dict, List, Optional, Type
 
+import numpy as np
 from bs4 import BeautifulSoup
 
 
+# How compact frames (see pfr_api.parse.compact) store a field
+CATEGORY = 'category'
+INTEGER = 'integer'
+FLOAT = 'float'
+DATE = 'date'
+
+
+def _missing_mask(values: List[Optional[str]]) -> np.ndarray:
+    # Blank cells and cells absent from short rows are both missing
+    return np.fromiter((not value for value in values), bool, len(values))
+
+
+def _to_nullable_int(values: List[Optional[str]]) -> np.ma.MaskedArray:
+    # Masked rather than a pandas IntegerArray, so parsing does not need
+    # pandas; columns_to_frame makes the IntegerArray
+    missing = _missing_mask(values)
+    numbers = np.array(values, dtype=object)
+    numbers[missing] = 0
+    return np.ma.MaskedArray(numbers.astype(np.int64), missing)
+
+
+def _to_nullable_float(values: List[Optional[Any]]) -> np.ndarray:
+    missing = _missing_mask(values)
+    numbers = np.array(values, dtype=object)
+    numbers[missing] = np.nan
+    return numbers.astype(np.float64)
+
+
+def _to_nullable_percentage(values: List[Optional[str]]) -> np.ndarray:
+    percentages = [value[:-1] if value else None for value in values]
+    return _to_nullable_float(percentages) / 100.
+
+
 class RowParser(abc.ABC):
     @property
     @abc.abstractmethod
@@ -15,15 +50,69 @@ class RowParser(abc.ABC):
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         raise NotImplementedError()
 
+    @property
+    def compact_dtypes(self) -> Dict[str, Optional[str]]:
+        # Compact storage per output field; fields left out are kept as is
+        return {}
+
+    @property
+    def signature(self) -> str:
+        # Stands for what the parser produces in parsed-result cache keys:
+        # its class and configuration
+        return '{}.{}{}'.format(
+            type(self).__module__, type(self).__qualname__,
+            sorted(vars(self).items()))
+
+    def parse_column(self, fields: List[Optional[Any]]) -> List[Any]:
+        # Columnar counterpart of `parse`: one value sequence per output
+        # field. `fields` holds None for cells missing from short rows.
+        columns = [[] for _ in self.output_fields]  # type: List[List[Any]]
+        for field in fields:
+            parsed = self.parse(field) if field is not None else {}
+            for column, output_field in zip(columns, self.output_fields):
+                column.append(parsed.get(output_field))
+        return columns
+
 
 class UnaryFieldParser(RowParser):
-    def __init__(self, field_name: str):
+    compact_dtype = None  # type: Optional[str]
+
+    def __init__(self, field_name: str, compact_dtype: Optional[str] = None):
         self.field_name = field_name
+        if compact_dtype is not None:
+            self.compact_dtype = compact_dtype
 
     @property
     def output_fields(self) -> List[str]:
         return [self.field_name]
 
+    @property
+    def compact_dtypes(self) -> Dict[str, Optional[str]]:
+        return {self.field_name: self.compact_dtype}
+
+    def parse_column(self, fields: List[Optional[Any]]) -> List[Any]:
+        values = [
+            field.text if field is not None else None for field in fields]
+        return [self.convert(values)]
+
+    def convert(self, values: List[Optional[str]]) -> Any:
+        # Bulk conversion of raw cell text; subclasses vectorize this
+        converted = []
+        for value in values:
+            if value is None:
+                converted.append(None)
+            else:
+                parsed = self.parse(_TextField(value))
+                converted.append(parsed[self.field_name])
+        return np.array(converted, dtype=object)
+
+
+class _TextField(object):
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
 
 class DateStringParser(UnaryFieldParser):
     def __init__(self, field_name: str, fmt: str = '%Y-%m-%d'):
@@ -36,6 +125,11 @@ class DateStringParser(UnaryFieldParser):
             self.field_name: datetime.strptime(date_string, self.fmt).date()
         }
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        dates = [datetime.strptime(value, self.fmt) if value else None
+                 for value in values]
+        return np.array(dates, dtype='datetime64[ns]')
+
 
 class TimeParser(UnaryFieldParser):
     def __init__(self, field_name: str, fmt: str = '%H:%M%p %Z'):
@@ -53,43 +147,80 @@ class IdentityParser(UnaryFieldParser):
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         return {self.field_name: field.text}
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        return np.array(values, dtype=object)
+
 
 class StrToIntParser(UnaryFieldParser):
+    compact_dtype = INTEGER
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         return {self.field_name: int(field_str)}
 
+    def convert(self, values: List[Optional[str]]) -> Any:
+        if None in values:
+            return _to_nullable_int(values)
+        return np.array(values, dtype=object).astype(np.int64)
+
 
 class NullableStrToIntParser(UnaryFieldParser):
+    compact_dtype = INTEGER
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         if not field_str:
             return {self.field_name: None}
         return {self.field_name: int(field_str)}
 
+    def convert(self, values: List[Optional[str]]) -> Any:
+        return _to_nullable_int(values)
+
 
 class StrToFloatParser(UnaryFieldParser):
+    compact_dtype = FLOAT
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         return {self.field_name: float(field_str)}
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        if None in values:
+            return _to_nullable_float(values)
+        return np.array(values, dtype=object).astype(np.float64)
+
 
 class NullableStrToFloatParser(UnaryFieldParser):
+    compact_dtype = FLOAT
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         if not field_str:
             return {self.field_name: None}
         return {self.field_name: float(field_str)}
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        return _to_nullable_float(values)
+
 
 class StrPercentageToFloatParser(UnaryFieldParser):
+    compact_dtype = FLOAT
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         percentage = float(field_str[:-1])
         return {self.field_name: percentage / 100.}
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        if None in values:
+            return _to_nullable_percentage(values)
+        percentages = [value[:-1] for value in values]
+        return np.array(percentages, dtype=object).astype(np.float64) / 100.
+
 
 class NullableStrPercentageToFloatParser(UnaryFieldParser):
+    compact_dtype = FLOAT
+
     def parse(self, field: BeautifulSoup) -> Dict[str, Any]:
         field_str = field.text
         if not field_str:
@@ -97,6 +228,9 @@ class NullableStrPercentageToFloatParser(UnaryFieldParser):
         percentage = float(field_str[:-1])
         return {self.field_name: percentage / 100.}
 
+    def convert(self, values: List[Optional[str]]) -> np.ndarray:
+        return _to_nullable_percentage(values)
+
 
 class PlayerRowParser(RowParser):
     @property
@@ -105,10 +239,35 @@ class PlayerRowParser(RowParser):
 
     def parse(self, field: BeautifulSoup):
         player_id = field['data-append-csv']
-        player_csk = field['csk']
+        # Boxscores name players without a sort key
+        player_csk = field.get('csk')
         player_name = field.text
         return {
             'player_id': player_id,
             'player_csk': player_csk,
             'player_name': player_name
         }
+
+
+class BoxscoreRowParser(RowParser):
+    # Schedule cells linking to /boxscores/<id>.htm; the link reads
+    # 'boxscore' for played games and 'preview' for the rest
+    _HREF_RE = re.compile(r'/boxscores/(\w+)\.htm')
+
+    @property
+    def output_fields(self):
+        return ['boxscore_id', 'boxscore_word']
+
+    @property
+    def compact_dtypes(self) -> Dict[str, Optional[str]]:
+        return {'boxscore_word': CATEGORY}
+
+    def parse(self, field: BeautifulSoup):
+        link = field.find('a')
+        match = None
+        if link is not None:
+            match = self._HREF_RE.search(link.get('href') or '')
+        return {
+            'boxscore_id': match.group(1) if match is not None else None,
+            'boxscore_word': field.text,
+        }
@@ -0,0 +1,144 @@
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pfr_api.parse.backends import Cell, etree, find_table, \
+    lxml_table_columns, lxml_table_rows, matches_attributes, _lxml_text
+from pfr_api.parse.parse import PARSERS, Selection, _batched, \
+    convert_columns, stats_row_parser
+from pfr_api.parse.parser import RowParser, UnaryFieldParser
+
+
+def _cells(row: Any) -> List[Cell]:
+    return [Cell(_lxml_text(cell), cell) for cell in row.iterchildren('td')]
+
+
+def _walk_table(
+    chunks: Iterable[bytes],
+    table_id: str,
+    stat_row_attributes: Dict[str, Any],
+) -> Iterator[Any]:
+    # Yields the table's header columns, then the cells of each matching
+    # row as soon as its </tr> has been fed. Rows are dropped from the tree
+    # once the consumer moves on, and feeding stops at the table's </table>.
+    parser = etree.HTMLPullParser(
+        events=('start', 'end', 'comment'), encoding='utf-8')
+    marker = 'id="{}"'.format(table_id)
+    table = None
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            parser.close()
+        else:
+            parser.feed(chunk)
+        for event, element in parser.read_events():
+            if table is None:
+                if (event == 'start' and element.tag == 'table'
+                        and element.get('id') == table_id):
+                    table = element
+                elif event == 'comment' and marker in (element.text or ''):
+                    # pro-football-reference ships some tables inside HTML
+                    # comments; those can only be parsed once complete
+                    commented = find_table(
+                        element.text.encode('utf-8'), table_id)
+                    if commented is not None:
+                        yield lxml_table_columns(commented)
+                        yield from lxml_table_rows(
+                            commented, stat_row_attributes)
+                        return
+                continue
+            if event != 'end':
+                continue
+            if element is table:
+                return
+            parent = element.getparent()
+            if element.tag == 'thead' and parent is table:
+                yield lxml_table_columns(table)
+            elif (element.tag == 'tr' and parent.tag == 'tbody'
+                    and parent.getparent() is table):
+                if not stat_row_attributes or matches_attributes(
+                        element.attrib, stat_row_attributes):
+                    yield _cells(element)
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _text(cell: Cell) -> str:
+    return cell.text
+
+
+def _start_walk(
+    chunks: Iterable[bytes],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]],
+) -> Tuple[List[Tuple[str, str]], Iterator[List[Cell]]]:
+    if etree is None:
+        raise ImportError('Incremental parsing requires the lxml package')
+    walk = _walk_table(chunks, table_id, stat_row_attributes or {})
+    column_infos = next(walk, None)
+    if column_infos is None:
+        raise KeyError('No table {!r} in the page'.format(table_id))
+    return column_infos[1:], walk  # Skip the ranker column
+
+
+def iter_stats_table_chunks(
+    chunks: Iterable[bytes],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    batch_size: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], Iterator[Any]]:
+    # iter_stats_table for a page that is still arriving: `chunks` are
+    # pieces of the raw HTML, fed to an incremental parser only as rows are
+    # asked for
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('batch_size must be positive, got {}'.format(
+            batch_size))
+
+    column_infos, walk = _start_walk(chunks, table_id, stat_row_attributes)
+    selection = Selection(
+        column_infos, {**PARSERS, **(parsers or {})}, columns, where)
+    if selection.selects_all:
+        output_columns, parse_row = stats_row_parser(column_infos, parsers)
+        rows = map(parse_row, walk)
+    else:
+        _, parse_row = stats_row_parser(selection.column_infos, parsers)
+        output_columns = selection.output_columns
+        rows = (selection.trim(parse_row(cells))
+                for cells in selection.rows(walk, _text))
+    if batch_size is not None:
+        return output_columns, _batched(rows, batch_size)
+    return output_columns, rows
+
+
+def parse_stats_columns_chunks(
+    chunks: Iterable[bytes],
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], List[Any]]:
+    # parse_stats_columns for a page that is still arriving
+    parsers = {**PARSERS, **(parsers or {})}
+    column_infos, walk = _start_walk(chunks, table_id, stat_row_attributes)
+    selection = Selection(column_infos, parsers, columns, where)
+    column_infos = selection.column_infos
+    # Single-field parsers only need the text, so their cells are not kept
+    # around (with the row they belong to) until the table has been read
+    unary = [isinstance(parsers[column_stat], UnaryFieldParser)
+             for column_stat, _ in column_infos]
+    column_cells = [[] for _ in column_infos]  # type: List[List[Any]]
+    for html_row_cols in selection.rows(walk, _text):
+        for cells, html_row_col, text_only in zip(
+                column_cells, html_row_cols, unary):
+            cells.append(html_row_col.text if text_only else html_row_col)
+        for cells in column_cells[len(html_row_cols):]:
+            cells.append(None)
+    return selection.convert(convert_columns(
+        column_infos, column_cells, parsers, _identity, _identity))
@@ -1,11 +1,22 @@
 import re
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-import requests
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
 from bs4 import BeautifulSoup
 
-from pfr_api.config import BASE_URL
-from pfr_api.parse.parse import parse_stats_table
+from pfr_api.cache import ttl_for_season
+from pfr_api.client import Client, default_client
+from pfr_api.page import Page, stream_stats_table
+from pfr_api.parse.compact import compact_frame
+from pfr_api.parse.output import PANDAS, check_compact
+from pfr_api.warehouse import Warehouse, table_key, whole_table
+
+
+GAMELOG_ROW_ATTRIBUTES = {'id': re.compile(r'^stats\..*$')}
+GAMELOG_TABLES = ('stats', 'stats_playoffs')
 
 
 class Player(object):
@@ -15,59 +26,211 @@ class Player(object):
         self,
         name: str,
         player_id: str,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+        warehouse: Optional[Warehouse] = None,
+        stream: bool = False,
     ):
         self._name = name
         self._player_id = player_id
+        self._client = client if client is not None else default_client()
+        self._backend = backend
+        self._warehouse = warehouse
+        # Single tables are parsed off the wire with lxml as they arrive
+        # instead of from a fully downloaded Page
+        self._stream = stream
+        self._pages = {}  # type: Dict[Tuple[str, str], Page]
 
     def _url_base(self):
         return (
             '{base}/{entity}/{first}/{id}'
             .format(
-                base=BASE_URL,
+                base=self._client.base_url,
                 entity=self.entity_type,
                 first=self._player_id[0],
                 id=self._player_id
             )
         )
 
-    def _gamelog_page(self, season: str = '') -> BeautifulSoup:
-        url = (
-            '{base}/gamelog/{season}'
-            .format(base=self._url_base(), season=season)
+    def _page_url(self, kind: str, season: str) -> str:
+        return (
+            '{base}/{kind}/{season}'
+            .format(base=self._url_base(), kind=kind, season=season)
         )
-        r = requests.get(url)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        return soup
+
+    def _page(self, kind: str, season: str, reload: bool = False) -> Page:
+        key = (kind, str(season))
+        if key not in self._pages:
+            url = self._page_url(kind, season)
+            content = self._client.get(url, ttl_for_season(season))
+            self._pages[key] = Page(
+                url, content, self._backend, self._client.results)
+        elif reload:
+            # A conditional request against the client's cache; the
+            # memoized Page, and whatever it has parsed, survives if the
+            # page has not changed
+            page = self._pages[key]
+            content = self._client.get(
+                page.url, ttl_for_season(season), revalidate=True)
+            if content != page.content:
+                self._pages[key] = Page(
+                    page.url, content, self._backend, self._client.results)
+        return self._pages[key]
+
+    def gamelog_page(self, season: str = '', reload: bool = False) -> Page:
+        return self._page('gamelog', season, reload)
+
+    def fantasy_page(self, season: str = '', reload: bool = False) -> Page:
+        return self._page('fantasy', season, reload)
+
+    def _gamelog_page(self, season: str = '') -> BeautifulSoup:
+        return self.gamelog_page(season).soup
 
     def _fantasy_page(self, season: str = '') -> BeautifulSoup:
-        url = (
-            '{base}/fantasy/{season}'
-            .format(base=self._url_base(), season=season)
-        )
-        r = requests.get(url)
-        soup = BeautifulSoup(r.content, 'html.parser')
-        return soup
-
-    def regular_season_gamelog(self, season: str = '') -> pd.DataFrame:
-        soup = self._gamelog_page(season)
-        results_table = soup.find('table', {'id': 'stats'})
-        columns, rows = parse_stats_table(
-            results_table,
-            stat_row_attributes={'id': re.compile('^stats\..*$')})
-        return pd.DataFrame(columns=columns, data=rows)
-
-    def playoffs_gamelog(self, season: str = '') -> pd.DataFrame:
-        soup = self._gamelog_page(season)
-        results_table = soup.find('table', {'id': 'stats_playoffs'})
-        columns, rows = parse_stats_table(
-            results_table,
-            stat_row_attributes={'id': re.compile('^stats\..*$')})
-        return pd.DataFrame(columns=columns, data=rows)
-
-    def fantasy(self, season: str = '') -> pd.DataFrame:
-        soup = self._fantasy_page(season)
-        results_table = soup.find('table', {'id': 'player_fantasy'})
+        return self.fantasy_page(season).soup
+
+    def _stats_table(
+        self,
+        kind: str,
+        season: str,
+        table_id: str,
+        stat_row_attributes: Optional[Dict[str, Any]] = None,
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        check_compact(compact, output)
+
+        def load():
+            if self._stream and (kind, str(season)) not in self._pages:
+                return stream_stats_table(
+                    self._client.stream(
+                        self._page_url(kind, season), ttl_for_season(season)),
+                    table_id,
+                    stat_row_attributes=stat_row_attributes,
+                    columnar=columnar,
+                    output=output,
+                    columns=columns,
+                    where=where)
+            return self._page(kind, season).stats_table(
+                table_id,
+                stat_row_attributes=stat_row_attributes,
+                columnar=columnar,
+                output=output,
+                columns=columns,
+                where=where)
+
+        # See whole_table
+        if self._warehouse is None or not whole_table(
+                output, columns, where):
+            frame = load()
+        else:
+            key = self._warehouse.key(
+                self.entity_type, self._player_id, season,
+                table_key(table_id, columnar))
+            # Recorded as absent, as in gamelogs, so that finished seasons
+            # are not refetched for a table they will never have
+            if self._warehouse.is_absent(key):
+                raise KeyError('No table {!r} in the page'.format(table_id))
+            try:
+                frame = self._warehouse.read_through(key, load)
+            except KeyError:
+                self._warehouse.put_absent(key)
+                raise
+        return compact_frame(frame) if compact else frame
+
+    def regular_season_gamelog(
+        self,
+        season: str = '',
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        return self._stats_table(
+            'gamelog', season, 'stats',
+            stat_row_attributes=GAMELOG_ROW_ATTRIBUTES,
+            columnar=columnar, compact=compact, output=output,
+            columns=columns, where=where)
+
+    def playoffs_gamelog(
+        self,
+        season: str = '',
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        return self._stats_table(
+            'gamelog', season, 'stats_playoffs',
+            stat_row_attributes=GAMELOG_ROW_ATTRIBUTES,
+            columnar=columnar, compact=compact, output=output,
+            columns=columns, where=where)
+
+    def gamelogs(
+        self,
+        season: str = '',
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Every gamelog table on the page from a single request; players
+        # without playoff appearances have no 'stats_playoffs' table
+        check_compact(compact, output)
+        frames = {}
+        for table_id in GAMELOG_TABLES:
+            key = None
+            if self._warehouse is not None and whole_table(
+                    output, columns, where):
+                key = self._warehouse.key(
+                    self.entity_type, self._player_id, season,
+                    table_key(table_id, columnar))
+                frame = self._warehouse.get(key)
+                if frame is not None:
+                    frames[table_id] = frame
+                    continue
+                if self._warehouse.is_absent(key):
+                    continue
+            page = self.gamelog_page(season)
+            # Checked on the raw text, so that tables the result cache
+            # already holds never need the HTML parsed
+            if table_id not in page.table_ids():
+                if key is not None:
+                    # Recorded, so that finished seasons without playoffs
+                    # are not refetched for a table they will never have
+                    self._warehouse.put_absent(key)
+                continue
+            frames[table_id] = page.stats_table(
+                table_id,
+                stat_row_attributes=GAMELOG_ROW_ATTRIBUTES,
+                columnar=columnar,
+                output=output,
+                columns=columns,
+                where=where)
+            if key is not None:
+                self._warehouse.put(key, frames[table_id])
+        if compact:
+            return {table_id: compact_frame(frame)
+                    for table_id, frame in frames.items()}
+        return frames
+
+    def fantasy(
+        self,
+        season: str = '',
+        columnar: bool = False,
+        compact: bool = False,
+        output: str = PANDAS,
+        columns: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Any:
         # TODO handle weirdness with Inside 20 columns not being specific
         #      in data-stat field
-        columns, rows = parse_stats_table(results_table)
-        return pd.DataFrame(columns=columns, data=rows)
+        return self._stats_table(
+            'fantasy', season, 'player_fantasy', columnar=columnar,
+            compact=compact, output=output, columns=columns, where=where)
@@ -0,0 +1,191 @@
+import abc
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional
+
+
+# pro-football-reference allows roughly 20 requests a minute
+DEFAULT_RATE = 20. / 60.
+DEFAULT_BURST = 1.
+# Multiplicative decrease on 429, additive increase on success
+DEFAULT_DECREASE = 0.5
+DEFAULT_RECOVERY_STEPS = 20
+
+
+def parse_retry_after(
+    value: Optional[str],
+    now: Optional[float] = None,
+) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(0., retry_at - now)
+
+
+class _Bucket(object):
+    __slots__ = ('tokens', 'rate', 'updated_at', 'blocked_until')
+
+    def __init__(
+        self,
+        tokens: float,
+        rate: float,
+        updated_at: float,
+        blocked_until: float,
+    ):
+        self.tokens = tokens
+        self.rate = rate
+        self.updated_at = updated_at
+        self.blocked_until = blocked_until
+
+
+class RateLimiter(abc.ABC):
+    """Adaptive token bucket; `acquire` before a request, then report back.
+
+    Starts at `rate` requests per second, backs off multiplicatively on
+    429s (honouring Retry-After) and creeps back up on successes.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        min_rate: Optional[float] = None,
+        decrease: float = DEFAULT_DECREASE,
+        recovery_steps: int = DEFAULT_RECOVERY_STEPS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = rate / 20. if min_rate is None else min_rate
+        self.decrease = decrease
+        self.increase = (rate - self.min_rate) / recovery_steps
+        self._clock = clock
+        self._sleep = sleep
+
+    @abc.abstractmethod
+    def _bucket(self) -> Iterator[_Bucket]:
+        # Context manager yielding the shared state, saved on exit
+        raise NotImplementedError()
+
+    @property
+    def rate(self) -> float:
+        with self._bucket() as bucket:
+            return bucket.rate
+
+    def _refill(self, bucket: _Bucket, now: float):
+        elapsed = max(0., now - bucket.updated_at)
+        bucket.tokens = min(self.burst, bucket.tokens + elapsed * bucket.rate)
+        bucket.updated_at = now
+
+    def _try_acquire(self) -> float:
+        with self._bucket() as bucket:
+            now = self._clock()
+            self._refill(bucket, now)
+            if now < bucket.blocked_until:
+                return bucket.blocked_until - now
+            if bucket.tokens >= 1.:
+                bucket.tokens -= 1.
+                return 0.
+            return (1. - bucket.tokens) / bucket.rate
+
+    def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0.:
+                return
+            self._sleep(wait)
+
+    def feedback(self, status_code: int, retry_after: Optional[float] = None):
+        with self._bucket() as bucket:
+            now = self._clock()
+            self._refill(bucket, now)
+            if status_code == 429:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.tokens = 0.
+                if retry_after is None:
+                    retry_after = 1. / bucket.rate
+                bucket.blocked_until = max(
+                    bucket.blocked_until, now + retry_after)
+            elif status_code < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+
+class LocalRateLimiter(RateLimiter):
+    """Shared by the threads of a single process."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._state = _Bucket(self.burst, self.max_rate, self._clock(), 0.)
+
+    @contextlib.contextmanager
+    def _bucket(self) -> Iterator[_Bucket]:
+        with self._lock:
+            yield self._state
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Shared by every process on the host that opens the same file."""
+
+    def __init__(self, path: str, *args, name: str = 'default', **kwargs):
+        super().__init__(*args, **kwargs)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.name = name
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly below
+        self._conn = sqlite3.connect(
+            path, timeout=60., isolation_level=None,
+            check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            ' name TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' rate REAL NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' blocked_until REAL NOT NULL)'
+        )
+
+    @contextlib.contextmanager
+    def _bucket(self) -> Iterator[_Bucket]:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the database write lock, serializing
+            # the read-modify-write across processes
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT tokens, rate, updated_at, blocked_until '
+                    'FROM buckets WHERE name = ?', (self.name,)
+                ).fetchone()
+                if row is None:
+                    row = [self.burst, self.max_rate, self._clock(), 0.]
+                bucket = _Bucket(*row)
+                yield bucket
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)',
+                    (self.name, bucket.tokens, bucket.rate,
+                     bucket.updated_at, bucket.blocked_until)
+                )
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def close(self):
+        self._conn.close()
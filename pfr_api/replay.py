@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, \
+    stream_decode_response_unicode
+
+
+# Bodies are archived decoded, so the headers describing the encoding on
+# the wire are dropped
+_UNARCHIVED_HEADERS = frozenset([
+    'connection', 'content-encoding', 'content-length', 'keep-alive',
+    'set-cookie', 'transfer-encoding',
+])
+
+
+def is_recordable(status_code: int) -> bool:
+    # Throttling, server errors and empty revalidations say nothing about
+    # the page itself
+    return status_code < 500 and status_code not in (304, 429)
+
+
+class Recorded(object):
+    __slots__ = ('path', 'status_code', 'reason', 'headers', 'body',
+                 'recorded_at')
+
+    def __init__(
+        self,
+        path: str,
+        status_code: int,
+        reason: str,
+        headers: Dict[str, str],
+        body: bytes,
+        recorded_at: float,
+    ):
+        self.path = path
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.recorded_at = recorded_at
+
+    def not_modified(self, request_headers: Any) -> bool:
+        etag = self.headers.get('ETag')
+        if etag is not None and request_headers.get('If-None-Match') == etag:
+            return True
+        last_modified = self.headers.get('Last-Modified')
+        return (last_modified is not None and
+                request_headers.get('If-Modified-Since') == last_modified)
+
+
+class Archive(object):
+    """Recorded responses keyed by path and query, independent of host.
+
+    Record from the real site with `Client(archive=...)`, then replay with
+    `Client(archive=..., replay=True)` or serve it with
+    `pfr_api.server.StandInServer`.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' path TEXT PRIMARY KEY,'
+            ' status_code INTEGER NOT NULL,'
+            ' reason TEXT NOT NULL,'
+            ' headers TEXT NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' recorded_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, path: str) -> Optional[Recorded]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT path, status_code, reason, headers, body, '
+                'recorded_at FROM responses WHERE path = ?', (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        path, status_code, reason, headers, body, recorded_at = row
+        return Recorded(path, status_code, reason,
+                        CaseInsensitiveDict(json.loads(headers)), body,
+                        recorded_at)
+
+    def put(
+        self,
+        path: str,
+        status_code: int,
+        reason: str,
+        headers: Dict[str, str],
+        body: bytes,
+    ):
+        headers = {
+            name: value for name, value in headers.items()
+            if name.lower() not in _UNARCHIVED_HEADERS
+        }
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (path, status_code, reason or '', json.dumps(headers), body,
+                 time.time())
+            )
+            self._conn.commit()
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                'SELECT path FROM responses ORDER BY path')]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests as usual and archives the responses."""
+
+    def __init__(self, archive: Archive, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    def send(self, request, *args, **kwargs) -> requests.Response:
+        response = super().send(request, *args, **kwargs)
+        if not is_recordable(response.status_code):
+            return response
+        if kwargs.get('stream'):
+            # Streamed bodies are archived once read to the end, so that
+            # recording does not turn them into one buffered read
+            self._record_while_read(request, response)
+        else:
+            self.archive.put(
+                request.path_url, response.status_code, response.reason,
+                dict(response.headers), response.content)
+        return response
+
+    def _record_while_read(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ):
+        iter_content = response.iter_content
+
+        def recording_iter_content(chunk_size):
+            chunks = []
+            for chunk in iter_content(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            # Bodies abandoned part way are not archived
+            self.archive.put(
+                request.path_url, response.status_code, response.reason,
+                dict(response.headers), b''.join(chunks))
+
+        def iter_decoded(chunk_size=1, decode_unicode=False):
+            chunks = recording_iter_content(chunk_size)
+            if decode_unicode:
+                return stream_decode_response_unicode(chunks, response)
+            return chunks
+
+        # Response.content reads through iter_content too
+        response.iter_content = iter_decoded
+
+
+def _response(
+    request: requests.PreparedRequest,
+    status_code: int,
+    reason: str,
+    headers: Dict[str, str],
+    body: bytes,
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from an `Archive` without touching the network.
+
+    Unrecorded paths get a 404; conditional requests that match the
+    recorded validators get a 304.
+    """
+
+    def __init__(self, archive: Archive):
+        super().__init__()
+        self.archive = archive
+        self.misses = []  # type: List[str]
+
+    def send(self, request, *args, **kwargs) -> requests.Response:
+        recorded = self.archive.get(request.path_url)
+        if recorded is None:
+            self.misses.append(request.path_url)
+            return _response(request, 404, 'Not Recorded', {}, b'')
+        if recorded.not_modified(request.headers):
+            return _response(
+                request, 304, 'Not Modified', recorded.headers, b'')
+        return _response(
+            request, recorded.status_code, recorded.reason,
+            recorded.headers, recorded.body)
+
+    def close(self):
+        pass
@@ -0,0 +1,169 @@
+import hashlib
+import importlib.util
+import os
+import pickle
+import re
+import threading
+import types
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api import metrics
+from pfr_api.cache import CacheStats
+from pfr_api.parse.parse import registry_version
+from pfr_api.parse.parser import RowParser
+
+
+FEATHER = 'feather'
+PICKLE = 'pickle'
+_EXTENSIONS = {FEATHER: '.arrow', PICKLE: '.pkl'}
+
+
+def _has_pyarrow() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _code_signature(code: types.CodeType) -> str:
+    # Nested functions and lambdas are code objects among the constants,
+    # whose reprs hold memory addresses too
+    consts = tuple(
+        _code_signature(const) if isinstance(const, types.CodeType)
+        else repr(const) for const in code.co_consts)
+    return '{}:{}:{}'.format(code.co_code.hex(), consts, code.co_names)
+
+
+def _attribute_signature(value: Any, seen: Optional[Set[int]] = None) -> str:
+    # Row filters are regexes or small functions; their reprs hold memory
+    # addresses, so they are identified by what they match instead
+    if isinstance(value, re.Pattern):
+        return 're:{}:{}'.format(value.pattern, value.flags)
+    code = getattr(value, '__code__', None)
+    if code is not None:
+        # Closures built by the same function differ only in what they close
+        # over, e.g. a bound; `seen` stops functions that close over
+        # themselves
+        seen = (seen or set()) | {id(value)}
+        cells = tuple(
+            'self' if id(cell.cell_contents) in seen
+            else _attribute_signature(cell.cell_contents, seen)
+            for cell in value.__closure__ or ())
+        return 'code:{}:{}:{}'.format(
+            value.__qualname__, _code_signature(code), cells)
+    return repr(value)
+
+
+def result_key(
+    digest: str,
+    table_id: str,
+    stat_row_attributes: Optional[Dict[str, Any]] = None,
+    parsers: Optional[Dict[str, RowParser]] = None,
+    columnar: bool = False,
+    row_header: bool = False,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> str:
+    # Everything a parsed table depends on: the page content (by digest),
+    # which table, rows and columns, the parsers and the output mode
+    parts = [
+        digest, table_id, 'columnar' if columnar else 'rows',
+        registry_version(parsers),
+    ]
+    if row_header:
+        parts.append('row_header')
+    for name, value in sorted((stat_row_attributes or {}).items()):
+        parts.append('{}={}'.format(name, _attribute_signature(value)))
+    if columns is not None:
+        parts.append('columns={}'.format(','.join(columns)))
+    for stat, value in sorted((where or {}).items()):
+        parts.append('where:{}={}'.format(stat, _attribute_signature(value)))
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _feather_compatible(frame: 'pd.DataFrame') -> bool:
+    # Arrow needs unique string column names, and Python objects in row
+    # mode frames would not come back as they went in
+    return (frame.columns.is_unique and
+            all(isinstance(name, str) for name in frame.columns) and
+            not any(dtype == object for dtype in frame.dtypes))
+
+
+class ResultCache(object):
+    """Parsed tables on disk, keyed by page content, table and parsers.
+
+    Typed frames are stored as Feather files and memory-mapped back when
+    pyarrow is installed; everything else is pickled. Entries are never
+    stale: a changed page or parser registry simply yields a new key.
+    """
+
+    def __init__(self, directory: str, fmt: Optional[str] = None):
+        if fmt is None:
+            fmt = FEATHER if _has_pyarrow() else PICKLE
+        if fmt not in _EXTENSIONS:
+            raise ValueError('Unknown format {!r}, expected one of {}'.format(
+                fmt, ', '.join(sorted(_EXTENSIONS))))
+        if fmt == FEATHER and not _has_pyarrow():
+            raise ImportError('The feather format requires pyarrow')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, key + _EXTENSIONS[fmt])
+
+    def _read(self, key: str) -> 'Optional[pd.DataFrame]':
+        path = self._path(key, FEATHER)
+        if os.path.exists(path):
+            from pyarrow import feather
+            return feather.read_table(path, memory_map=True).to_pandas()
+        path = self._path(key, PICKLE)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        return None
+
+    def get(self, key: str) -> 'Optional[pd.DataFrame]':
+        try:
+            frame = self._read(key)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            # A damaged entry is a miss; it is overwritten on the next put
+            frame = None
+        with self._lock:
+            if frame is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        registry = metrics.active()
+        if registry is not None:
+            registry.count(
+                'result_hits' if frame is not None else 'result_misses')
+        return frame
+
+    def put(self, key: str, frame: 'pd.DataFrame'):
+        fmt = self.fmt
+        if fmt == FEATHER and not _feather_compatible(frame):
+            fmt = PICKLE
+        path = self._path(key, fmt)
+        # Written next to the target and renamed into place, so concurrent
+        # readers never see a partial file
+        tmp = '{}.{}.tmp'.format(path, threading.get_ident())
+        if fmt == FEATHER:
+            frame.reset_index(drop=True).to_feather(tmp)
+        else:
+            with open(tmp, 'wb') as f:
+                pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.directory)
+                   if name.endswith(tuple(_EXTENSIONS.values())))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(tuple(_EXTENSIONS.values())):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,192 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api.parse.compact import compact_dtypes
+from pfr_api.parse.output import PANDAS, check_output
+from pfr_api.parse.parser import FLOAT, INTEGER
+
+
+# Numeric columns the parsers produce, in a fixed order; any of them can
+# be weighted or carry a bonus
+STATS = tuple(sorted(
+    field for field, dtype in compact_dtypes().items()
+    if dtype in (INTEGER, FLOAT)))
+
+
+def _check_stat(stat: str):
+    if stat not in STATS:
+        raise ValueError('Unknown stat {!r}; scorable stats are {}'.format(
+            stat, ', '.join(STATS)))
+
+
+class Bonus(object):
+    """`points` for every row where `stat` reaches `threshold`."""
+
+    __slots__ = ('stat', 'threshold', 'points')
+
+    def __init__(self, stat: str, threshold: float, points: float):
+        _check_stat(stat)
+        self.stat = stat
+        self.threshold = float(threshold)
+        self.points = float(points)
+
+    def __repr__(self) -> str:
+        return 'Bonus({!r}, {!r}, {!r})'.format(
+            self.stat, self.threshold, self.points)
+
+
+class ScoringConfig(object):
+    """One league's settings: points per unit of each stat plus bonuses.
+
+    Bonuses stack, so 3 points at 100 rushing yards and 3 more at 200 are
+    two bonuses on 'rush_yds'.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        weights: Dict[str, float],
+        bonuses: Sequence[Bonus] = (),
+    ):
+        for stat in weights:
+            _check_stat(stat)
+        self.name = name
+        self.weights = {stat: float(w) for stat, w in weights.items()}
+        self.bonuses = list(bonuses)
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'ScoringConfig':
+        # {'name': ..., 'weights': {stat: points},
+        #  'bonuses': [{'stat': ..., 'threshold': ..., 'points': ...}]}
+        return cls(
+            config['name'],
+            config.get('weights', {}),
+            [Bonus(b['stat'], b['threshold'], b['points'])
+             for b in config.get('bonuses', ())])
+
+    def __repr__(self) -> str:
+        return 'ScoringConfig({!r})'.format(self.name)
+
+
+STANDARD = ScoringConfig('standard', {
+    'pass_yds': 0.04, 'pass_td': 4, 'pass_int': -2,
+    'rush_yds': 0.1, 'rush_td': 6,
+    'rec_yds': 0.1, 'rec_td': 6,
+    'two_pt_md': 2, 'fumbles_lost': -2,
+})
+PPR = ScoringConfig('ppr', {**STANDARD.weights, 'rec': 1})
+HALF_PPR = ScoringConfig('half_ppr', {**STANDARD.weights, 'rec': 0.5})
+
+
+def stat_matrix(
+    frame: 'pd.DataFrame',
+    stats: Sequence[str],
+    dtype: Any = np.float64,
+) -> np.ndarray:
+    # rows x stats; stats the frame lacks and missing values count as 0.
+    # With repeated column names the first one is used. Without pandas,
+    # Scorer.score_matrix takes stat arrays directly.
+    check_output(PANDAS)
+    matrix = np.zeros((len(frame), len(stats)), dtype=dtype)
+    positions = {}  # type: Dict[str, int]
+    for i, name in enumerate(frame.columns):
+        positions.setdefault(name, i)
+    for j, stat in enumerate(stats):
+        if stat not in positions:
+            continue
+        column = pd.to_numeric(frame.iloc[:, positions[stat]],
+                               errors='coerce')
+        matrix[:, j] = column.to_numpy(dtype=np.float64, na_value=0.)
+    return matrix
+
+
+class Scorer(object):
+    """Scores stat frames under many leagues at once.
+
+    The leagues are compiled into one (stats + bonuses) x leagues matrix,
+    so scoring is a single matrix product however many leagues there are.
+    """
+
+    def __init__(
+        self,
+        configs: Iterable[ScoringConfig],
+        dtype: Any = np.float64,
+    ):
+        self.configs = list(configs)
+        names = [config.name for config in self.configs]
+        if len(set(names)) != len(names):
+            raise ValueError('League names must be unique')
+        self.dtype = dtype
+
+        used = set()
+        for config in self.configs:
+            used.update(config.weights)
+            used.update(bonus.stat for bonus in config.bonuses)
+        # Only the stats some league scores are read from frames
+        self.stats = [stat for stat in STATS if stat in used]
+        stat_index = {stat: i for i, stat in enumerate(self.stats)}
+
+        self.weights = np.zeros(
+            (len(self.stats), len(self.configs)), dtype=dtype)
+        # Leagues sharing a (stat, threshold) share one indicator column
+        thresholds = {}  # type: Dict[Tuple[str, float], int]
+        bonus_points = []  # type: List[Tuple[int, int, float]]
+        for j, config in enumerate(self.configs):
+            for stat, weight in config.weights.items():
+                self.weights[stat_index[stat], j] = weight
+            for bonus in config.bonuses:
+                k = thresholds.setdefault(
+                    (bonus.stat, bonus.threshold), len(thresholds))
+                bonus_points.append((k, j, bonus.points))
+
+        self._bonus_stats = np.array(
+            [stat_index[stat] for stat, _ in thresholds], dtype=np.intp)
+        self._thresholds = np.array(
+            [threshold for _, threshold in thresholds], dtype=dtype)
+        self.bonuses = np.zeros(
+            (len(thresholds), len(self.configs)), dtype=dtype)
+        for k, j, points in bonus_points:
+            self.bonuses[k, j] += points
+        # Bonus indicators are appended to the stats, so weights and
+        # bonuses are applied by the same product
+        self._matrix = np.vstack([self.weights, self.bonuses])
+
+    @property
+    def leagues(self) -> List[str]:
+        return [config.name for config in self.configs]
+
+    def score_matrix(
+        self,
+        stats: np.ndarray,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        # rows x self.stats in, rows x leagues out. Passing a preallocated
+        # `out` saves faulting in a fresh result on every call, which at
+        # thousands of leagues costs as much as the product itself.
+        if len(self._thresholds):
+            reached = stats[:, self._bonus_stats] >= self._thresholds
+            stats = np.hstack([stats, reached.astype(self.dtype)])
+        return np.matmul(stats, self._matrix, out=out)
+
+    def score(self, frame: 'pd.DataFrame') -> np.ndarray:
+        return self.score_matrix(stat_matrix(frame, self.stats, self.dtype))
+
+    def score_frame(self, frame: 'pd.DataFrame') -> 'pd.DataFrame':
+        # One column per league, aligned with the frame's rows
+        check_output(PANDAS)
+        return pd.DataFrame(
+            self.score(frame), index=frame.index, columns=self.leagues)
+
+
+def score(
+    frame: 'pd.DataFrame',
+    configs: Iterable[ScoringConfig],
+    dtype: Any = np.float64,
+) -> 'pd.DataFrame':
+    return Scorer(configs, dtype).score_frame(frame)
@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Optional, Union
+
+
+# The NFL season that starts in September of year Y ends with the Super Bowl
+# in February of Y + 1. Until March we still treat Y as the current season.
+SEASON_ROLLOVER_MONTH = 3
+
+
+def current_season(today: Optional[date] = None) -> int:
+    if today is None:
+        today = date.today()
+    if today.month < SEASON_ROLLOVER_MONTH:
+        return today.year - 1
+    return today.year
+
+
+def is_final_season(
+    season: Union[int, str, None],
+    today: Optional[date] = None,
+) -> bool:
+    # An empty season means "career" pages, which change whenever a new
+    # season is played
+    if season is None or season == '':
+        return False
+    return int(season) < current_season(today)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""Local stand-in for pro-football-reference.com serving an `Archive`.
+
+Usage::
+
+    python -m pfr_api.server pages.sqlite --port 8000 --latency 0.2 \\
+        --jitter 0.1 --max-rate 0.33
+    PFR_API_BASE_URL=http://127.0.0.1:8000 pfr_api gamelogs ...
+"""
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from pfr_api.replay import Archive
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.standin.handle(self)
+
+    def log_message(self, format, *args):
+        if self.server.standin.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer(object):
+    """Serves recorded pages over local HTTP with the site's bad habits.
+
+    Each response is delayed by `latency` plus or minus up to `jitter`
+    seconds. Requests beyond `max_rate` per second, and a random
+    `error_rate` fraction of the rest, are answered 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        archive: Archive,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.,
+        jitter: float = 0.,
+        error_rate: float = 0.,
+        max_rate: Optional[float] = None,
+        retry_after: float = 1.,
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rate = max_rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.requests = 0
+        self.throttled = 0
+        self.not_found = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = 1.
+        self._updated_at = time.monotonic()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def _admit(self) -> Optional[float]:
+        # None to serve the request, else the Retry-After to throttle with
+        with self._lock:
+            self.requests += 1
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(-self.jitter, self.jitter)
+            retry_after = None
+            if self.max_rate is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    1., self._tokens + (now - self._updated_at) *
+                    self.max_rate)
+                self._updated_at = now
+                if self._tokens < 1.:
+                    retry_after = (1. - self._tokens) / self.max_rate
+                else:
+                    self._tokens -= 1.
+            if retry_after is None and self.error_rate and \
+                    self._random.random() < self.error_rate:
+                retry_after = self.retry_after
+            if retry_after is not None:
+                self.throttled += 1
+        if delay > 0:
+            time.sleep(delay)
+        return retry_after
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        retry_after = self._admit()
+        if retry_after is not None:
+            self._send(request, 429, {
+                'Retry-After': str(int(math.ceil(retry_after)))})
+            return
+        recorded = self.archive.get(request.path)
+        if recorded is None:
+            with self._lock:
+                self.not_found += 1
+            self._send(request, 404)
+            return
+        if recorded.not_modified(request.headers):
+            self._send(request, 304, recorded.headers)
+            return
+        self._send(request, recorded.status_code, recorded.headers,
+                   recorded.body)
+
+    @staticmethod
+    def _send(request, status_code, headers=None, body=b''):
+        request.send_response(status_code)
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def serve_forever(self):
+        try:
+            self._httpd.serve_forever(poll_interval=0.1)
+        finally:
+            self._httpd.server_close()
+
+    def start(self) -> 'StandInServer':
+        # Serves from a background thread until stop()
+        self._thread = threading.Thread(
+            target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m pfr_api.server',
+        description='Serve an archive of recorded pages locally.')
+    parser.add_argument('archive', help='archive recorded with a Client')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.,
+                        help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.,
+                        help='random +/- seconds on top of --latency')
+    parser.add_argument('--error-rate', type=float, default=0.,
+                        help='fraction of requests answered 429')
+    parser.add_argument('--max-rate', type=float, default=None,
+                        help='requests per second before answering 429')
+    parser.add_argument('--retry-after', type=float, default=1.,
+                        help='Retry-After sent with random 429s')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = StandInServer(
+        Archive(args.archive), args.host, args.port, args.latency,
+        args.jitter, args.error_rate, args.max_rate, args.retry_after,
+        args.seed, args.verbose)
+    sys.stderr.write('Serving {} pages on {}\n'.format(
+        len(server.archive), server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())  # pragma: no cover
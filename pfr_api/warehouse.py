@@ -0,0 +1,190 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from pfr_api import metrics
+from pfr_api.parse.output import PANDAS
+from pfr_api.seasons import is_final_season
+
+
+# Tables for seasons still in progress are refetched after this long
+DEFAULT_TTL = 12 * 60 * 60
+
+# (entity, entity id, season, table)
+Key = Tuple[str, str, str, str]
+
+# Stored in place of a frame for tables a fetched page does not have; no
+# pickle is empty
+_ABSENT = b''
+
+
+def whole_table(
+    output: str,
+    columns: Optional[List[str]] = None,
+    where: Optional[Dict[str, Any]] = None,
+) -> bool:
+    # Only whole tables as DataFrames are stored; other outputs and
+    # narrowed tables are parsed every time
+    return output == PANDAS and columns is None and where is None
+
+
+def table_key(table_id: str, columnar: bool = False) -> str:
+    # Row-mode and typed frames of the same table are stored separately
+    return table_id + ':columnar' if columnar else table_id
+
+
+class Warehouse(object):
+    """Local store of parsed tables that only refetches what can change.
+
+    Tables for finished seasons are immutable once stored; tables for the
+    current season (or career pages) go stale after `ttl` seconds.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tables ('
+            ' entity TEXT NOT NULL,'
+            ' entity_id TEXT NOT NULL,'
+            ' season TEXT NOT NULL,'
+            ' table_name TEXT NOT NULL,'
+            ' final INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' frame BLOB NOT NULL,'
+            ' PRIMARY KEY (entity, entity_id, season, table_name))'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(entity: str, entity_id: str, season, table: str) -> Key:
+        return entity, entity_id, str(season), table
+
+    def _row(self, key: Key) -> Optional[Tuple[int, float, bytes]]:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT final, fetched_at, frame FROM tables '
+                'WHERE entity = ? AND entity_id = ? AND season = ? '
+                'AND table_name = ?', key
+            ).fetchone()
+
+    def _is_fresh(self, final: int, fetched_at: float) -> bool:
+        return bool(final) or time.time() < fetched_at + self.ttl
+
+    def is_fresh(self, key: Key) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT final, fetched_at FROM tables '
+                'WHERE entity = ? AND entity_id = ? AND season = ? '
+                'AND table_name = ?', key
+            ).fetchone()
+        return row is not None and self._is_fresh(*row)
+
+    def get(self, key: Key) -> 'Optional[pd.DataFrame]':
+        # Missing, stale and absent tables all read as None
+        row = self._row(key)
+        if row is None or not self._is_fresh(row[0], row[1]) or \
+                row[2] == _ABSENT:
+            return None
+        return pickle.loads(row[2])
+
+    def is_absent(self, key: Key) -> bool:
+        # Whether the page was fetched (and is still fresh) without the
+        # table, e.g. the playoffs gamelog of a player who missed them
+        row = self._row(key)
+        return row is not None and self._is_fresh(row[0], row[1]) and \
+            row[2] == _ABSENT
+
+    def put_absent(self, key: Key):
+        self._store(key, _ABSENT)
+
+    def put(self, key: Key, frame: 'pd.DataFrame'):
+        self._store(
+            key, pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _store(self, key: Key, blob: bytes):
+        final = is_final_season(key[2])
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?, ?)',
+                key + (int(final), time.time(), blob)
+            )
+            self._conn.commit()
+
+    def read_through(
+        self,
+        key: Key,
+        load: Callable[[], 'pd.DataFrame'],
+    ) -> 'pd.DataFrame':
+        frame = self.get(key)
+        registry = metrics.active()
+        if registry is not None:
+            registry.count(
+                'warehouse_hits' if frame is not None else 'warehouse_misses',
+                entity=key[0])
+        if frame is None:
+            frame = load()
+            self.put(key, frame)
+        return frame
+
+    def keys(self, entity: Optional[str] = None) -> List[Key]:
+        query = 'SELECT entity, entity_id, season, table_name FROM tables'
+        params = ()  # type: Tuple[str, ...]
+        if entity is not None:
+            query += ' WHERE entity = ?'
+            params = (entity,)
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(query, params)]
+
+    def update(
+        self,
+        player_ids: Iterable[str] = (),
+        seasons: Iterable = (),
+        fantasy_seasons: Iterable = (),
+        client=None,
+        columnar: bool = False,
+    ) -> List[Key]:
+        # Imported here as the entities themselves read through the
+        # warehouse
+        from pfr_api.fantasy import Fantasy
+        from pfr_api.player import Player
+
+        seasons = [str(season) for season in seasons]
+        fetched = []
+        for player_id in player_ids:
+            player = Player(
+                player_id, player_id, client=client, warehouse=self)
+            for season in seasons:
+                # The regular season table stands in for the page: the
+                # playoffs table, when there is one, comes with it
+                key = self.key(Player.entity_type, player_id, season,
+                               table_key('stats', columnar))
+                if self.is_fresh(key):
+                    continue
+                player.gamelogs(season, columnar=columnar)
+                fetched.append(key)
+        for season in fantasy_seasons:
+            key = self.key(Fantasy.entity_type, '', season,
+                           table_key('fantasy', columnar))
+            if self.is_fresh(key):
+                continue
+            Fantasy(season, client=client, warehouse=self).rankings(
+                columnar=columnar)
+            fetched.append(key)
+        return fetched
+
+    def close(self):
+        self._conn.close()
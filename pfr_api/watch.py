@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, \
+    Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pfr_api import metrics
+from pfr_api.client import Client, default_client
+from pfr_api.fantasy import Fantasy
+from pfr_api.page import Page
+from pfr_api.parse.backends import table_markup
+from pfr_api.player import Player
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls; game-day tables change a few times a quarter
+DEFAULT_INTERVAL = 60.
+
+
+def table_digest(content: bytes, table_id: str) -> Optional[str]:
+    # Hashed from the page's bytes, so a table can be seen not to have
+    # changed without parsing anything; None if the page lacks it
+    markup = table_markup(content, table_id)
+    if markup is None:
+        return None
+    return hashlib.sha1(markup).hexdigest()
+
+
+def diff_rows(
+    previous: Dict[tuple, int],
+    frame: pd.DataFrame,
+    key: List[str],
+) -> Tuple[pd.DataFrame, Dict[tuple, int]]:
+    # The rows of `frame` that are new or differ from `previous`, and the
+    # row key -> row hash mapping to diff the next poll against. Rows that
+    # disappeared are not reported.
+    hashes = pd.util.hash_pandas_object(frame, index=False).tolist()
+    keys = list(zip(*(frame[column].tolist() for column in key)))
+    changed = [previous.get(k) != h for k, h in zip(keys, hashes)]
+    return frame.iloc[np.flatnonzero(changed)], dict(zip(keys, hashes))
+
+
+class Target(object):
+    """A watched table: where it is, how it is read and what keys its rows.
+
+    Subclasses wrap an entity method; `page` revalidates the entity's page
+    and `frame` reads the table from it.
+    """
+
+    table_id = None  # type: str
+    key = None  # type: List[str]
+
+    @property
+    def name(self) -> str:
+        raise NotImplementedError()
+
+    def page(self) -> Page:
+        raise NotImplementedError()
+
+    def frame(self) -> pd.DataFrame:
+        raise NotImplementedError()
+
+
+class GamelogTarget(Target):
+    """A player's regular season gamelog, one row per game."""
+
+    table_id = 'stats'
+    key = ['game_date']
+
+    def __init__(
+        self,
+        player_id: str,
+        season,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+    ):
+        # Without a warehouse, which would hand back the stored table
+        # rather than the one just fetched
+        self.player = Player(player_id, player_id, client=client,
+                             backend=backend)
+        self.player_id = player_id
+        self.season = str(season)
+
+    @property
+    def name(self) -> str:
+        return 'gamelog:{}:{}'.format(self.player_id, self.season)
+
+    def page(self) -> Page:
+        return self.player.gamelog_page(self.season, reload=True)
+
+    def frame(self) -> pd.DataFrame:
+        return self.player.regular_season_gamelog(self.season, columnar=True)
+
+
+class RankingsTarget(Target):
+    """A season's fantasy rankings, one row per player."""
+
+    table_id = 'fantasy'
+    key = ['player_id']
+
+    def __init__(
+        self,
+        season,
+        client: Optional[Client] = None,
+        backend: Optional[str] = None,
+    ):
+        self.fantasy = Fantasy(season, client=client, backend=backend)
+        self.season = str(season)
+
+    @property
+    def name(self) -> str:
+        return 'rankings:{}'.format(self.season)
+
+    def page(self) -> Page:
+        return self.fantasy.fantasy_rankings_page(reload=True)
+
+    def frame(self) -> pd.DataFrame:
+        return self.fantasy.rankings(columnar=True)
+
+
+class Change(object):
+    """The rows of one target that are new or changed since the last poll."""
+
+    __slots__ = ('target', 'rows', 'polled_at')
+
+    def __init__(self, target: str, rows: pd.DataFrame, polled_at: float):
+        self.target = target
+        self.rows = rows
+        self.polled_at = polled_at
+
+    def __repr__(self) -> str:
+        return 'Change({!r}, {} rows)'.format(self.target, len(self.rows))
+
+
+class Watcher(object):
+    """Polls tables and reports only the rows that changed.
+
+    Each poll revalidates the pages with conditional requests (given a
+    client with a cache), and a table whose markup hashes the same as last
+    time is not parsed at all, so an unchanged poll costs a 304 and a hash.
+    The first poll reports every row.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[Target],
+        interval: float = DEFAULT_INTERVAL,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        self.targets = list(targets)
+        self.interval = interval
+        # Called with the target's name for each target whose fetch or
+        # parse fails, which is logged instead when it is None; the other
+        # targets are still polled
+        self.on_error = on_error
+        self._digests = {}  # type: Dict[str, Optional[str]]
+        self._rows = {}  # type: Dict[str, Dict[tuple, int]]
+        self._stop = threading.Event()
+
+    def poll(self) -> List[Change]:
+        changes = []
+        registry = metrics.active()
+        for target in self.targets:
+            try:
+                change = self._poll_target(target, registry)
+            except Exception as e:
+                # Retried on the next poll, as nothing was recorded for it
+                if registry is not None:
+                    registry.count('watch_errors', target=target.name)
+                if self.on_error is not None:
+                    self.on_error(target.name, e)
+                else:
+                    logger.exception('Polling %s failed', target.name)
+                continue
+            if change is not None:
+                changes.append(change)
+        return changes
+
+    def _poll_target(
+        self,
+        target: Target,
+        registry: Optional[metrics.Registry],
+    ) -> Optional[Change]:
+        page = target.page()
+        digest = table_digest(page.content, target.table_id)
+        if digest is None or digest == self._digests.get(target.name):
+            if registry is not None:
+                registry.count('watch_unchanged', target=target.name)
+            return None
+        frame = target.frame()
+        rows, self._rows[target.name] = diff_rows(
+            self._rows.get(target.name, {}), frame, target.key)
+        self._digests[target.name] = digest
+        if registry is not None:
+            registry.count('watch_changed_rows', len(rows),
+                           target=target.name)
+        if not len(rows):
+            return None
+        return Change(target.name, rows, time.time())
+
+    def stop(self):
+        # Ends run() and changes() after the poll in progress
+        self._stop.set()
+
+    def run(
+        self,
+        callback: Callable[[Change], None],
+        polls: Optional[int] = None,
+    ):
+        # Polls every `interval` seconds (measured start to start) until
+        # stop() or `polls` polls, passing each change to `callback`
+        self._stop.clear()
+        next_poll = time.monotonic()
+        count = 0
+        while not self._stop.is_set():
+            for change in self.poll():
+                callback(change)
+            count += 1
+            if polls is not None and count >= polls:
+                break
+            next_poll += self.interval
+            self._stop.wait(max(0., next_poll - time.monotonic()))
+
+    async def changes(
+        self,
+        polls: Optional[int] = None,
+    ) -> AsyncIterator[Change]:
+        # run() as an async iterator; polls run on the loop's executor
+        self._stop.clear()
+        loop = asyncio.get_running_loop()
+        next_poll = loop.time()
+        count = 0
+        while not self._stop.is_set():
+            for change in await loop.run_in_executor(None, self.poll):
+                yield change
+            count += 1
+            if polls is not None and count >= polls:
+                break
+            next_poll += self.interval
+            await asyncio.sleep(max(0., next_poll - loop.time()))
+
+
+def watch(
+    player_ids: Iterable[str] = (),
+    rankings: Iterable = (),
+    season=None,
+    client: Optional[Client] = None,
+    interval: float = DEFAULT_INTERVAL,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> Watcher:
+    # A Watcher over the gamelogs of `player_ids` in `season` and the
+    # rankings of each season in `rankings`
+    if client is None:
+        client = default_client()
+    targets = []  # type: List[Target]
+    for player_id in player_ids:
+        if season is None:
+            raise ValueError('Watching gamelogs needs a season')
+        targets.append(GamelogTarget(player_id, season, client))
+    for rankings_season in rankings:
+        targets.append(RankingsTarget(rankings_season, client))
+    return Watcher(targets, interval, on_error)
@@ -11,11 +11,20 @@ with open('README.rst') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = [ ]
+requirements = ['beautifulsoup4', 'numpy', 'requests']
 
-setup_requirements = [ ]
+setup_requirements = []
 
-test_requirements = [ ]
+# Most of the suite checks DataFrames, parsed with both backends
+test_requirements = requirements + ['lxml', 'pandas']
+
+extras_requirements = {
+    'lxml': ['lxml'],
+    # DataFrame output; output='records' and 'numpy' need neither
+    'pandas': ['pandas'],
+    'arrow': ['pyarrow'],
+    'zstd': ['zstandard'],
+}
 
 setup(
     author="Alex Adamson",
@@ -41,6 +50,7 @@ setup(
         ],
     },
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Shared helpers for the `pfr_api` test suite."""
+
+import os
+
+from pfr_api.config import BASE_URL
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class FakeClient(object):
+    """Stands in for `pfr_api.client.Client`, serving fixtures by URL."""
+
+    base_url = BASE_URL
+    results = None
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.revalidations = []
+
+    def get(self, url, ttl=None, revalidate=False):
+        self.requests.append(url)
+        if revalidate:
+            self.revalidations.append(url)
+        for suffix, name in self.pages.items():
+            if url.endswith(suffix):
+                return fixture(name)
+        raise KeyError(url)
+
+    def stream(self, url, ttl=None, chunk_size=1024):
+        content = self.get(url, ttl)
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
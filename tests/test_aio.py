@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.aio`."""
+
+import asyncio
+import time
+import unittest
+
+from pfr_api.aio import AsyncClient, AsyncFantasy, AsyncPlayer, \
+    AsyncRateLimiter, async_gamelogs
+
+from tests.helpers import FakeClient
+
+
+class SlowClient(FakeClient):
+
+    def __init__(self, pages, delay):
+        super().__init__(pages)
+        self.delay = delay
+
+    def get(self, url, ttl=None):
+        time.sleep(self.delay)
+        return super().get(url, ttl)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsync(unittest.TestCase):
+
+    def test_requests_overlap(self):
+        client = SlowClient({'/gamelog/2007': 'gamelog.html'}, delay=0.2)
+        aclient = AsyncClient(client, concurrency=8)
+        ids = ['Play{:02d}00'.format(i) for i in range(8)]
+
+        start = time.time()
+        frames = run(async_gamelogs(ids, ['2007'], aclient))
+        elapsed = time.time() - start
+
+        self.assertEqual(sorted(frames), [(i, '2007') for i in ids])
+        self.assertTrue(all(len(f) == 16 for f in frames.values()))
+        self.assertLess(elapsed, 8 * 0.2)
+        self.assertIn(
+            'https://www.pro-football-reference.com'
+            '/players/P/Play0000/gamelog/2007', client.requests)
+
+    def test_entities(self):
+        client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+        aclient = AsyncClient(client)
+        player = AsyncPlayer('Tom Brady', 'BradTo00', aclient)
+        playoffs = run(player.playoffs_gamelog('2007'))
+        rankings = run(AsyncFantasy(2007, aclient).rankings())
+        self.assertEqual(len(playoffs), 3)
+        self.assertEqual(len(rankings), 24)
+
+    def test_timeout(self):
+        client = SlowClient({'/gamelog/2007': 'gamelog.html'}, delay=0.5)
+        aclient = AsyncClient(client, timeout=0.05)
+        player = AsyncPlayer('Tom Brady', 'BradTo00', aclient)
+        with self.assertRaises(asyncio.TimeoutError):
+            run(player.regular_season_gamelog('2007'))
+
+    def test_timeout_reaches_the_requests_it_makes(self):
+        aclient = AsyncClient(timeout=5)
+        self.assertEqual(aclient.client.timeout, 5)
+        aclient.close()
+
+    def test_rate_limiter_spaces_requests(self):
+        limiter = AsyncRateLimiter(rate=20)
+
+        async def three():
+            for _ in range(3):
+                await limiter.wait()
+
+        start = time.time()
+        run(three())
+        self.assertGreaterEqual(time.time() - start, 0.09)
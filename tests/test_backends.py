@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""Equivalence tests for `pfr_api.parse.backends`."""
+
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from pfr_api.parse.backends import find_table, matches_attributes
+from pfr_api.parse.parse import parse_stats_table
+from pfr_api.parse.parser import PlayerRowParser
+
+from tests.helpers import fixture
+
+GAMELOG_ROWS = {'id': re.compile(r'^stats\..*$')}
+RANKING_ROWS = {'class': lambda x: x != 'thead'}
+
+CASES = [
+    ('gamelog.html', 'stats', GAMELOG_ROWS, None),
+    ('gamelog.html', 'stats_playoffs', GAMELOG_ROWS, None),
+    ('player_fantasy.html', 'player_fantasy', None, None),
+    ('fantasy_rankings.html', 'fantasy', RANKING_ROWS,
+     {'player': PlayerRowParser()}),
+]
+
+
+class TestLxmlBackend(unittest.TestCase):
+
+    def test_matches_html_parser_output(self):
+        for name, table_id, attributes, parsers in CASES:
+            with self.subTest(page=name, table=table_id):
+                content = fixture(name)
+                soup = BeautifulSoup(content, 'html.parser')
+                expected = parse_stats_table(
+                    soup.find('table', {'id': table_id}), attributes, parsers)
+                actual = parse_stats_table(
+                    find_table(content, table_id), attributes, parsers)
+                self.assertEqual(actual, expected)
+                self.assertTrue(expected[1])
+
+    def test_finds_commented_tables(self):
+        table = find_table(fixture('gamelog.html'), 'snap_counts')
+        self.assertEqual(table.get('id'), 'snap_counts')
+
+    def test_missing_table(self):
+        self.assertIsNone(find_table(fixture('gamelog.html'), 'stats_x'))
+
+
+class TestMatchesAttributes(unittest.TestCase):
+
+    def test_attribute_semantics_follow_beautifulsoup(self):
+        html = (
+            '<tbody><tr id="a"></tr><tr class="thead"></tr>'
+            '<tr class="thead onecell"></tr><tr class=""></tr>'
+            '<tr id="stats.1" class="x"></tr></tbody>'
+        )
+        tbody = BeautifulSoup(html, 'html.parser').tbody
+        matchers = [
+            {'class': lambda x: x != 'thead'},
+            {'class': 'onecell'},
+            {'class': 'thead onecell'},
+            {'class': None},
+            {'id': True},
+            {'id': re.compile(r'^stats\.')},
+            {'id': ['a', 'stats.1']},
+        ]
+        for matcher in matchers:
+            with self.subTest(matcher=matcher):
+                expected = tbody.find_all('tr', recursive=False, **matcher)
+                actual = [
+                    row for row in tbody.find_all('tr', recursive=False)
+                    if matches_attributes(
+                        {k: ' '.join(v) if isinstance(v, list) else v
+                         for k, v in row.attrs.items()},
+                        matcher)
+                ]
+                self.assertEqual(actual, expected)
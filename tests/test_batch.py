@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.parse.batch`."""
+
+import os
+import unittest
+
+from pfr_api.fantasy import RANKINGS_ROW_ATTRIBUTES
+from pfr_api.page import Page
+from pfr_api.parse.batch import parse_pages, parse_pool
+from pfr_api.parse.parser import PlayerRowParser
+from pfr_api.player import GAMELOG_ROW_ATTRIBUTES
+
+from tests.helpers import FIXTURES, fixture
+
+
+class TestParsePages(unittest.TestCase):
+
+    def test_matches_in_process_parse(self):
+        content = fixture('gamelog.html')
+        path = os.path.join(FIXTURES, 'gamelog.html')
+        frames = parse_pages(
+            [content, path], 'stats', GAMELOG_ROW_ATTRIBUTES, max_workers=2)
+        expected = Page('a', content).stats_table(
+            'stats', GAMELOG_ROW_ATTRIBUTES, columnar=True)
+        self.assertEqual(len(frames), 2)
+        for frame in frames:
+            self.assertTrue(frame.equals(expected))
+
+    def test_shared_pool_with_parser_overrides(self):
+        with parse_pool(max_workers=2) as pool:
+            frames = parse_pages(
+                [fixture('fantasy_rankings.html')] * 3, 'fantasy',
+                RANKINGS_ROW_ATTRIBUTES, {'player': PlayerRowParser()},
+                executor=pool)
+            gamelogs = parse_pages(
+                [fixture('gamelog.html')], 'stats_playoffs',
+                GAMELOG_ROW_ATTRIBUTES, executor=pool)
+        self.assertEqual([len(f) for f in frames], [24, 24, 24])
+        self.assertEqual(frames[0]['player_id'].iloc[0], 'BradTo00')
+        self.assertEqual(len(gamelogs[0]), 3)
+
+    def test_missing_table(self):
+        with self.assertRaises(KeyError):
+            parse_pages([fixture('gamelog.html')], 'nope', max_workers=1)
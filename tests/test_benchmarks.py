@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Smoke tests for the offline benchmarks in `benchmarks`."""
+
+import unittest
+
+from benchmarks.bench import CASES, Result, compare, run
+from benchmarks.synthetic import scale_table
+from pfr_api.page import Page
+from pfr_api.player import GAMELOG_ROW_ATTRIBUTES
+
+from tests.helpers import fixture
+
+
+class TestScaleTable(unittest.TestCase):
+
+    def test_repeats_only_the_target_table(self):
+        content = scale_table(fixture('gamelog.html'), 'stats', 10)
+        page = Page('a', content)
+        self.assertEqual(
+            len(page.stats_table('stats', GAMELOG_ROW_ATTRIBUTES)), 160)
+        self.assertEqual(
+            len(page.stats_table('stats_playoffs', GAMELOG_ROW_ATTRIBUTES)),
+            3)
+
+    def test_missing_table(self):
+        with self.assertRaises(KeyError):
+            scale_table(fixture('gamelog.html'), 'nope', 2)
+
+
+class TestRun(unittest.TestCase):
+
+    def test_every_case_runs(self):
+        results = run(CASES, scales=(2,), repeat=1)
+        stages = {(r.case, r.stage) for r in results}
+        for case in CASES:
+            self.assertIn((case.name, 'soup:bs4'), stages)
+            self.assertIn((case.name, 'frame:rows'), stages)
+        self.assertIn(('fantasy', 'parser:PlayerRowParser'), stages)
+        self.assertTrue(all(r.rows and r.peak > 0 for r in results))
+
+    def test_compare_flags_regressions(self):
+        fast = Result('gamelog', 1, 'soup:bs4', 16, 1., 1., 0)
+        slow = Result('gamelog', 1, 'soup:bs4', 16, 2., 2., 0)
+        baseline = {'results': [fast.to_dict()]}
+        self.assertEqual(compare([fast], baseline), [])
+        self.assertEqual(compare([slow], baseline), [(slow, 2.)])
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.boxscore`."""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pfr_api.boxscore import GAME_COLUMNS, Boxscore, Season
+from pfr_api.parse.backends import BACKENDS
+from pfr_api.player import Player
+from pfr_api.warehouse import Warehouse
+
+from tests.helpers import FakeClient
+
+
+class TestBoxscore(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/years/2007/games.htm': 'season_games.html',
+            '/gamelog/2007': 'gamelog.html',
+            '.htm': 'boxscore.html',
+        })
+
+    def test_player_games(self):
+        for backend in BACKENDS:
+            for columnar in (False, True):
+                with self.subTest(backend=backend, columnar=columnar):
+                    frame = Boxscore('200709090nwe', self.client,
+                                     backend=backend).player_games(columnar)
+                    self.assertEqual(
+                        list(frame.columns[:len(GAME_COLUMNS)]),
+                        GAME_COLUMNS)
+                    self.assertEqual(len(frame), 11)
+                    brady = frame[frame['player_id'] == 'BradTo00'].iloc[0]
+                    self.assertEqual(brady['pass_yds'], 297)
+                    self.assertEqual(brady['pass_long'], 51)
+                    self.assertEqual(brady['game_date'], '2007-09-09')
+                    self.assertEqual(brady['week_num'], 1)
+                    self.assertEqual(brady['year_id'], 2007)
+                    self.assertEqual(brady['game_location'], '')
+                    self.assertEqual(brady['opp'], 'NYJ')
+                    self.assertEqual(brady['game_result'], 'W 38-14')
+                    revis = frame[frame['player_id'] == 'RevaDa99'].iloc[0]
+                    self.assertEqual(revis['game_location'], '@')
+                    self.assertEqual(revis['game_result'], 'L 14-38')
+                    self.assertEqual(revis['tackles_combined'], 6)
+                    self.assertTrue(pd.isna(revis['pass_yds']))
+
+    def test_tables_are_merged_per_player(self):
+        frame = Boxscore('200709090nwe', self.client).player_games()
+        welker = frame[frame['player_id'] == 'WelkWe99']
+        self.assertEqual(len(welker), 1)
+        self.assertEqual(welker.iloc[0]['rec_td'], 2)
+        self.assertEqual(welker.iloc[0]['punt_ret_yds'], 44)
+
+    def test_columns_match_the_gamelog(self):
+        gamelog = Player('Tom Brady', 'BradTo00', self.client) \
+            .regular_season_gamelog('2007')
+        frame = Boxscore('200709090nwe', self.client).player_games()
+        shared = [c for c in gamelog.columns if c in frame.columns]
+        self.assertIn('pass_yds', shared)
+        self.assertIn('game_result', shared)
+        self.assertIn('rush_att', shared)
+
+    def test_warehouse(self):
+        with tempfile.TemporaryDirectory() as directory:
+            warehouse = Warehouse(os.path.join(directory, 'w.sqlite'))
+            first = Boxscore('200709090nwe', self.client,
+                             warehouse=warehouse).player_games()
+            requests = len(self.client.requests)
+            second = Boxscore('200709090nwe', self.client,
+                              warehouse=warehouse).player_games()
+            warehouse.close()
+        self.assertEqual(len(self.client.requests), requests)
+        pd.testing.assert_frame_equal(first, second)
+
+
+class TestSeason(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/years/2007/games.htm': 'season_games.html',
+            '.htm': 'boxscore.html',
+        })
+
+    def test_games(self):
+        season = Season(2007, self.client)
+        # The unplayed 'preview' game is left out
+        self.assertEqual(season.games(), [
+            ('200709090nwe', 1), ('200709060clt', 1), ('200709160nwe', 2)])
+        self.assertEqual(season.games(playoffs=True), [
+            ('200801120nwe', 18), ('200801200nwe', 19)])
+
+    def test_player_games(self):
+        frame = Season(2007, self.client).player_games(columnar=True)
+        self.assertEqual(len(frame), 33)
+        self.assertEqual(
+            list(frame['boxscore_id'].drop_duplicates()),
+            ['200709090nwe', '200709060clt', '200709160nwe'])
+        self.assertEqual(list(frame['week_num'].unique()), [1, 2])
+        # One schedule request and one per game
+        self.assertEqual(len(self.client.requests), 4)
+
+    def test_playoffs_keep_the_season(self):
+        frame = Season(2007, self.client).player_games(playoffs=True)
+        self.assertEqual(set(frame['year_id']), {2007})
+        self.assertEqual(set(frame['game_date']),
+                         {'2008-01-12', '2008-01-20'})
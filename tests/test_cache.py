@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.cache` and `pfr_api.fetch`."""
+
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest import mock
+
+import requests
+
+from pfr_api.cache import (
+    CacheEntry, DiskPageCache, MemoryPageCache, ttl_for_season)
+from pfr_api.fetch import fetch_page, stream_page
+from pfr_api.seasons import current_season, is_final_season
+
+
+def _response(status_code=200, content=b'', headers=None):
+    r = mock.Mock()
+    r.status_code = status_code
+    r.ok = status_code < 400
+    r.content = content
+    r.headers = headers or {}
+    return r
+
+
+class TestSeasons(unittest.TestCase):
+
+    def test_current_season_rolls_over_in_march(self):
+        self.assertEqual(current_season(date(2020, 2, 2)), 2019)
+        self.assertEqual(current_season(date(2020, 3, 1)), 2020)
+
+    def test_is_final_season(self):
+        today = date(2020, 10, 1)
+        self.assertTrue(is_final_season('2019', today))
+        self.assertFalse(is_final_season(2020, today))
+        self.assertFalse(is_final_season('', today))
+
+    def test_final_seasons_never_expire(self):
+        self.assertIsNone(ttl_for_season(1999))
+        self.assertEqual(ttl_for_season('', ttl=10), 10)
+
+
+class TestDiskPageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pages.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_roundtrip_persists(self):
+        cache = DiskPageCache(self.path)
+        cache.set(CacheEntry('http://a', b'abc', etag='"1"'))
+        cache.close()
+
+        entry = DiskPageCache(self.path).get('http://a')
+        self.assertEqual(entry.content, b'abc')
+        self.assertEqual(entry.etag, '"1"')
+        self.assertTrue(entry.is_fresh())
+
+    def test_evicts_least_recently_used(self):
+        cache = DiskPageCache(self.path, max_size=10)
+        cache.set(CacheEntry('http://a', b'a' * 4))
+        cache.set(CacheEntry('http://b', b'b' * 4))
+        cache.get('http://a')
+        cache.set(CacheEntry('http://c', b'c' * 4))
+        self.assertIsNone(cache.get('http://b'))
+        self.assertIsNotNone(cache.get('http://a'))
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertLessEqual(cache.size(), 10)
+
+
+class TestFetchPage(unittest.TestCase):
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_fresh_entry_is_a_hit(self, get):
+        get.return_value = _response(content=b'page')
+        cache = MemoryPageCache()
+        self.assertEqual(fetch_page('http://a', cache, ttl=None), b'page')
+        self.assertEqual(fetch_page('http://a', cache, ttl=None), b'page')
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_stale_entry_is_revalidated(self, get):
+        cache = MemoryPageCache()
+        cache.set(CacheEntry(
+            'http://a', b'old', etag='"v1"', expires_at=time.time() - 1))
+        get.return_value = _response(status_code=304)
+
+        self.assertEqual(fetch_page('http://a', cache, ttl=60), b'old')
+        _, kwargs = get.call_args
+        self.assertEqual(kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(cache.stats.revalidations, 1)
+        self.assertTrue(cache.get('http://a').is_fresh())
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_fresh_entry_is_revalidated_on_request(self, get):
+        cache = MemoryPageCache()
+        cache.set(CacheEntry('http://a', b'old', etag='"v1"'))
+        get.return_value = _response(status_code=304)
+
+        self.assertEqual(
+            fetch_page('http://a', cache, ttl=60, revalidate=True), b'old')
+        _, kwargs = get.call_args
+        self.assertEqual(kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(cache.stats.revalidations, 1)
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_errors_raise_and_are_not_cached(self, get):
+        get.return_value = _response(status_code=500, content=b'oops')
+        cache = MemoryPageCache()
+        with self.assertRaises(requests.HTTPError):
+            fetch_page('http://a', cache)
+        self.assertIsNone(cache.get('http://a'))
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_errors_raise_without_a_cache(self, get):
+        get.return_value = _response(status_code=404, content=b'missing')
+        with self.assertRaises(requests.HTTPError) as raised:
+            fetch_page('http://a')
+        self.assertEqual(raised.exception.response.status_code, 404)
+        with self.assertRaises(requests.HTTPError):
+            b''.join(stream_page('http://a'))
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_unconditional_not_modified_raises(self, get):
+        # e.g. from a proxy; there is no cached body to answer with
+        get.return_value = _response(status_code=304, content=b'')
+        cache = MemoryPageCache()
+        for fetch in (fetch_page, lambda *args: b''.join(stream_page(*args))):
+            for args in (('http://a',), ('http://a', cache)):
+                with self.assertRaises(requests.HTTPError):
+                    fetch(*args)
+        self.assertIsNone(cache.get('http://a'))
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.client`."""
+
+import unittest
+from unittest import mock
+
+from pfr_api.cache import MemoryPageCache
+from pfr_api.client import Client, default_client
+from pfr_api.fantasy import Fantasy
+from pfr_api.player import Player
+
+
+class TestClient(unittest.TestCase):
+
+    def test_session_is_pooled_and_retries(self):
+        client = Client(pool_size=4, retries=2)
+        adapter = client.session.get_adapter('https://example.com')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn('gzip', client.session.headers['Accept-Encoding'])
+
+    def test_entities_share_the_default_client(self):
+        self.assertIs(
+            Player('Tom Brady', 'BradTo00')._client, Fantasy(2019)._client)
+        self.assertIs(Fantasy(2019)._client, default_client())
+
+    def test_get_uses_session_and_cache(self):
+        client = Client(cache=MemoryPageCache(), timeout=5)
+        response = mock.Mock(status_code=200, ok=True, content=b'page',
+                             headers={})
+        with mock.patch.object(client.session, 'get',
+                               return_value=response) as get:
+            self.assertEqual(client.get('http://a', ttl=None), b'page')
+            self.assertEqual(client.get('http://a', ttl=None), b'page')
+        get.assert_called_once_with('http://a', headers={}, timeout=5)
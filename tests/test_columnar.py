@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the columnar mode of `pfr_api.parse.parse`."""
+
+import re
+import unittest
+
+import pandas as pd
+
+from pfr_api.parse.backends import find_table
+from pfr_api.parse.parse import columns_to_frame, parse_stats_columns, \
+    parse_stats_table
+from pfr_api.parse.parser import DateStringParser, PlayerRowParser
+
+from tests.helpers import fixture
+
+GAMELOG_ROWS = {'id': re.compile(r'^stats\..*$')}
+
+
+def _values(series):
+    return [None if pd.isna(v) else v for v in series.tolist()]
+
+
+class TestParseStatsColumns(unittest.TestCase):
+
+    def test_values_match_row_mode(self):
+        cases = [
+            ('gamelog.html', 'stats', GAMELOG_ROWS, None),
+            ('fantasy_rankings.html', 'fantasy',
+             {'class': lambda x: x != 'thead'},
+             {'player': PlayerRowParser()}),
+        ]
+        for name, table_id, attributes, parsers in cases:
+            with self.subTest(page=name):
+                table = find_table(fixture(name), table_id)
+                columns, rows = parse_stats_table(table, attributes, parsers)
+                typed = columns_to_frame(
+                    *parse_stats_columns(table, attributes, parsers))
+                self.assertEqual(list(typed.columns), columns)
+                for i, column in enumerate(columns):
+                    self.assertEqual(
+                        _values(typed.iloc[:, i]), [row[i] for row in rows])
+
+    def test_dtypes(self):
+        table = find_table(fixture('gamelog.html'), 'stats')
+        frame = columns_to_frame(*parse_stats_columns(
+            table, GAMELOG_ROWS,
+            {'game_date': DateStringParser('game_date')}))
+        self.assertEqual(frame['week_num'].dtype, 'int64')
+        self.assertEqual(frame['rush_att'].dtype, 'Int64')
+        self.assertEqual(frame['pass_rating'].dtype, 'float64')
+        self.assertEqual(frame['off_pct'].dtype, 'float64')
+        self.assertEqual(frame['game_date'].dtype.kind, 'M')
+        self.assertTrue(frame['rush_att'].isna().any())
+
+    def test_short_rows_are_padded(self):
+        html = (
+            b'<table id="t"><thead><tr><th data-stat="ranker">Rk</th>'
+            b'<th data-stat="week_num">Wk</th><th data-stat="rush_att">A</th>'
+            b'</tr></thead><tbody><tr><th>1</th><td>1</td><td>4</td></tr>'
+            b'<tr><th>2</th><td>2</td></tr></tbody></table>'
+        )
+        columns, data = parse_stats_columns(find_table(html, 't'))
+        frame = columns_to_frame(columns, data)
+        self.assertEqual(_values(frame['rush_att']), [4, None])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.parse.compact`."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.parse.compact import compact_dtypes, compact_frame
+from pfr_api.parse.parser import CATEGORY, DATE, INTEGER, PlayerRowParser
+from pfr_api.player import Player
+
+from tests.helpers import FakeClient
+
+
+class TestCompactFrame(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+        self.player = Player('Tom Brady', 'BradTo00', self.client)
+
+    def test_gamelog_dtypes(self):
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                full = self.player.regular_season_gamelog(
+                    '2007', columnar=columnar)
+                frame = self.player.regular_season_gamelog(
+                    '2007', columnar=columnar, compact=True)
+                self.assertEqual(list(frame.columns), list(full.columns))
+                for column in ('team', 'opp', 'game_location'):
+                    self.assertEqual(frame[column].dtype, 'category')
+                self.assertEqual(frame['game_date'].dtype.kind, 'M')
+                self.assertEqual(frame['week_num'].dtype, np.int8)
+                # Nullable in columnar mode, so Int16 there
+                self.assertEqual(frame['pass_yds'].dtype.itemsize, 2)
+                self.assertEqual(frame['rush_att'].dtype, 'Int8')
+                self.assertTrue(frame['rush_att'].isna().any())
+                # Rates like 130.3 are not exact in float32
+                self.assertEqual(frame['pass_rating'].dtype, np.float64)
+                self.assertEqual(
+                    frame['opp'].astype(str).tolist(),
+                    full['opp'].astype(str).tolist())
+
+    def test_values_are_unchanged(self):
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                full = self.player.regular_season_gamelog(
+                    '2007', columnar=columnar)
+                frame = self.player.regular_season_gamelog(
+                    '2007', columnar=columnar, compact=True)
+                for i, name in enumerate(full.columns):
+                    expected, actual = full.iloc[:, i], frame.iloc[:, i]
+                    if expected.dtype.kind in 'iuf':
+                        np.testing.assert_array_equal(
+                            actual.astype('float64').to_numpy(),
+                            expected.astype('float64').to_numpy(),
+                            err_msg=name)
+                    elif actual.dtype.kind != 'M':
+                        self.assertEqual(
+                            actual.astype(object).where(
+                                actual.notna(), None).tolist(),
+                            expected.astype(object).where(
+                                expected.notna(), None).tolist(), name)
+
+    def test_floats_narrow_only_when_exact(self):
+        frame = compact_frame(pd.DataFrame({
+            'pass_rating': [130.3, 95.5], 'pass_yds_per_g': [250.5, 8.25]}))
+        self.assertEqual(frame['pass_rating'].dtype, np.float64)
+        self.assertEqual(frame['pass_yds_per_g'].dtype, np.float32)
+        self.assertEqual(frame['pass_rating'].tolist(), [130.3, 95.5])
+
+    def test_memory_saved_is_reported(self):
+        frame = self.player.regular_season_gamelog('2007', compact=True)
+        memory = frame.attrs['memory']
+        self.assertGreater(memory['saved'], 0)
+        self.assertEqual(
+            memory['saved'], memory['before'] - memory['after'])
+
+    def test_rankings_player_column(self):
+        frame = Fantasy(2007, client=self.client).rankings(compact=True)
+        self.assertEqual(frame['fantasy_pos'].dtype, 'category')
+        self.assertIn(frame['player_id'].dtype.kind, 'OT')
+        self.assertEqual(compact_dtypes(
+            {'player': PlayerRowParser()}).get('player_id'), None)
+
+    def test_duplicate_columns_are_kept(self):
+        frame = pd.DataFrame(
+            [['1', 'NWE', 3], ['2', 'NYJ', 4]],
+            columns=['week_num', 'team', 'week_num'])
+        compact = compact_frame(frame)
+        self.assertEqual(list(compact.columns), list(frame.columns))
+        self.assertEqual(compact.iloc[:, 2].tolist(), [3, 4])
+        self.assertEqual(compact.iloc[:, 2].dtype, np.int8)
+
+    def test_unparseable_values_are_left_alone(self):
+        frame = pd.DataFrame({
+            'game_date': ['2007-09-09', 'Sep 16'],
+            'week_num': ['1', 'bye'],
+        })
+        compact = compact_frame(frame)
+        self.assertEqual(
+            compact['game_date'].tolist(), frame['game_date'].tolist())
+        self.assertEqual(
+            compact['week_num'].tolist(), frame['week_num'].tolist())
+
+    def test_registry_declares_dtypes(self):
+        dtypes = compact_dtypes()
+        self.assertEqual(dtypes['team'], CATEGORY)
+        self.assertEqual(dtypes['game_date'], DATE)
+        self.assertEqual(dtypes['week_num'], INTEGER)
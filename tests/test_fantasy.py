@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.fantasy`."""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from pfr_api.fantasy import Fantasy, concat_seasons
+from pfr_api.warehouse import Warehouse
+
+from tests.helpers import FakeClient
+
+
+class TestRankingsRange(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/years/{}/fantasy.htm'.format(season): 'fantasy_rankings.html'
+            for season in range(2005, 2010)
+        })
+
+    def test_concatenates_seasons(self):
+        frame = Fantasy.rankings_range(
+            2005, 2009, client=self.client, max_workers=2)
+        expected = Fantasy(2007, client=self.client).rankings(columnar=True)
+        self.assertEqual(len(frame), 5 * len(expected))
+        self.assertEqual(list(frame.columns),
+                         ['season'] + list(expected.columns))
+        self.assertEqual(sorted(set(frame['season'])),
+                         [2005, 2006, 2007, 2008, 2009])
+        season = frame[frame['season'] == 2007].drop(columns='season')
+        pd.testing.assert_frame_equal(
+            season.reset_index(drop=True), expected)
+
+    def test_skips_seasons_in_the_warehouse(self):
+        with tempfile.TemporaryDirectory() as directory:
+            warehouse = Warehouse(os.path.join(directory, 'w.sqlite'))
+            with ThreadPoolExecutor(2) as executor:
+                Fantasy.rankings_range(
+                    2006, 2007, client=self.client, warehouse=warehouse,
+                    executor=executor)
+                self.client.requests = []
+                frame = Fantasy.rankings_range(
+                    2005, 2008, client=self.client, warehouse=warehouse,
+                    executor=executor)
+            warehouse.close()
+        self.assertEqual(
+            sorted(self.client.requests),
+            [Fantasy.rankings_url(2005), Fantasy.rankings_url(2008)])
+        self.assertEqual(list(frame['season'].unique()),
+                         [2005, 2006, 2007, 2008])
+
+
+class TestConcatSeasons(unittest.TestCase):
+
+    def test_columns_missing_from_an_era_keep_their_dtype(self):
+        old = pd.DataFrame({
+            'player_name': pd.array(['a'], dtype='str'),
+            'g': pd.array([16], dtype='int64'),
+        })
+        new = pd.DataFrame({
+            'player_name': pd.array(['b', 'c'], dtype='str'),
+            'g': pd.array([17, None], dtype='Int64'),
+            'targets': pd.array([100, 90], dtype='int64'),
+            'fantasy_points_ppr': [200.5, 100.],
+        })
+        frame = concat_seasons({1980: old, 2020: new})
+        self.assertEqual(
+            list(frame.columns),
+            ['season', 'player_name', 'g', 'targets', 'fantasy_points_ppr'])
+        self.assertEqual(list(frame['season']), [1980, 2020, 2020])
+        self.assertEqual(str(frame['g'].dtype), 'Int64')
+        self.assertEqual(str(frame['targets'].dtype), 'Int64')
+        self.assertTrue(pd.isna(frame['targets'].iloc[0]))
+        self.assertEqual(frame['fantasy_points_ppr'].dtype, 'float64')
+        self.assertEqual(frame['player_name'].dtype, old['player_name'].dtype)
+
+    def test_no_seasons(self):
+        self.assertEqual(list(concat_seasons({}).columns), ['season'])
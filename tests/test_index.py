@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.index`."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from pfr_api.index import PlayerIndex, normalize_name, parse_directory
+
+from tests.helpers import FakeClient, fixture
+
+
+class TestParseDirectory(unittest.TestCase):
+
+    def test_entries(self):
+        entries = parse_directory(fixture('players_B.html'))
+        self.assertEqual(len(entries), 10)
+        self.assertIn(
+            ('BradTo00', 'Tom Brady', 'QB', 2000, 2022, True), entries)
+        self.assertIn(
+            ('BellLe00', "Le'Veon Bell", 'RB', 2013, 2021, False), entries)
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('Odell Beckham Jr.'), 'odell beckham')
+        self.assertEqual(normalize_name("Le'Veon  Bell"), 'leveon bell')
+        self.assertEqual(normalize_name('Joé Benét'), 'joe benet')
+        self.assertEqual(normalize_name('A.J. Green III'), 'aj green')
+
+
+class TestPlayerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.client = FakeClient({'/players/B/': 'players_B.html'})
+        self.index = PlayerIndex(
+            os.path.join(self.directory.name, 'players.sqlite'), self.client)
+        self.assertEqual(self.index.refresh('B'), ['B'])
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def ids(self, players):
+        return [player._player_id for player in players]
+
+    def test_lookup(self):
+        self.assertEqual(self.ids(self.index.lookup('tom brady')),
+                         ['BradTo00'])
+        self.assertEqual(self.ids(self.index.lookup('Odell Beckham')),
+                         ['BeckOd00'])
+        # Namesakes come back most recent first
+        self.assertEqual(self.ids(self.index.lookup('Jim Brown')),
+                         ['BrowJi00', 'BrowJi21'])
+        self.assertEqual(self.index.lookup('Nobody'), [])
+        player = self.index.get('BradTo00')
+        self.assertEqual(player._name, 'Tom Brady')
+        self.assertIs(player._client, self.client)
+        self.assertEqual(self.index.entry('BrowJi21')[2:],
+                         ('G', 1944, 1944, False))
+
+    def test_prefix(self):
+        self.assertEqual(self.ids(self.index.prefix('Tom B')), ['BradTo00'])
+        self.assertEqual(len(self.index.prefix('j')), 4)
+        self.assertEqual(self.index.prefix(''), [])
+
+    def test_fuzzy(self):
+        self.assertEqual(self.ids(self.index.fuzzy('Tom Bradey'))[:1],
+                         ['BradTo00'])
+        self.assertEqual(self.ids(self.index.fuzzy('Leveon Bel')),
+                         ['BellLe00'])
+        self.assertEqual(self.index.fuzzy('Zzyzx Qwerty'), [])
+
+    def test_refresh_is_incremental(self):
+        self.client.requests = []
+        self.assertEqual(self.index.refresh('B'), [])
+        self.assertEqual(self.client.requests, [])
+        # Refetched but unchanged
+        self.assertEqual(self.index.refresh('B', max_age=None), [])
+        self.assertEqual(len(self.client.requests), 1)
+        self.assertEqual(len(self.index), 10)
+
+    def test_failed_refresh_keeps_players(self):
+        with mock.patch.object(self.client, 'get',
+                               side_effect=requests.HTTPError('503')):
+            with self.assertRaisesRegex(requests.RequestException, 'B'):
+                self.index.refresh('B', max_age=None)
+        self.assertEqual(len(self.index), 10)
+
+        # A page without players (e.g. an error page served as 200) is
+        # neither applied nor remembered as the letter's digest
+        self.client.pages = {'/players/B/': 'boxscore.html'}
+        with self.assertRaises(requests.RequestException):
+            self.index.refresh('B', max_age=None)
+        self.assertEqual(len(self.index), 10)
+        self.client.pages = {'/players/B/': 'players_B.html'}
+        self.assertEqual(self.index.refresh('B', max_age=None), [])
+
+    def test_partial_refresh_stores_the_letters_it_got(self):
+        get = self.client.get
+        requested = []
+
+        def flaky(url, *args, **kwargs):
+            requested.append(url)
+            if url.endswith('/A/'):
+                raise requests.ConnectionError('reset')
+            return get(url, *args, **kwargs)
+
+        with mock.patch.object(self.client, 'get', side_effect=flaky):
+            with self.assertRaisesRegex(requests.RequestException,
+                                        'letters A; changed: none'):
+                self.index.refresh('AB', max_age=None)
+            self.assertEqual(len(self.index), 10)
+            # Only the failed letter is still stale
+            del requested[:]
+            with self.assertRaises(requests.RequestException):
+                self.index.refresh('AB')
+        self.assertEqual(requested, [self.index.directory_url('A')])
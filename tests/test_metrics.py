@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.metrics`."""
+
+import unittest
+from unittest import mock
+
+from pfr_api import metrics
+from pfr_api.cache import MemoryPageCache
+from pfr_api.fetch import fetch_page
+from pfr_api.player import Player
+
+from tests.helpers import FakeClient
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_counters_and_summaries(self):
+        registry = metrics.Registry()
+        registry.count('parse_rows', 10, table='stats')
+        registry.count('parse_rows', 5, table='stats')
+        registry.count('parse_rows', 3, table='fantasy')
+        registry.observe('parse_seconds', 0.5)
+        registry.observe('parse_seconds', 1.5)
+        self.assertEqual(registry.counter('parse_rows', table='stats'), 15)
+        self.assertEqual(registry.total('parse_rows'), 18)
+        summary = registry.summary('parse_seconds')
+        self.assertEqual((summary.count, summary.min, summary.max),
+                         (2, 0.5, 1.5))
+        self.assertEqual(summary.mean, 1.)
+        exposition = registry.to_prometheus()
+        self.assertIn('pfr_api_parse_rows_total{table="stats"} 15.0',
+                      exposition)
+        self.assertIn('pfr_api_parse_seconds_count 2.0', exposition)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {'counter': [], 'summary': []})
+
+    def test_listeners_see_every_value(self):
+        registry = metrics.Registry()
+        events = []
+        registry.subscribe(lambda *event: events.append(event))
+        with registry.timer('soup_seconds', backend='bs4'):
+            pass
+        registry.count('cache_hits')
+        self.assertEqual([e[0] for e in events],
+                         ['soup_seconds', 'cache_hits'])
+        self.assertEqual(events[0][2], {'backend': 'bs4'})
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_parse_stages(self):
+        client = FakeClient({'/gamelog/2007': 'gamelog.html'})
+        player = Player('Tom Brady', 'BradTo00', client=client)
+        player.regular_season_gamelog(2007, columnar=True)
+        labels = {'table': 'stats', 'backend': player.gamelog_page(2007)
+                  .backend, 'mode': 'columnar'}
+        self.assertEqual(self.registry.counter('parse_rows', **labels), 16)
+        self.assertEqual(
+            self.registry.summary('parse_seconds', **labels).count, 1)
+        self.assertEqual(
+            self.registry.summary('parse_rows_per_second', **labels).count,
+            1)
+        self.assertEqual(
+            self.registry.summary('frame_seconds', **labels).count, 1)
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_requests_and_cache(self, get):
+        get.return_value = mock.Mock(
+            status_code=200, ok=True, content=b'page', headers={})
+        cache = MemoryPageCache()
+        fetch_page('https://example.com/a', cache)
+        fetch_page('https://example.com/a', cache)
+        self.assertEqual(self.registry.total('cache_misses'), 1)
+        self.assertEqual(self.registry.total('cache_hits'), 1)
+        self.assertEqual(
+            self.registry.counter('http_response_bytes', status='200'), 4)
+        self.assertEqual(
+            self.registry.summary(
+                'http_request_seconds', status='200').count, 1)
+
+    def test_disabled_records_nothing(self):
+        metrics.disable()
+        client = FakeClient({'/gamelog/2007': 'gamelog.html'})
+        Player('Tom Brady', 'BradTo00', client=client) \
+            .regular_season_gamelog(2007)
+        self.assertEqual(self.registry.snapshot(),
+                         {'counter': [], 'summary': []})
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the output modes of `pfr_api.parse.output`."""
+
+import datetime
+import re
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.parse import output
+from pfr_api.parse.backends import find_table
+from pfr_api.parse.parse import parse_stats_table
+from pfr_api.player import Player
+
+from tests.helpers import FakeClient, fixture
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+GAMELOG_ROWS = {'id': re.compile(r'^stats\..*$')}
+
+
+class TestParseStatsTableOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.table = find_table(fixture('gamelog.html'), 'stats')
+
+    def test_records_match_row_mode(self):
+        columns, rows = parse_stats_table(self.table, GAMELOG_ROWS)
+        records = parse_stats_table(
+            self.table, GAMELOG_ROWS, output=output.RECORDS)
+        self.assertEqual(len(records), len(rows))
+        for record, row in zip(records, rows):
+            self.assertEqual(
+                record['rush_att'], row[columns.index('rush_att')])
+            self.assertEqual(record['opp'], row[columns.index('opp')])
+        self.assertIsNone(records[0]['rush_att'])
+        # Dates follow the dtype the parser declares
+        self.assertIsInstance(records[0]['game_date'], datetime.date)
+
+    def test_numpy_arrays(self):
+        arrays = parse_stats_table(
+            self.table, GAMELOG_ROWS, output=output.NUMPY)
+        self.assertEqual(arrays['week_num'].dtype, np.int64)
+        self.assertIsInstance(arrays['rush_att'], np.ma.MaskedArray)
+        self.assertTrue(arrays['rush_att'].mask.any())
+        self.assertEqual(arrays['rush_att'].dtype, np.int64)
+        self.assertEqual(arrays['pass_rating'].dtype, np.float64)
+        self.assertEqual(arrays['game_date'].dtype, 'datetime64[D]')
+
+    @unittest.skipIf(pa is None, 'requires pyarrow')
+    def test_arrow_schema_follows_parsers(self):
+        table = parse_stats_table(
+            self.table, GAMELOG_ROWS, output=output.ARROW)
+        schema = table.schema
+        self.assertEqual(schema.field('week_num').type, pa.int64())
+        self.assertEqual(schema.field('rush_att').type, pa.int64())
+        self.assertGreater(table.column('rush_att').null_count, 0)
+        self.assertEqual(schema.field('pass_rating').type, pa.float64())
+        self.assertEqual(schema.field('game_date').type, pa.date32())
+        self.assertTrue(pa.types.is_dictionary(schema.field('opp').type))
+
+        columns, rows = parse_stats_table(self.table, GAMELOG_ROWS)
+        frame = pd.DataFrame(columns=columns, data=rows)
+        self.assertEqual(table.num_rows, len(frame))
+        self.assertEqual(table.column('pass_yds').to_pylist(),
+                         frame['pass_yds'].tolist())
+
+    def test_unknown_output(self):
+        with self.assertRaises(ValueError):
+            parse_stats_table(self.table, GAMELOG_ROWS, output='excel')
+
+    def test_records_without_pandas(self):
+        with mock.patch.object(output, 'pd', None):
+            records = parse_stats_table(
+                self.table, GAMELOG_ROWS, output=output.RECORDS)
+            self.assertEqual(records[0]['opp'], 'PIT')
+            with self.assertRaises(ImportError):
+                parse_stats_table(
+                    self.table, GAMELOG_ROWS, output=output.PANDAS)
+
+
+class TestEntityOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+
+    def test_gamelog_records(self):
+        player = Player('Tom Brady', 'BradTo00', self.client)
+        frame = player.regular_season_gamelog('2007')
+        records = player.regular_season_gamelog(
+            '2007', output=output.RECORDS)
+        self.assertEqual([r['pass_yds'] for r in records],
+                         frame['pass_yds'].tolist())
+
+    def test_gamelogs_numpy(self):
+        player = Player('Tom Brady', 'BradTo00', self.client)
+        tables = player.gamelogs('2007', output=output.NUMPY)
+        self.assertEqual(len(tables['stats']['pass_yds']), 16)
+
+    @unittest.skipIf(pa is None, 'requires pyarrow')
+    def test_rankings_arrow(self):
+        table = Fantasy(2007, client=self.client).rankings(
+            output=output.ARROW)
+        frame = Fantasy(2007, client=self.client).rankings()
+        self.assertEqual(table.column('player_id').to_pylist(),
+                         frame['player_id'].tolist())
+        self.assertTrue(
+            pa.types.is_dictionary(table.schema.field('fantasy_pos').type))
+
+    def test_compact_needs_pandas_output(self):
+        player = Player('Tom Brady', 'BradTo00', self.client)
+        with self.assertRaises(ValueError):
+            player.regular_season_gamelog(
+                '2007', compact=True, output=output.RECORDS)
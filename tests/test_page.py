@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.page` and the page-backed entity methods."""
+
+import re
+import unittest
+from unittest import mock
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.page import Page
+from pfr_api.parse.parser import IdentityParser
+from pfr_api.player import Player
+
+from tests.helpers import FakeClient, fixture
+
+
+class TestPage(unittest.TestCase):
+
+    def setUp(self):
+        self.page = Page('http://a', fixture('gamelog.html'))
+
+    def test_table_ids_include_commented_tables(self):
+        self.assertEqual(
+            self.page.table_ids(), ['stats', 'stats_playoffs', 'snap_counts'])
+
+    def test_commented_table_is_found(self):
+        frame = self.page.stats_table('snap_counts')
+        self.assertEqual(
+            list(frame.columns), ['week_num', 'offense', 'off_pct'])
+        self.assertEqual(frame['off_pct'].tolist(), [1., .97])
+
+    def test_missing_table_raises(self):
+        with self.assertRaises(KeyError):
+            self.page.stats_table('nope')
+
+    def test_stats_table_is_memoized_but_copied(self):
+        frame = self.page.stats_table('snap_counts')
+        frame['offense'] = 0
+        self.assertEqual(
+            self.page.stats_table('snap_counts')['offense'].tolist(), [70, 65])
+
+    def test_memo_is_keyed_by_filters_and_parsers(self):
+        gamelog = {'id': re.compile(r'^stats\.')}
+        self.assertEqual(len(self.page.stats_table('stats', gamelog)), 16)
+        self.assertEqual(len(self.page.stats_table(
+            'stats', {'id': re.compile(r'^stats\.20000[1-3]$')})), 3)
+        frame = self.page.stats_table(
+            'stats', gamelog, {'week_num': IdentityParser('week_num')})
+        self.assertEqual(frame['week_num'].iloc[0], '1')
+        self.assertEqual(
+            self.page.stats_table('stats', gamelog)['week_num'].iloc[0], 1)
+
+    def test_memo_hits_skip_the_content_key(self):
+        gamelog = {'id': re.compile(r'^stats\.')}
+        first = self.page.stats_table('stats', gamelog)
+        with mock.patch('pfr_api.page.result_key') as key, \
+                mock.patch.object(self.page, '_parse') as parse:
+            again = self.page.stats_table('stats', gamelog)
+        key.assert_not_called()
+        parse.assert_not_called()
+        self.assertTrue(first.equals(again))
+
+
+class TestPlayer(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/fantasy/2007': 'player_fantasy.html',
+        })
+        self.player = Player('Tom Brady', 'BradTo00', client=self.client)
+
+    def test_gamelogs_share_one_request(self):
+        regular = self.player.regular_season_gamelog('2007')
+        playoffs = self.player.playoffs_gamelog('2007')
+        self.assertEqual(len(regular), 16)
+        self.assertEqual(len(playoffs), 3)
+        self.assertEqual(self.client.requests, [
+            'https://www.pro-football-reference.com'
+            '/players/B/BradTo00/gamelog/2007'])
+
+    def test_gamelogs_returns_every_table(self):
+        frames = self.player.gamelogs('2007')
+        self.assertEqual(sorted(frames), ['stats', 'stats_playoffs'])
+        self.assertEqual(frames['stats']['week_num'].tolist(),
+                         list(range(1, 17)))
+        self.assertEqual(len(self.client.requests), 1)
+
+    def test_fantasy(self):
+        frame = self.player.fantasy('2007')
+        self.assertEqual(len(frame), 16)
+        self.assertIn('fantasy_points', frame.columns)
+
+
+class TestFantasy(unittest.TestCase):
+
+    def test_rankings_skip_repeated_headers(self):
+        client = FakeClient({'/years/2007/fantasy.htm':
+                             'fantasy_rankings.html'})
+        frame = Fantasy(2007, client=client).rankings()
+        self.assertEqual(len(frame), 24)
+        self.assertEqual(frame['player_id'].iloc[0], 'BradTo00')
+        self.assertEqual(frame['player_name'].iloc[0], 'Tom Brady*+')
+        self.assertEqual(frame['fantasy_rank_overall'].tolist(),
+                         list(range(1, 25)))
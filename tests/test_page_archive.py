@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.page_archive`."""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pfr_api.cache import CacheEntry
+from pfr_api.fetch import fetch_page
+
+from tests.helpers import fixture
+
+try:
+    from pfr_api.page_archive import PageArchive
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def _player_pages(count):
+    # Gamelog pages for made-up players: the same markup around different
+    # names and numbers, as on the real site
+    template = fixture('gamelog.html')
+    rng = random.Random(0)
+    pages = {}
+    for i in range(count):
+        page = template.replace(b'BradTo00', 'Plyr{:04d}'.format(i).encode())
+        for old in (b'>302<', b'>297<', b'>231<', b'>279<'):
+            page = page.replace(old, '>{}<'.format(rng.randint(0, 450))
+                                .encode())
+        pages['/players/P/Plyr{:04d}/gamelog/2007'.format(i)] = page
+    return pages
+
+
+@unittest.skipIf(zstandard is None, 'requires zstandard')
+class TestPageArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'pages.pfrz')
+
+    def _archive(self, **kwargs):
+        archive = PageArchive(self.path, **kwargs)
+        self.addCleanup(archive.close)
+        return archive
+
+    def test_roundtrip_persists(self):
+        archive = self._archive()
+        archive.set(CacheEntry('http://a', b'<html>a</html>', etag='"v1"',
+                               expires_at=123.))
+        archive.close()
+        entry = self._archive().get('http://a')
+        self.assertEqual(entry.content, b'<html>a</html>')
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertEqual(entry.expires_at, 123.)
+
+    def test_dictionary_compresses_an_order_of_magnitude(self):
+        pages = _player_pages(80)
+        archive = self._archive(train_after=16)
+        for url, page in pages.items():
+            archive.set(CacheEntry(url, page))
+        self.assertLess(archive.size() * 10, archive.content_size())
+        plain = PageArchive(os.path.join(self.directory, 'plain.pfrz'),
+                            train_after=None)
+        self.addCleanup(plain.close)
+        for url, page in pages.items():
+            plain.set(CacheEntry(url, page))
+        self.assertLess(archive.size(), plain.size())
+
+        # Any page reads back, in any order, including after reopening
+        archive.close()
+        archive = self._archive()
+        urls = list(pages)
+        random.Random(1).shuffle(urls)
+        for url in urls:
+            self.assertEqual(archive.get(url).content, pages[url])
+
+    def test_versions_by_fetch_date(self):
+        archive = self._archive()
+        archive.set(CacheEntry('http://a', b'first', fetched_at=100.))
+        archive.set(CacheEntry('http://a', b'second', fetched_at=200.))
+        self.assertEqual(archive.versions('http://a'), [100., 200.])
+        self.assertEqual(archive.get('http://a').content, b'second')
+        self.assertEqual(
+            archive.get_version('http://a', 150.).content, b'first')
+        self.assertIsNone(archive.get_version('http://a', 50.))
+
+    def test_unchanged_page_is_not_stored_again(self):
+        archive = self._archive()
+        page = fixture('gamelog.html')
+        archive.set(CacheEntry('http://a', page, fetched_at=100.))
+        size = archive.size()
+        archive.set(CacheEntry('http://a', page, fetched_at=200.))
+        self.assertLess(archive.size() - size, 1000)
+        self.assertEqual(archive.versions('http://a'), [100., 200.])
+        self.assertEqual(archive.get('http://a').content, page)
+
+    def test_truncated_record_is_dropped(self):
+        archive = self._archive()
+        archive.set(CacheEntry('http://a', b'kept'))
+        archive.set(CacheEntry('http://b', b'cut short'))
+        archive.close()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        archive = self._archive()
+        self.assertEqual(archive.urls(), ['http://a'])
+        archive.set(CacheEntry('http://c', b'appended'))
+        archive.close()
+        self.assertEqual(self._archive().get('http://c').content,
+                         b'appended')
+
+    def test_delete_and_clear(self):
+        archive = self._archive()
+        archive.set(CacheEntry('http://a', b'a'))
+        archive.set(CacheEntry('http://b', b'b'))
+        archive.delete('http://a')
+        self.assertIsNone(archive.get('http://a'))
+        archive.close()
+        archive = self._archive()
+        self.assertEqual(archive.urls(), ['http://b'])
+        archive.clear()
+        self.assertEqual(len(archive), 0)
+
+    def test_clear_while_reading(self):
+        archive = self._archive(train_after=None)
+        pages = _player_pages(8)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                for url in pages:
+                    try:
+                        entry = archive.get(url)
+                    except Exception as e:  # pragma: no cover
+                        errors.append(e)
+                        return
+                    if entry is not None and entry.content != pages[url]:
+                        errors.append(url)  # pragma: no cover
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for _ in range(20):
+                for url, page in pages.items():
+                    archive.set(CacheEntry(url, page))
+                archive.clear()
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+        self.assertEqual(errors, [])
+
+    def test_pages_stored_while_training(self):
+        archive = self._archive(train_after=4)
+        pages = list(_player_pages(12).items())
+        for url, page in pages[:3]:
+            archive.set(CacheEntry(url, page))
+        training = threading.Event()
+        release = threading.Event()
+        train_dictionary = zstandard.train_dictionary
+
+        def slow_train(*args):
+            training.set()
+            release.wait(5)
+            return train_dictionary(*args)
+
+        with mock.patch('zstandard.train_dictionary', side_effect=slow_train):
+            trainer = threading.Thread(
+                target=archive.set, args=(CacheEntry(*pages[3]),))
+            trainer.start()
+            self.assertTrue(training.wait(5))
+            # Crossing the threshold again does not start a second training
+            for url, page in pages[4:8]:
+                archive.set(CacheEntry(url, page))
+            release.set()
+            trainer.join()
+        self.assertEqual(archive._dict_id, 1)
+        # ...and the pages it stored without a dictionary are still counted
+        self.assertEqual(archive._undictionaried, 4)
+        for url, page in pages[8:]:
+            archive.set(CacheEntry(url, page))
+        self.assertEqual(archive._undictionaried, 4)
+        archive.close()
+        archive = self._archive()
+        for url, page in pages:
+            self.assertEqual(archive.get(url).content, page)
+
+    def test_close_unmaps(self):
+        archive = self._archive()
+        archive.set(CacheEntry('http://a', b'a'))
+        archive.get('http://a')
+        mapped = archive._mmap
+        archive.close()
+        self.assertTrue(mapped.closed)
+
+    @mock.patch('pfr_api.fetch.requests.get')
+    def test_fetch_reads_through(self, get):
+        get.return_value = mock.Mock(
+            status_code=200, ok=True, content=b'page',
+            headers={'ETag': '"v1"'})
+        archive = self._archive()
+        self.assertEqual(fetch_page('http://a', archive, ttl=60), b'page')
+        self.assertEqual(fetch_page('http://a', archive, ttl=60), b'page')
+        self.assertEqual(get.call_count, 1)
+
+        get.return_value = mock.Mock(status_code=304, headers={})
+        fetch_page('http://a', archive, ttl=60, revalidate=True)
+        self.assertEqual(len(archive.versions('http://a')), 2)
+        self.assertGreater(
+            archive.get('http://a').fetched_at, time.time() - 60)
@@ -6,7 +6,7 @@
 
 import unittest
 
-from pfr_api import pfr_api
+import pfr_api  # noqa: F401
 
 
 class TestPfr_api(unittest.TestCase):
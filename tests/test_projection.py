@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for column projection and row filters in `pfr_api.parse`."""
+
+import os
+import re
+import tempfile
+import unittest
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.page import stream_stats_table
+from pfr_api.parse.backends import find_table
+from pfr_api.parse.parse import at_least, at_most, columns_to_frame, \
+    parse_stats_columns, parse_stats_table
+from pfr_api.parse.parser import NullableStrToIntParser, PlayerRowParser
+from pfr_api.player import Player
+from pfr_api.results import ResultCache, result_key
+from pfr_api.warehouse import Warehouse
+
+from tests.helpers import FakeClient, fixture
+
+GAMELOG_ROWS = {'id': re.compile(r'^stats\..*$')}
+COLUMNS = ['week_num', 'team', 'opp', 'pass_yds']
+WHERE = {'week_num': at_least(10), 'opp': ['BUF', 'HOU', 'DAL']}
+
+
+def _tables():
+    content = fixture('gamelog.html')
+    return {
+        'lxml': find_table(content, 'stats'),
+        'bs4': BeautifulSoup(content, 'html.parser').find(
+            'table', {'id': 'stats'}),
+    }
+
+
+class CountingParser(NullableStrToIntParser):
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.calls = 0
+
+    def parse(self, field):
+        self.calls += 1
+        return super().parse(field)
+
+    def convert(self, values):
+        self.calls += len(values)
+        return super().convert(values)
+
+
+class FailingParser(NullableStrToIntParser):
+
+    def parse(self, field):
+        raise AssertionError('unselected cell parsed')
+
+    def convert(self, values):
+        raise AssertionError('unselected column converted')
+
+
+class TestSelection(unittest.TestCase):
+
+    def test_matches_filtering_the_full_table(self):
+        for backend, table in _tables().items():
+            full = columns_to_frame(*parse_stats_columns(
+                table, GAMELOG_ROWS))
+            expected = full.loc[
+                (full['week_num'] >= 10) &
+                full['opp'].isin(['BUF', 'HOU', 'DAL']),
+                COLUMNS].reset_index(drop=True)
+            with self.subTest(backend=backend, mode='columnar'):
+                pd.testing.assert_frame_equal(
+                    columns_to_frame(*parse_stats_columns(
+                        table, GAMELOG_ROWS, columns=COLUMNS, where=WHERE)),
+                    expected)
+            with self.subTest(backend=backend, mode='rows'):
+                columns, rows = parse_stats_table(
+                    table, GAMELOG_ROWS, columns=COLUMNS, where=WHERE)
+                self.assertEqual(columns, COLUMNS)
+                self.assertEqual(
+                    rows, [list(row) for row in expected.itertuples(
+                        index=False)])
+
+    def test_unselected_cells_are_never_parsed(self):
+        counting = CountingParser('pass_yds')
+        parsers = {'age': FailingParser('age'), 'pass_yds': counting}
+        where = {'week_num': at_most(3)}
+        for backend, table in _tables().items():
+            for columnar in (False, True):
+                with self.subTest(backend=backend, columnar=columnar):
+                    counting.calls = 0
+                    parse = parse_stats_columns if columnar \
+                        else parse_stats_table
+                    columns, _ = parse(
+                        table, GAMELOG_ROWS, parsers,
+                        columns=['pass_yds'], where=where)
+                    self.assertEqual(columns, ['pass_yds'])
+                    self.assertEqual(counting.calls, 3)
+
+    def test_unrequested_fields_are_dropped(self):
+        table = find_table(fixture('fantasy_rankings.html'), 'fantasy')
+        columns, rows = parse_stats_table(
+            table, {'class': lambda x: x != 'thead'},
+            {'player': PlayerRowParser()},
+            columns=['player_id', 'fantasy_points'],
+            where={'player': re.compile(r'^Tom Brady')})
+        self.assertEqual(columns, ['player_id', 'fantasy_points'])
+        self.assertEqual(rows, [['BradTo00', 232.0]])
+
+    def test_bounds_skip_blank_and_missing_cells(self):
+        table = find_table(fixture('gamelog.html'), 'stats')
+        _, rows = parse_stats_table(
+            table, GAMELOG_ROWS, columns=['rush_att'],
+            where={'rush_att': at_least(0)})
+        self.assertTrue(rows)
+        self.assertNotIn([None], rows)
+        _, rows = parse_stats_table(
+            table, GAMELOG_ROWS, where={'no_such_stat': at_least(0)})
+        self.assertEqual(rows, [])
+        _, rows = parse_stats_table(
+            table, GAMELOG_ROWS, where={'no_such_stat': None})
+        self.assertEqual(len(rows), 16)
+
+    def test_stream_matches_page(self):
+        content = fixture('gamelog.html')
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                # Closed like a Client.stream generator
+                chunks = (content[i:i + 1000]
+                          for i in range(0, len(content), 1000))
+                pd.testing.assert_frame_equal(
+                    stream_stats_table(
+                        chunks, 'stats', GAMELOG_ROWS,
+                        columnar=columnar, columns=COLUMNS, where=WHERE),
+                    Player('Tom Brady', 'BradTo00', FakeClient({
+                        '/gamelog/2007': 'gamelog.html'}))
+                    .regular_season_gamelog(
+                        '2007', columnar=columnar, columns=COLUMNS,
+                        where=WHERE))
+
+
+class TestEntities(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+
+    def test_warehouse_keeps_whole_tables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            warehouse = Warehouse(os.path.join(directory, 'w.sqlite'))
+            player = Player('Tom Brady', 'BradTo00', self.client,
+                            warehouse=warehouse)
+            narrowed = player.regular_season_gamelog(
+                '2007', columnar=True, columns=['week_num'],
+                where={'team': 'NWE', 'week_num': at_least(10)})
+            self.assertEqual(narrowed['week_num'].tolist(),
+                             [10, 11, 12, 13, 14, 15, 16])
+            whole = player.regular_season_gamelog('2007', columnar=True)
+            self.assertEqual(len(whole), 16)
+            self.assertEqual(len(whole.columns), 29)
+            gamelogs = player.gamelogs('2007', columns=['opp'])
+            self.assertEqual(list(gamelogs['stats'].columns), ['opp'])
+            warehouse.close()
+
+    def test_rankings(self):
+        frame = Fantasy(2007, client=self.client).rankings(
+            columnar=True, columns=['player_id', 'fantasy_pos'],
+            where={'fantasy_pos': 'QB', 'pass_yds': at_least(50)})
+        self.assertEqual(list(frame.columns), ['player_id', 'fantasy_pos'])
+        self.assertTrue(len(frame))
+        self.assertEqual(set(frame['fantasy_pos']), {'QB'})
+
+    def test_result_cache_keys_narrowed_tables(self):
+        key = result_key('digest', 'stats')
+        self.assertNotEqual(key, result_key('digest', 'stats', columns=[]))
+        self.assertNotEqual(
+            result_key('digest', 'stats', where={'week_num': at_least(5)}),
+            result_key('digest', 'stats', where={'week_num': at_least(10)}))
+        self.assertNotEqual(
+            result_key('digest', 'stats', where={'week_num': lambda v: v}),
+            result_key('digest', 'stats', where={'week_num': None}))
+        with tempfile.TemporaryDirectory() as directory:
+            self.client.results = ResultCache(directory)
+            player = Player('Tom Brady', 'BradTo00', self.client)
+            first = player.regular_season_gamelog(
+                '2007', columnar=True, where={'week_num': at_most(2)})
+            second = player.regular_season_gamelog(
+                '2007', columnar=True, where={'week_num': at_most(4)})
+            self.assertEqual((len(first), len(second)), (2, 4))
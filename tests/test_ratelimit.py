@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.ratelimit`."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pfr_api.client import Client
+from pfr_api.ratelimit import LocalRateLimiter, SQLiteRateLimiter, \
+    parse_retry_after
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def limiter(self, clock, **kwargs):
+        return LocalRateLimiter(
+            rate=2., clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_spaces_requests(self):
+        clock = FakeClock()
+        limiter = self.limiter(clock)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(clock.sleeps, [0.5, 0.5])
+
+    def test_backs_off_on_429_and_recovers(self):
+        clock = FakeClock()
+        limiter = self.limiter(clock, min_rate=0.5, recovery_steps=3)
+        limiter.acquire()
+        limiter.feedback(429, retry_after=10.)
+        self.assertEqual(limiter.rate, 1.)
+
+        limiter.acquire()
+        self.assertEqual(clock.sleeps, [10.])
+        for _ in range(3):
+            limiter.feedback(200)
+        self.assertEqual(limiter.rate, 2.)
+
+    def test_rate_never_drops_below_minimum(self):
+        limiter = self.limiter(FakeClock(), min_rate=0.5)
+        for _ in range(5):
+            limiter.feedback(429)
+        self.assertEqual(limiter.rate, 0.5)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120.)
+        self.assertEqual(parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470.), 10.)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class TestSQLiteRateLimiter(unittest.TestCase):
+
+    def test_state_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rate.sqlite')
+            clock = FakeClock()
+            first = SQLiteRateLimiter(
+                path, rate=1., clock=clock, sleep=clock.sleep)
+            second = SQLiteRateLimiter(
+                path, rate=1., clock=clock, sleep=clock.sleep)
+            first.acquire()
+            second.acquire()
+            self.assertEqual(clock.sleeps, [1.])
+
+            second.feedback(429, retry_after=30.)
+            self.assertEqual(first.rate, 0.5)
+            first.close()
+            second.close()
+
+
+class TestClientRateLimiting(unittest.TestCase):
+
+    def test_429_is_retried_through_the_limiter(self):
+        clock = FakeClock()
+        limiter = LocalRateLimiter(rate=1., clock=clock, sleep=clock.sleep)
+        client = Client(rate_limiter=limiter)
+        adapter = client.session.get_adapter('https://example.com')
+        self.assertNotIn(429, adapter.max_retries.status_forcelist)
+
+        throttled = mock.Mock(status_code=429, ok=False,
+                              headers={'Retry-After': '5'})
+        ok = mock.Mock(status_code=200, ok=True, content=b'page', headers={})
+        with mock.patch.object(client.session, 'get',
+                               side_effect=[throttled, ok]) as get:
+            self.assertEqual(client.get('http://a'), b'page')
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(clock.sleeps, [5.])
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.replay` and `pfr_api.server`."""
+
+import os
+import tempfile
+import unittest
+
+import requests
+
+from pfr_api.client import Client
+from pfr_api.fantasy import Fantasy
+from pfr_api.player import Player
+from pfr_api.ratelimit import LocalRateLimiter
+from pfr_api.replay import Archive
+from pfr_api.server import StandInServer
+
+from tests.helpers import fixture
+
+GAMELOG_PATH = '/players/B/BradTo00/gamelog/2007'
+RANKINGS_PATH = '/years/2007/fantasy.htm'
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = Archive(os.path.join(self.directory.name, 'a.sqlite'))
+        self.archive.put(GAMELOG_PATH, 200, 'OK', {
+            'Content-Type': 'text/html', 'ETag': '"v1"',
+            'Content-Encoding': 'gzip'}, fixture('gamelog.html'))
+        self.archive.put(RANKINGS_PATH, 200, 'OK', {},
+                         fixture('fantasy_rankings.html'))
+
+    def tearDown(self):
+        self.archive.close()
+        self.directory.cleanup()
+
+    def test_archive_roundtrip(self):
+        recorded = self.archive.get(GAMELOG_PATH)
+        self.assertEqual(recorded.body, fixture('gamelog.html'))
+        self.assertEqual(recorded.headers['etag'], '"v1"')
+        self.assertNotIn('Content-Encoding', recorded.headers)
+        self.assertEqual(len(self.archive), 2)
+        self.assertIsNone(self.archive.get('/nope'))
+
+    def test_replay_client(self):
+        with Client(archive=self.archive, replay=True) as client:
+            frame = Player('Tom Brady', 'BradTo00', client=client) \
+                .regular_season_gamelog(2007)
+            self.assertEqual(len(frame), 16)
+            r = client.session.get(client.base_url + '/missing')
+            self.assertEqual(r.status_code, 404)
+            r = client.session.get(client.base_url + GAMELOG_PATH,
+                                   headers={'If-None-Match': '"v1"'})
+            self.assertEqual(r.status_code, 304)
+
+    def test_record_from_stand_in_server(self):
+        recording = Archive(os.path.join(self.directory.name, 'b.sqlite'))
+        with StandInServer(self.archive) as server:
+            with Client(base_url=server.url, archive=recording) as client:
+                frame = Fantasy(2007, client=client).rankings()
+                with self.assertRaises(requests.HTTPError):
+                    client.get(server.url + '/missing')
+        self.assertEqual(len(frame), 24)
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(server.not_found, 1)
+        # 404s are recorded too, so a replay answers the same way
+        self.assertEqual(recording.paths(), ['/missing', RANKINGS_PATH])
+        self.assertEqual(recording.get(RANKINGS_PATH).body,
+                         fixture('fantasy_rankings.html'))
+        recording.close()
+
+    def test_streamed_reads_are_recorded_as_they_are_read(self):
+        recording = Archive(os.path.join(self.directory.name, 'b.sqlite'))
+        with StandInServer(self.archive) as server:
+            with Client(base_url=server.url, archive=recording) as client:
+                chunks = client.stream(
+                    server.url + RANKINGS_PATH, chunk_size=1024)
+                first = next(chunks)
+                self.assertEqual(len(first), 1024)
+                # Nothing is archived until the body has been read
+                self.assertEqual(len(recording), 0)
+                body = first + b''.join(chunks)
+
+                abandoned = client.stream(
+                    server.url + GAMELOG_PATH, chunk_size=1024)
+                next(abandoned)
+                abandoned.close()
+        self.assertEqual(body, fixture('fantasy_rankings.html'))
+        self.assertEqual(recording.paths(), [RANKINGS_PATH])
+        self.assertEqual(recording.get(RANKINGS_PATH).body, body)
+        recording.close()
+
+    def test_stand_in_server_throttles(self):
+        with StandInServer(self.archive, max_rate=1.) as server:
+            url = server.url + RANKINGS_PATH
+            self.assertEqual(requests.get(url).status_code, 200)
+            r = requests.get(url)
+            self.assertEqual(r.status_code, 429)
+            self.assertEqual(r.headers['Retry-After'], '1')
+            self.assertEqual(requests.get(
+                server.url + GAMELOG_PATH, headers={'If-None-Match': '"v1"'}
+            ).status_code, 429)
+
+    def test_rate_limited_client_against_injected_429s(self):
+        limiter = LocalRateLimiter(rate=1000., burst=10.)
+        with StandInServer(self.archive, error_rate=0.5, retry_after=0.,
+                           seed=1) as server:
+            with Client(base_url=server.url, rate_limiter=limiter) as client:
+                contents = [
+                    client.get(server.url + RANKINGS_PATH) for _ in range(5)]
+        self.assertGreater(server.throttled, 0)
+        self.assertTrue(all(content == fixture('fantasy_rankings.html')
+                            for content in contents))
+
+    def test_replay_needs_an_archive(self):
+        with self.assertRaises(ValueError):
+            Client(replay=True)
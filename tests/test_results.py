@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.results`."""
+
+import importlib.util
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.parse import parse
+from pfr_api.parse.parser import IdentityParser
+from pfr_api.player import Player
+from pfr_api.results import FEATHER, PICKLE, ResultCache, result_key
+
+from tests.helpers import FakeClient
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results = ResultCache(self.directory.name)
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+        self.client.results = self.results
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _player(self):
+        return Player('Tom Brady', 'BradTo00', self.client)
+
+    def test_unchanged_pages_skip_parsing(self):
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                first = self._player().regular_season_gamelog(
+                    '2007', columnar=columnar)
+                player = self._player()
+                second = player.regular_season_gamelog(
+                    '2007', columnar=columnar)
+                pd.testing.assert_frame_equal(first, second)
+                # Served without finding the table in the HTML
+                self.assertEqual(player.gamelog_page('2007')._tables, {})
+        self.assertEqual(self.results.stats.hits, 2)
+        self.assertEqual(self.results.stats.misses, 2)
+        self.assertEqual(len(self.results), 2)
+
+    def test_gamelogs_and_rankings(self):
+        first = self._player().gamelogs('2007')
+        player = self._player()
+        second = player.gamelogs('2007')
+        self.assertEqual(list(first), list(second))
+        self.assertEqual(player.gamelog_page('2007')._tables, {})
+        pd.testing.assert_frame_equal(
+            Fantasy(2007, self.client).rankings(),
+            Fantasy(2007, self.client).rankings())
+
+    def test_parser_changes_invalidate(self):
+        typed = self._player().regular_season_gamelog('2007', columnar=True)
+        with mock.patch.dict(
+                parse.PARSERS, {'pass_yds': IdentityParser('pass_yds')}):
+            frame = self._player().regular_season_gamelog(
+                '2007', columnar=True)
+        self.assertEqual(self.results.stats.hits, 0)
+        self.assertNotEqual(frame['pass_yds'].dtype, typed['pass_yds'].dtype)
+        frame = self._player().regular_season_gamelog('2007', columnar=True)
+        self.assertEqual(self.results.stats.hits, 1)
+        pd.testing.assert_frame_equal(frame, typed)
+
+    def test_key(self):
+        rows = {'id': re.compile(r'^stats\..*$')}
+        key = result_key('abc', 'stats', rows)
+        self.assertEqual(key, result_key(
+            'abc', 'stats', {'id': re.compile(r'^stats\..*$')}))
+        self.assertNotEqual(key, result_key('abd', 'stats', rows))
+        self.assertNotEqual(key, result_key('abc', 'stats_playoffs', rows))
+        self.assertNotEqual(key, result_key('abc', 'stats', rows,
+                                            columnar=True))
+        # Functions are identified by their code, not their address
+        self.assertEqual(
+            result_key('abc', 'fantasy', {'class': lambda x: x != 'thead'}),
+            result_key('abc', 'fantasy', {'class': lambda x: x != 'thead'}))
+        self.assertNotEqual(
+            result_key('abc', 'fantasy', {'class': lambda x: x != 'thead'}),
+            result_key('abc', 'fantasy', {'class': lambda x: x == 'thead'}))
+
+    def test_key_of_nested_functions(self):
+        # Compiled separately, as in two runs: the nested lambdas' code
+        # objects live at different addresses
+        def matcher(body):
+            namespace = {}
+            exec('def matches(x):\n    return any(map({}, x or ""))\n'
+                 .format(body), namespace)
+            return {'id': namespace['matches']}
+
+        digit = 'lambda c: c.isdigit()'
+        self.assertEqual(result_key('abc', 'stats', matcher(digit)),
+                         result_key('abc', 'stats', matcher(digit)))
+        self.assertNotEqual(
+            result_key('abc', 'stats', matcher(digit)),
+            result_key('abc', 'stats', matcher('lambda c: c.isalpha()')))
+
+        def recursive(x):
+            return x is None or recursive(None)
+        self.assertEqual(result_key('abc', 'stats', {'id': recursive}),
+                         result_key('abc', 'stats', {'id': recursive}))
+
+    def test_damaged_entries_are_misses(self):
+        key = result_key('abc', 'stats')
+        self.results.put(key, pd.DataFrame({'a': [1]}))
+        for name in os.listdir(self.directory.name):
+            with open(os.path.join(self.directory.name, name), 'wb') as f:
+                f.write(b'\x80')
+        self.assertIsNone(self.results.get(key))
+        self.results.clear()
+        self.assertEqual(len(self.results), 0)
+
+    @unittest.skipIf(HAS_PYARROW, 'pyarrow is installed')
+    def test_feather_needs_pyarrow(self):
+        self.assertEqual(self.results.fmt, PICKLE)
+        with self.assertRaises(ImportError):
+            ResultCache(self.directory.name, fmt=FEATHER)
+
+    @unittest.skipUnless(HAS_PYARROW, 'needs pyarrow')
+    def test_feather_roundtrip(self):
+        results = ResultCache(self.directory.name, fmt=FEATHER)
+        frame = self._player().regular_season_gamelog('2007', columnar=True)
+        results.put('typed', frame)
+        pd.testing.assert_frame_equal(results.get('typed'), frame)
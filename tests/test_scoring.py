@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.scoring`."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pfr_api.player import Player
+from pfr_api.scoring import Bonus, PPR, STANDARD, ScoringConfig, Scorer, \
+    score, stat_matrix
+
+from tests.helpers import FakeClient
+
+
+def _loop_score(frame, config):
+    # The obvious per-league computation the matrix form must agree with
+    values = frame.apply(pd.to_numeric, errors='coerce').fillna(0)
+    total = pd.Series(0., index=frame.index)
+    for stat, weight in config.weights.items():
+        if stat in values:
+            total += values[stat] * weight
+    for bonus in config.bonuses:
+        if bonus.stat in values:
+            total += (values[bonus.stat] >= bonus.threshold) * bonus.points
+    return total
+
+
+class TestScoring(unittest.TestCase):
+
+    def setUp(self):
+        client = FakeClient({'/gamelog/2007': 'gamelog.html'})
+        self.gamelog = Player('Tom Brady', 'BradTo00', client) \
+            .regular_season_gamelog('2007', columnar=True)
+
+    def test_single_row(self):
+        frame = pd.DataFrame({
+            'pass_yds': [300], 'pass_td': [3], 'pass_int': [1],
+            'rush_yds': [12], 'rec': [None],
+        })
+        bonus = ScoringConfig('bonus', STANDARD.weights,
+                              [Bonus('pass_yds', 300, 3)])
+        scores = score(frame, [STANDARD, PPR, bonus])
+        self.assertEqual(list(scores.columns), ['standard', 'ppr', 'bonus'])
+        np.testing.assert_allclose(
+            scores.iloc[0].to_numpy(), [23.2, 23.2, 26.2])
+
+    def test_matches_per_league_loop(self):
+        rng = np.random.default_rng(0)
+        stats = ['pass_yds', 'pass_td', 'pass_int', 'rush_att', 'rush_yds',
+                 'rush_td', 'fumbles_lost']
+        configs = [
+            ScoringConfig(
+                'league{}'.format(i),
+                {stat: rng.normal() for stat in stats},
+                [Bonus('pass_yds', 250 + 50 * (i % 3), 2),
+                 Bonus('rush_yds', 20, i % 4),
+                 Bonus('rush_yds', 40, 1)])
+            for i in range(20)
+        ]
+        scores = score(self.gamelog, configs)
+        self.assertEqual(scores.shape, (len(self.gamelog), 20))
+        for config in configs:
+            np.testing.assert_allclose(
+                scores[config.name], _loop_score(self.gamelog, config))
+
+    def test_float32_and_preallocated_output(self):
+        scorer = Scorer([STANDARD, PPR], dtype=np.float32)
+        stats = stat_matrix(self.gamelog, scorer.stats, np.float32)
+        out = np.empty((len(self.gamelog), 2), dtype=np.float32)
+        scores = scorer.score_matrix(stats, out=out)
+        self.assertIs(scores, out)
+        np.testing.assert_allclose(
+            scores[:, 0], _loop_score(self.gamelog, STANDARD), rtol=1e-5)
+
+    def test_from_dict(self):
+        config = ScoringConfig.from_dict({
+            'name': 'custom',
+            'weights': {'rush_yds': 0.1},
+            'bonuses': [{'stat': 'rush_yds', 'threshold': 100,
+                         'points': 3}],
+        })
+        scores = Scorer([config]).score(
+            pd.DataFrame({'rush_yds': [99, 100]}))
+        np.testing.assert_allclose(scores[:, 0], [9.9, 13.])
+
+    def test_rejects_unknown_stats_and_duplicate_leagues(self):
+        with self.assertRaises(ValueError):
+            ScoringConfig('x', {'rushing_yards': 0.1})
+        with self.assertRaises(ValueError):
+            Bonus('rushing_yards', 100, 3)
+        with self.assertRaises(ValueError):
+            Scorer([STANDARD, STANDARD])
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the streaming row iterators and streamed fetches."""
+
+import os
+import re
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pfr_api import metrics
+from pfr_api.cache import MemoryPageCache
+from pfr_api.client import Client
+from pfr_api.fantasy import Fantasy
+from pfr_api.parse.backends import find_table
+from pfr_api.parse.parse import iter_stats_table, parse_stats_table
+from pfr_api.parse.parser import IdentityParser, PlayerRowParser
+from pfr_api.parse.stream import iter_stats_table_chunks
+from pfr_api.player import Player
+from pfr_api.replay import Archive
+from pfr_api.server import StandInServer
+
+from tests.helpers import FakeClient, fixture
+
+GAMELOG_ROWS = {'id': re.compile(r'^stats\..*$')}
+RANKING_ROWS = {'class': lambda x: x != 'thead'}
+
+CASES = [
+    ('gamelog.html', 'stats', GAMELOG_ROWS, None),
+    ('gamelog.html', 'stats_playoffs', GAMELOG_ROWS, None),
+    ('player_fantasy.html', 'player_fantasy', None, None),
+    ('fantasy_rankings.html', 'fantasy', RANKING_ROWS,
+     {'player': PlayerRowParser()}),
+]
+
+
+def chunked(content, size):
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+
+class TestIterStatsTable(unittest.TestCase):
+
+    def test_matches_parse_stats_table(self):
+        for name, table_id, attributes, parsers in CASES:
+            with self.subTest(page=name, table=table_id):
+                table = find_table(fixture(name), table_id)
+                columns, rows = iter_stats_table(table, attributes, parsers)
+                self.assertEqual(
+                    (columns, list(rows)),
+                    parse_stats_table(table, attributes, parsers))
+
+    def test_batches(self):
+        table = find_table(fixture('gamelog.html'), 'stats')
+        _, rows = parse_stats_table(table, GAMELOG_ROWS)
+        _, batches = iter_stats_table(table, GAMELOG_ROWS, batch_size=5)
+        batches = list(batches)
+        self.assertEqual([len(batch) for batch in batches], [5, 5, 5, 1])
+        self.assertEqual(sum(batches, []), rows)
+
+    def test_rejects_empty_batches(self):
+        table = find_table(fixture('gamelog.html'), 'stats')
+        with self.assertRaises(ValueError):
+            iter_stats_table(table, GAMELOG_ROWS, batch_size=0)
+
+
+class TestIterStatsTableChunks(unittest.TestCase):
+
+    def test_matches_parse_stats_table(self):
+        for name, table_id, attributes, parsers in CASES:
+            content = fixture(name)
+            expected = parse_stats_table(
+                find_table(content, table_id), attributes, parsers)
+            # Chunk sizes that split tags, attributes and multi-byte text
+            for size in (7, 512, len(content)):
+                with self.subTest(page=name, table=table_id, size=size):
+                    columns, rows = iter_stats_table_chunks(
+                        chunked(content, size), table_id, attributes,
+                        parsers)
+                    self.assertEqual((columns, list(rows)), expected)
+
+    def test_stops_reading_after_the_table(self):
+        content = fixture('gamelog.html')
+        chunks = list(chunked(content, 256))
+        fed = []
+
+        def source():
+            for chunk in chunks:
+                fed.append(chunk)
+                yield chunk
+
+        _, rows = iter_stats_table_chunks(source(), 'stats', GAMELOG_ROWS)
+        self.assertEqual(len(list(rows)), 16)
+        self.assertLess(len(fed), len(chunks))
+
+    def test_commented_table(self):
+        parsers = {
+            'week_num': IdentityParser('week_num'),
+            'offense': IdentityParser('offense'),
+            'off_pct': IdentityParser('off_pct'),
+        }
+        columns, rows = iter_stats_table_chunks(
+            chunked(fixture('gamelog.html'), 100), 'snap_counts',
+            parsers=parsers, batch_size=10)
+        self.assertEqual(columns, ['week_num', 'offense', 'off_pct'])
+        self.assertEqual(
+            list(rows), [[['1', '70', '100%'], ['2', '65', '97%']]])
+
+    def test_missing_table(self):
+        with self.assertRaises(KeyError):
+            iter_stats_table_chunks(
+                chunked(fixture('gamelog.html'), 1024), 'stats_x')
+
+
+class TestStreamedFetch(unittest.TestCase):
+
+    def test_entities_match_downloaded_pages(self):
+        client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/fantasy/2007': 'player_fantasy.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                player = Player('Tom Brady', 'BradTo00', client)
+                streamed = Player('Tom Brady', 'BradTo00', client,
+                                  stream=True)
+                for method in ('regular_season_gamelog', 'playoffs_gamelog',
+                               'fantasy'):
+                    pd.testing.assert_frame_equal(
+                        getattr(streamed, method)('2007', columnar=columnar),
+                        getattr(player, method)('2007', columnar=columnar))
+                pd.testing.assert_frame_equal(
+                    Fantasy(2007, client, stream=True).rankings(
+                        columnar=columnar),
+                    Fantasy(2007, client).rankings(columnar=columnar))
+
+    def test_stops_downloading_after_the_table(self):
+        path = '/players/B/BradTo00/gamelog/2007'
+        # Everything after the gamelog table is never read off the socket
+        body = fixture('gamelog.html').replace(
+            b'</body>', b'<p>' + b'x' * 2 ** 20 + b'</p></body>')
+        with tempfile.TemporaryDirectory() as directory:
+            archive = Archive(os.path.join(directory, 'a.sqlite'))
+            archive.put(path, 200, 'OK', {'Content-Type': 'text/html'}, body)
+            registry = metrics.enable()
+            try:
+                with StandInServer(archive) as server, \
+                        Client(base_url=server.url, compress=False) as client:
+                    frame = Player('Tom Brady', 'BradTo00', client,
+                                   stream=True).regular_season_gamelog(2007)
+            finally:
+                metrics.disable()
+                archive.close()
+        self.assertEqual(len(frame), 16)
+        read = registry.total('http_response_bytes')
+        self.assertGreater(read, 0)
+        self.assertLess(read, len(body) // 2)
+
+    def test_complete_pages_are_cached(self):
+        path = '/years/2007/fantasy.htm'
+        with tempfile.TemporaryDirectory() as directory:
+            archive = Archive(os.path.join(directory, 'a.sqlite'))
+            archive.put(path, 200, 'OK', {'ETag': '"v1"'},
+                        fixture('fantasy_rankings.html'))
+            cache = MemoryPageCache()
+            try:
+                with Client(cache=cache, archive=archive, replay=True) \
+                        as client:
+                    chunks = list(client.stream(client.base_url + path))
+                    self.assertEqual(
+                        b''.join(chunks), fixture('fantasy_rankings.html'))
+                    self.assertEqual(cache.stats.misses, 1)
+                    self.assertEqual(
+                        list(client.stream(client.base_url + path)),
+                        [fixture('fantasy_rankings.html')])
+                    self.assertEqual(cache.stats.hits, 1)
+            finally:
+                archive.close()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.warehouse`."""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pfr_api.fantasy import Fantasy
+from pfr_api.player import Player
+from pfr_api.seasons import current_season
+from pfr_api.warehouse import Warehouse
+
+from tests.helpers import FakeClient
+
+CURRENT = str(current_season())
+
+
+class TestWarehouse(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'warehouse.sqlite')
+        self.client = FakeClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/gamelog/' + CURRENT: 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_finished_seasons_are_read_back_without_fetching(self):
+        warehouse = Warehouse(self.path, ttl=0)
+        Player('Tom Brady', 'BradTo00', self.client,
+               warehouse=warehouse).regular_season_gamelog('2007')
+        warehouse.close()
+
+        warehouse = Warehouse(self.path, ttl=0)
+        frame = Player('Tom Brady', 'BradTo00', self.client,
+                       warehouse=warehouse).regular_season_gamelog('2007')
+        self.assertEqual(len(frame), 16)
+        self.assertEqual(len(self.client.requests), 1)
+
+    def test_current_season_goes_stale(self):
+        warehouse = Warehouse(self.path, ttl=0)
+        for _ in range(2):
+            Player('Tom Brady', 'BradTo00', self.client,
+                   warehouse=warehouse).regular_season_gamelog(CURRENT)
+        self.assertEqual(len(self.client.requests), 2)
+
+    def test_update_fetches_only_missing_tables(self):
+        warehouse = Warehouse(self.path)
+        fetched = warehouse.update(
+            ['BradTo00'], ['2007'], fantasy_seasons=[2007],
+            client=self.client)
+        self.assertEqual(fetched, [
+            ('players', 'BradTo00', '2007', 'stats'),
+            ('fantasy', '', '2007', 'fantasy'),
+        ])
+        self.assertEqual(sorted(warehouse.keys('players')), [
+            ('players', 'BradTo00', '2007', 'stats'),
+            ('players', 'BradTo00', '2007', 'stats_playoffs'),
+        ])
+        self.assertEqual(warehouse.update(
+            ['BradTo00'], ['2007'], fantasy_seasons=[2007],
+            client=self.client), [])
+        self.assertEqual(len(self.client.requests), 2)
+
+        rankings = Fantasy(2007, self.client, warehouse=warehouse).rankings()
+        self.assertEqual(len(rankings), 24)
+        self.assertEqual(len(self.client.requests), 2)
+
+    def test_typed_frames_are_stored_separately(self):
+        warehouse = Warehouse(self.path)
+        player = Player('Tom Brady', 'BradTo00', self.client,
+                        warehouse=warehouse)
+        player.regular_season_gamelog('2007')
+        typed = Player('Tom Brady', 'BradTo00', self.client,
+                       warehouse=warehouse).regular_season_gamelog(
+            '2007', columnar=True)
+        self.assertEqual(typed['rush_att'].dtype, pd.Int64Dtype())
+
+    def test_missing_playoffs_table_is_not_refetched(self):
+        client = FakeClient({'/gamelog/2007': 'gamelog_no_playoffs.html'})
+        warehouse = Warehouse(self.path)
+        for _ in range(3):
+            frames = Player('Tom Brady', 'BradTo00', client,
+                            warehouse=warehouse).gamelogs('2007')
+            self.assertEqual(list(frames), ['stats'])
+        self.assertEqual(len(client.requests), 1)
+        self.assertIsNone(warehouse.get(
+            ('players', 'BradTo00', '2007', 'stats_playoffs')))
+
+    def test_missing_playoffs_gamelog_is_not_refetched(self):
+        client = FakeClient({'/gamelog/2007': 'gamelog_no_playoffs.html'})
+        warehouse = Warehouse(self.path)
+        for _ in range(3):
+            player = Player('Tom Brady', 'BradTo00', client,
+                            warehouse=warehouse)
+            with self.assertRaises(KeyError):
+                player.playoffs_gamelog('2007')
+        self.assertEqual(len(client.requests), 1)
+        self.assertTrue(warehouse.is_absent(
+            ('players', 'BradTo00', '2007', 'stats_playoffs')))
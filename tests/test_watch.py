@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `pfr_api.watch`."""
+
+import asyncio
+import unittest
+
+from pfr_api import metrics
+from pfr_api.parse.backends import resolve_backend
+from pfr_api.watch import GamelogTarget, RankingsTarget, Watcher, \
+    table_digest, watch
+
+from tests.helpers import FakeClient, fixture
+
+
+class ChangingClient(FakeClient):
+    """A FakeClient whose pages can be edited between polls."""
+
+    def __init__(self, pages):
+        super().__init__(pages)
+        self.content = {suffix: fixture(name)
+                        for suffix, name in pages.items()}
+
+    def get(self, url, ttl=None, revalidate=False):
+        super().get(url, ttl, revalidate)
+        for suffix, content in self.content.items():
+            if url.endswith(suffix):
+                return content
+        raise KeyError(url)
+
+    def edit(self, suffix, old, new):
+        self.content[suffix] = self.content[suffix].replace(old, new, 1)
+
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ChangingClient({
+            '/gamelog/2007': 'gamelog.html',
+            '/years/2007/fantasy.htm': 'fantasy_rankings.html',
+        })
+        self.target = GamelogTarget('BradTo00', 2007, self.client)
+        self.watcher = Watcher([self.target], interval=0)
+        self.registry = metrics.enable()
+        self.addCleanup(metrics.disable)
+
+    def test_first_poll_reports_every_row(self):
+        changes = self.watcher.poll()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0].target, 'gamelog:BradTo00:2007')
+        self.assertEqual(len(changes[0].rows), 16)
+
+    def test_unchanged_table_is_not_parsed(self):
+        self.watcher.poll()
+        self.client.edit('/gamelog/2007', b'</body>', b'<!-- ad --></body>')
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(
+            self.registry.counter('watch_unchanged', target=self.target.name),
+            1)
+        # Only the first poll parsed the table
+        self.assertEqual(self.registry.counter(
+            'parse_rows', backend=resolve_backend(None), mode='columnar',
+            table='stats'), 16)
+        self.assertEqual(self.client.revalidations,
+                         [self.target.player._page_url('gamelog', '2007')])
+
+    def test_only_changed_rows_are_reported(self):
+        self.watcher.poll()
+        self.client.edit('/gamelog/2007', b'data-stat="pass_yds" >302<',
+                         b'data-stat="pass_yds" >320<')
+        changes = self.watcher.poll()
+        self.assertEqual(len(changes), 1)
+        rows = changes[0].rows
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows['pass_yds'].tolist(), [320])
+
+    def test_rankings_keyed_by_player(self):
+        watcher = Watcher([RankingsTarget(2007, self.client)], interval=0)
+        first = watcher.poll()[0].rows
+        player_id = first['player_id'].iloc[3]
+        # A new row for an existing player replaces it rather than adding
+        self.client.edit(
+            '/years/2007/fantasy.htm',
+            'data-append-csv="{}"'.format(player_id).encode(),
+            b'data-append-csv="NewbPl00"')
+        rows = watcher.poll()[0].rows
+        self.assertEqual(rows['player_id'].tolist(), ['NewbPl00'])
+
+    def test_run_passes_changes_to_callback(self):
+        seen = []
+        self.watcher.run(seen.append, polls=3)
+        self.assertEqual([len(change.rows) for change in seen], [16])
+
+    def test_async_changes(self):
+        async def collect():
+            return [change async for change in self.watcher.changes(polls=2)]
+
+        changes = asyncio.run(collect())
+        self.assertEqual(len(changes), 1)
+
+    def test_failing_target_does_not_stop_the_others(self):
+        # A client without the page raises on every fetch
+        failing = GamelogTarget('MissPl00', 2007, FakeClient({}))
+        errors = []
+        watcher = Watcher([failing, self.target], interval=0,
+                          on_error=lambda name, e: errors.append(name))
+        seen = []
+        watcher.run(seen.append, polls=2)
+        self.assertEqual([change.target for change in seen],
+                         ['gamelog:BradTo00:2007'])
+        self.assertEqual(errors, ['gamelog:MissPl00:2007'] * 2)
+        self.assertEqual(
+            self.registry.counter('watch_errors', target=failing.name), 2)
+
+    def test_errors_are_logged_by_default(self):
+        failing = GamelogTarget('MissPl00', 2007, FakeClient({}))
+        watcher = Watcher([failing, self.target], interval=0)
+        with self.assertLogs('pfr_api.watch', 'ERROR') as logs:
+            changes = watcher.poll()
+        self.assertEqual([change.target for change in changes],
+                         ['gamelog:BradTo00:2007'])
+        self.assertIn('gamelog:MissPl00:2007', logs.output[0])
+
+    def test_missing_table(self):
+        self.assertIsNone(table_digest(b'<html></html>', 'stats'))
+
+    def test_watch_needs_season_for_gamelogs(self):
+        with self.assertRaises(ValueError):
+            watch(['BradTo00'], client=self.client)
+        watcher = watch(['BradTo00'], [2007], season=2007,
+                        client=self.client)
+        self.assertEqual([target.name for target in watcher.targets],
+                         ['gamelog:BradTo00:2007', 'rankings:2007'])